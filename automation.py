@@ -1,98 +1,28 @@
 #!/usr/bin/env python
 # automation.py
 
+import contextlib
 import os
-import time
 import random
-import pyautogui
-import cv2
-import numpy as np
-import win32com.client
-import pywintypes
-
-
-pyautogui.FAILSAFE = False
-
 
+from backend import FILL_PROPORTIONALLY, SAVE_NO, create_backend
+from cancellation import check_cancelled
+from checkpoint import RunCheckpoint, run_key
 from get_split import split_template
 from merge_indd import merge_indd_files
-from config_module import load_config, save_config
-
-# Global list to store created text frame COM objects (if you wish to adjust their line spacing later).
-created_text_frames = []
-
-########################################
-# OPENCV REGION SELECTION (FOR TEXT BOX)
-########################################
-
-_selected_points = []
-
-def _click_event(event, x, y, flags, param):
-    global _selected_points
-    image = param
-    if event == cv2.EVENT_LBUTTONDOWN:
-        _selected_points.append((x, y))
-        cv2.circle(image, (x, y), 5, (0, 255, 0), -1)
-        cv2.imshow("Screenshot", image)
-
-def get_region_from_opencv():
-    """
-    Take a screenshot and let the user click the TOP-LEFT and BOTTOM-RIGHT
-    corners for the text region. Return the two corner ratios.
-    """
-    global _selected_points
-    _selected_points = []
-
-    screenshot = pyautogui.screenshot()
-    image = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
-    clone = image.copy()
-    screen_h, screen_w = clone.shape[:2]
-
-    cv2.namedWindow("Screenshot", cv2.WINDOW_NORMAL)
-    cv2.imshow("Screenshot", clone)
-    cv2.setMouseCallback("Screenshot", _click_event, clone)
-
-    print("[INFO] Click the TOP-LEFT corner, then the BOTTOM-RIGHT corner for the text region.")
-    while True:
-        cv2.imshow("Screenshot", clone)
-        if len(_selected_points) >= 2:
-            break
-        cv2.waitKey(1)
-    cv2.destroyAllWindows()
-
-    x1, y1 = _selected_points[0]
-    x2, y2 = _selected_points[1]
-    left   = min(x1, x2)
-    right  = max(x1, x2)
-    top    = min(y1, y2)
-    bottom = max(y1, y2)
-
-    ratio_left   = left / screen_w
-    ratio_top    = top / screen_h
-    ratio_right  = right / screen_w
-    ratio_bottom = bottom / screen_h
-
-    print(f"[INFO] Selected region ratios: L={ratio_left:.3f}, T={ratio_top:.3f}, R={ratio_right:.3f}, B={ratio_bottom:.3f}")
-    return (ratio_left, ratio_top), (ratio_right, ratio_bottom)
-
-def retrieve_ratio_region(config):
-    """
-    If ratio-based corners exist in the config, convert them to pixel coordinates.
-    """
-    if "text_frame_top_left_ratio" in config and "text_frame_bottom_right_ratio" in config:
-        ratio_left, ratio_top = config["text_frame_top_left_ratio"]
-        ratio_right, ratio_bottom = config["text_frame_bottom_right_ratio"]
-
-        screenshot = pyautogui.screenshot()
-        screen_w, screen_h = screenshot.size  # (width, height)
-
-        left   = int(ratio_left * screen_w)
-        top    = int(ratio_top * screen_h)
-        right  = int(ratio_right * screen_w)
-        bottom = int(ratio_bottom * screen_h)
-        return (left, top), (right, bottom)
-    else:
-        return None
+from image_index import ImageIndex
+from pages import EmptyPageAllocator, InsertionCursor
+from progress import report_progress
+from project_index import load_project_index
+from rebuild import rebuild_changed_folders, record_build
+from resources import DocumentResources
+from template_map import template_map_cache
+from text_metrics import bold_font_name
+from tracing import Tracer, span
+from wait import ScreenSettled, screen_region
+from planner import DEFAULT_CREDITS_COLORS, cached_plan_issue, compute_text_box_coordinates, plan_folder
+from proxies import generate_proxies, plan_with_proxies, relink_originals
+from config_module import compile_config
 
 ########################################
 # PAGE SELECTION: GET OR INSERT EMPTY PAGE
@@ -113,171 +43,112 @@ def get_empty_page(doc, target_page=None):
             return page
     return None
 
-########################################
-# LAYOUT SELECTION FUNCTION
-########################################
-
-def choose_layout(num_remaining, config):
-    """
-    Choose a layout mode based on the number of images remaining and the probabilities
-    specified in the config.
-    """
-    layout_probs = config.get("layout_probabilities", {"single": 0.33, "double": 0.33, "four": 0.34})
-    if num_remaining == 1:
-        return "single"
-    elif num_remaining == 2:
-        return "double"
-    elif num_remaining == 3:
-        population = ["single", "double"]
-        weights = [layout_probs.get("single", 0.5), layout_probs.get("double", 0.5)]
-        return random.choices(population, weights=weights)[0]
-    else:
-        population = ["single", "double", "four"]
-        weights = [layout_probs.get("single", 0.33),
-                   layout_probs.get("double", 0.33),
-                   layout_probs.get("four", 0.34)]
-        return random.choices(population, weights=weights)[0]
-
 ########################################
 # TEXT BOX AND CREDITS INSERTION
 ########################################
 
-def compute_text_box_coordinates(region_top_left, region_bottom_right, config, text_content=None):
+def insert_credits_frame(doc, page, credits, resources):
     """
-    Compute the coordinates for the text box that will contain the credits.
-    The height (box_h) is calculated based on the number of lines in text_content.
-    If text_content is not provided or is empty, a default of 3 lines is assumed.
-    
-    After the initial calculation, this function shifts the box vertically if needed
-    so that the entire box remains within the defined region.
+    Create the credits text frame directly through COM: add it to the page at the
+    planned page coordinates (a planner.CreditsPlan), set the whole text in one Contents assignment, then
+    apply the credits paragraph style (font, size, color, leading) to the story and the
+    title character style to its first paragraph. The styles come from the document's
+    resources (a resources.DocumentResources), which define each one once.
+    Returns the frame, or None if it could not be created (any
+    half-built frame is removed so the caller can fall back to typing).
     """
-    base_font_size = config.get("credits_font_size", 24)
-    position  = config.get("text_box_position", ["bottom_center"])[0]
-
-    region_width  = region_bottom_right[0] - region_top_left[0]
-    region_height = region_bottom_right[1] - region_top_left[1]
-
-    line_multiplier = 1.2
-    if text_content:
-        line_count = len(text_content.splitlines())
-        if line_count == 0:
-            line_count = 3
-    else:
-        line_count = 3
-
-    # Calculate the desired box height based on the number of lines.
-    box_h = int(line_count * base_font_size * line_multiplier)
-    box_w = region_width
-
-    # Determine the initial top-left y-coordinate based on the desired position.
-    if position == "center":
-        tl_y = region_top_left[1] + (region_height - box_h) // 2
-    elif position == "top_center":
-        tl_y = region_top_left[1]
-    elif position == "bottom_center":
-        tl_y = region_bottom_right[1] - box_h
-    else:
-        tl_y = region_top_left[1] + (region_height - box_h) // 2
-
-    tl_x = region_top_left[0]
+    text_frame = None
+    try:
+        text_frame = page.TextFrames.Add()
+        text_frame.GeometricBounds = list(credits.bounds)
+        text_frame.Contents = credits.text
+        story = text_frame.ParentStory
+        paragraph_style, title_style = resources.credits_styles(credits.font, credits.bold_font, credits.color,
+                                                                credits.size, credits.bold_size, credits.leading)
+        story.AppliedParagraphStyle = paragraph_style
+    except Exception as e:
+        print("[ERROR] Creating credits text frame via COM failed:", e)
+        if text_frame is not None:
+            try:
+                text_frame.Delete()
+            except Exception:
+                pass
+        return None
 
-    # --- SHIFT THE BOX IF IT FALLS OUTSIDE THE REGION ---
-    if box_h > region_height:
-        box_h = region_height
-        tl_y = region_top_left[1]
-    else:
-        if tl_y < region_top_left[1]:
-            tl_y = region_top_left[1]
-        if tl_y + box_h > region_bottom_right[1]:
-            tl_y = region_bottom_right[1] - box_h
+    try:
+        story.Paragraphs.Item(1).AppliedCharacterStyle = title_style
+    except Exception as e:
+        print("[ERROR] Bold formatting via COM failed:", e)
 
-    box_tl = (tl_x, tl_y)
-    box_br = (tl_x + box_w, tl_y + box_h)
-    click_pt = ((box_tl[0] + box_br[0]) // 2, (box_tl[1] + box_br[1]) // 2)
-    return box_tl, box_br, click_pt
+    print(f"[INFO] Created credits frame at {credits.bounds}: {credits.font} at size {credits.size}, {credits.color}.")
+    return text_frame
 
-def insert_text_frame_and_type(text_content, drag_start, drag_end, click_point, config, is_first_page=False):
+def insert_text_frame_and_type(text_content, drag_start, drag_end, click_point, config, backend, is_first_page=False,
+                               font=None, color=None, resources=None):
     """
-    Create a text frame via PyAutoGUI. Immediately after creating the frame and setting
-    the insertion point, use COM to pre-apply the default font, size, text color and alignment,
+    Fallback credits path (config["credits_mode"] = "typewrite", or when
+    insert_credits_frame fails): create a text frame via PyAutoGUI. Immediately after creating the frame and setting
+    the insertion point, use COM to apply the credits paragraph style (font, size, text color, leading),
     and then force the text frame’s geometric bounds (to match the computed coordinates).
     Finally, type the text.
     
-    (For first-page credits, an optional bold formatting for the first paragraph is applied after typing.)
+    (For first-page credits, the title character style is applied to the first paragraph after typing.)
+    'font' and 'color' default to a random pick from config["credits_font"] / config["credits_colors"].
+    'resources' (a resources.DocumentResources of the active document) resolves the styles.
     """
-    import random, time, pyautogui, win32com.client
+    ui = backend.ui
 
     # Choose a random font from the list provided.
     fonts = config["credits_font"]
-    base_font = random.choice(fonts)
+    base_font = font or random.choice(fonts)
     base_size = config["credits_font_size"]
     combined_text = text_content
 
+    # Every wait below returns as soon as InDesign is ready (see wait.py).
+    waiter = backend.waiter
+    frame_region = screen_region(drag_start, drag_end, margin=20)
+    text_frames = backend.app.ActiveDocument.TextFrames
+
     print("[INFO] Creating text frame via PyAutoGUI...")
-    time.sleep(1)
-    pyautogui.press('t')  # Select Type Tool
-    time.sleep(0.5)
+    waiter.until(ScreenSettled(ui, frame_region), "screen idle", replaces=1.0)
+    frames_before = text_frames.Count
+    ui.press('t')  # Select Type Tool
+    waiter.until(ScreenSettled(ui, frame_region), "type tool", replaces=0.5)
 
     # Drag to create the text frame.
-    pyautogui.moveTo(drag_start[0], drag_start[1], duration=0.5)
-    pyautogui.mouseDown()
-    pyautogui.moveTo(drag_end[0], drag_end[1], duration=1)
-    pyautogui.mouseUp()
-    time.sleep(0.5)
+    ui.moveTo(drag_start[0], drag_start[1])
+    ui.mouseDown()
+    ui.moveTo(drag_end[0], drag_end[1], duration=waiter.drag_duration)
+    ui.mouseUp()
+    waiter.until(lambda: text_frames.Count > frames_before, "text frame created", replaces=0.5)
 
     # Click inside the frame to set the insertion point.
-    pyautogui.moveTo(click_point[0], click_point[1], duration=0.5)
-    pyautogui.click()
-    time.sleep(0.5)
+    ui.moveTo(click_point[0], click_point[1])
+    ui.click()
+    waiter.until(ScreenSettled(ui, frame_region), "insertion point", replaces=0.5)
     print("[INFO] Text frame created.")
 
-    # --- SET TEXT COLOR AND ALIGNMENT AFTER CREATING THE TEXT FRAME ---
+    # --- APPLY THE CREDITS PARAGRAPH STYLE BEFORE TYPING ---
+    # The typed text takes the style's font, size, color and leading (see resources.py).
     try:
-        indesign = win32com.client.Dispatch("InDesign.Application")
+        indesign = backend.app
         doc = indesign.ActiveDocument
-        if doc.Selection.Count > 0:
-            textFrame = doc.Selection.Item(1)
-            
-            # Choose a random color from the config list.
-            colors = config["credits_colors"]
-            chosen_color = random.choice(colors)
-            try:
-                swatch = doc.Colors.Item(chosen_color)
-            except Exception as e:
-                print(f"[INFO] Swatch '{chosen_color}' not found. Creating it.")
-                swatch = doc.Colors.Add()
-                swatch.Name = chosen_color
-                # Use CMYK values (adjust these values as needed)
-                color_values = {
-                    "red":    [0, 100, 100, 0],
-                    "black":  [0, 0, 0, 100],
-                    "blue":   [100, 75, 0, 0],
-                    "green":  [75, 0, 100, 0],
-                    "yellow": [0, 0, 100, 0]
-                }
-                chosen_lower = chosen_color.lower()
-                if chosen_lower in color_values:
-                    swatch.ColorValue = color_values[chosen_lower]
-                else:
-                    swatch.ColorValue = [0, 0, 0, 100]
-            
-            # Apply the chosen color to the text.
-            textFrame.ParentStory.Texts.Item(1).FillColor = swatch
-
-        else:
-            print("[WARN] No text frame selected for color formatting.")
+        if resources is None:
+            resources = DocumentResources(doc, indesign)
+        chosen_color = color or random.choice(config.get("credits_colors") or DEFAULT_CREDITS_COLORS)
+        paragraph_style, title_style = resources.credits_styles(
+            base_font, bold_font_name(base_font), chosen_color, base_size, base_size * 1.5,
+            base_size * config.get("leading_decrease_factor", 0.8))
     except Exception as e:
-        print("[ERROR] Setting text color and alignment failed:", e)
+        print("[ERROR] Defining the credits styles failed:", e)
+        paragraph_style = title_style = None
 
-    # --- PRE-APPLY FONT & SIZE VIA COM BEFORE TYPING ---
     try:
-        indesign = win32com.client.Dispatch("InDesign.Application")
-        doc = indesign.ActiveDocument
         if doc.Selection.Count > 0:
             textFrame = doc.Selection.Item(1)
-            textFrame.ParentStory.AppliedFont = base_font
-            textFrame.ParentStory.PointSize = base_size
-            print(f"[INFO] Pre-applied default formatting: {base_font} at size {base_size}")
+            if paragraph_style is not None:
+                textFrame.ParentStory.AppliedParagraphStyle = paragraph_style
+                print(f"[INFO] Applied credits style: {base_font} at size {base_size}, {chosen_color}")
             # --- FORCE THE TEXT FRAME SIZE VIA COM ---
             top = drag_start[1]
             left = drag_start[0]
@@ -294,197 +165,117 @@ def insert_text_frame_and_type(text_content, drag_start, drag_end, click_point,
         print("[ERROR] Pre-formatting via COM failed:", e)
 
     print("[INFO] Typing credits text...")
-    pyautogui.typewrite(combined_text, interval=0.05)
-    time.sleep(0.5)
+    ui.typewrite(combined_text, interval=config.get("ui_typing_interval", 0.05))
+    waiter.until(lambda: len(doc.Selection.Item(1).ParentStory.Contents) >= len(combined_text),
+                 "credits typed", timeout=max(waiter.timeout, len(combined_text) * 0.05), replaces=0.5)
 
-    # Optionally, if this is the first page, make the first paragraph bold.
+    # Optionally, if this is the first page, set the first paragraph in the title style.
     try:
-        if doc.Selection.Count > 0:
+        if doc.Selection.Count > 0 and title_style is not None:
             textFrame = doc.Selection.Item(1)
             paras = textFrame.ParentStory.Paragraphs
             if paras.Count >= 1:
-                main_para = paras.Item(1)
-                main_font = base_font + " Bold"
-                main_para.AppliedFont = main_font
-                main_para.PointSize = base_size * 1.5
-                print(f"[INFO] Applied bold formatting to first paragraph: {main_font} at size {base_size * 1.5}")
+                paras.Item(1).AppliedCharacterStyle = title_style
+                print(f"[INFO] Applied title style to first paragraph at size {base_size * 1.5}")
     except Exception as e:
         print("[ERROR] Bold formatting via COM failed:", e)
 
     print("[INFO] Finished typing credits.")
 
-    # Save the text frame reference for later line spacing adjustment.
-    try:
-        indesign = win32com.client.Dispatch("InDesign.Application")
-        doc = indesign.ActiveDocument
-        if doc.Selection.Count > 0:
-            tf = doc.Selection.Item(1)
-        else:
-            tf = doc.TextFrames.Item(doc.TextFrames.Count)
-        created_text_frames.append(tf)
-        print("[INFO] Saved text frame for later line spacing adjustment.")
-    except Exception as e:
-        print("[ERROR] Could not save text frame reference:", e)
-
 
 ########################################
 # PROCESSING IMAGES PER MODEL FOLDER
 ########################################
 
-
-import pyautogui
-import time
-
-def place_model_images(doc, model_folder, config, target_page=None):
+def place_model_images(doc, model_folder, config, backend, target_page=None, pages=None):
     """
     Process images from a model folder and place them on pages.
     On the first page for a model folder, overlay the credits (if available).
+    Pages come from the 'pages' page source when given (see pages.py), otherwise
+    from the first empty page of the document.
     """
-    image_files = sorted([f for f in os.listdir(model_folder) if f.lower().endswith(".jpg")])
-    if not image_files:
-        print(f"[WARN] No images found in {model_folder}.")
-        return
-
-    # Read credits from Credits.txt (if available).
-    credits_path = os.path.join(model_folder, "Credits.txt")
-    credits_text = ""
-    if os.path.isfile(credits_path):
-        with open(credits_path, "r", encoding="utf-8") as f:
-            credits_text = f.read().strip()
-    else:
-        print(f"[WARN] No Credits.txt found in {model_folder}.")
-
-    image_index = 0
-    first_page_for_model = True
-
-    while image_index < len(image_files):
-        num_remaining = len(image_files) - image_index
-        layout_mode = choose_layout(num_remaining, config)
-        if layout_mode == "single":
-            images_per_page = 1
-        elif layout_mode == "double":
-            images_per_page = 2
-        elif layout_mode == "four":
-            images_per_page = 4
-        else:
-            images_per_page = 1
-
-        if first_page_for_model and target_page is not None:
-            page = get_empty_page(doc, target_page)
-            if page is None:
-                page = doc.Pages.Add()
-        else:
-            page = get_empty_page(doc)
-            if page is None:
-                page = doc.Pages.Add()
-
-        page_width = doc.DocumentPreferences.PageWidth
-        page_height = doc.DocumentPreferences.PageHeight
-
-        frames = []
-        if images_per_page == 1:
-            frames.append([0, 0, page_height, page_width])
-        elif images_per_page == 2:
-            frames.append([0, 0, page_height, page_width / 2])
-            frames.append([0, page_width / 2, page_height, page_width])
-        elif images_per_page == 4:
-            frames.append([0, 0, page_height / 2, page_width / 2])
-            frames.append([0, page_width / 2, page_height / 2, page_width])
-            frames.append([page_height / 2, 0, page_height, page_width / 2])
-            frames.append([page_height / 2, page_width / 2, page_height, page_width])
-
-        for frame_bounds in frames:
-            if image_index >= len(image_files):
-                break
-            image_path = os.path.join(model_folder, image_files[image_index])
-            print(f"[INFO] Placing image: {image_path}")
-            rect = page.Rectangles.Add()
-            rect.GeometricBounds = frame_bounds
-            try:
-                rect.Place(image_path)
-                # Removed the Fit() call so the image fills the frame:
-                # rect.Graphics.Item(1).Fit()
-            except Exception as e:
-                print(f"[ERROR] Placing image {image_path}: {e}")
-            image_index += 1
-
-        # --- Before filling images on this page, click just outside the page region ---
-        # Get page's top-left and bottom-right based on ratios in config
-        region_top_left = config["text_frame_top_left_ratio"]
-        region_bottom_right = config["text_frame_bottom_right_ratio"]
-
-        # Convert ratios to actual pixel coordinates
-        screenshot = pyautogui.screenshot()
-        screen_w, screen_h = screenshot.size  # (width, height)
-
-        left = int(region_top_left[0] * screen_w)
-        top = int(region_top_left[1] * screen_h)
-        right = int(region_bottom_right[0] * screen_w)
-        bottom = int(region_bottom_right[1] * screen_h)
-
-        # Adjust the click position to just outside the page boundary
-        offset = 10  # You can adjust this offset as needed
-        click_x = right + offset  # Click just to the right of the page
-        click_y = top + offset  # Click just below the top-left corner of the page
-
-        # Move the mouse to this adjusted position and click
-        pyautogui.moveTo(click_x, click_y, duration=0.5)
-        pyautogui.click()
-
-        # --- Now press V to switch to the Selection Tool ---
-        pyautogui.press('v')
-
-        # Get the page selection region from config (if it exists)
-        region = retrieve_ratio_region(config)
-        if region is None:
-            ratio_tl, ratio_br = get_region_from_opencv()
-            config["text_frame_top_left_ratio"] = list(ratio_tl)
-            config["text_frame_bottom_right_ratio"] = list(ratio_br)
-            save_config(config, os.path.join(config["project_dir"], "config.json"))
-            region = retrieve_ratio_region(config)
-        (page_tl, page_br) = region
-
-        # Adjust the corners by a few pixels (e.g., 10 pixels)
-        selection_start = (page_tl[0] - offset, page_tl[1] - offset)
-        selection_end = (page_br[0] + offset, page_br[1] + offset)
-
-        # Drag to select all items on the page
-        pyautogui.moveTo(selection_start[0], selection_start[1], duration=0.5)
-        pyautogui.mouseDown()
-        pyautogui.moveTo(selection_end[0], selection_end[1], duration=1)
-        pyautogui.mouseUp()
-        time.sleep(0.5)
-
-        # Apply the fill command via the shortcut (ctrl+alt+shift+C)
-        pyautogui.hotkey('ctrl', 'alt', 'shift', 'c')
-
-        # --- Before adding text, click outside the page region again to deactivate any active frame ---
-        pyautogui.moveTo(click_x, click_y)  # Click outside the page region
-        pyautogui.click()
-
-        # --- Now press T to switch to the Type Tool ---
-        pyautogui.press('t')
-
-        if first_page_for_model and credits_text:
-            # Compute the text box coordinates based on the credits text.
-            region = retrieve_ratio_region(config)
-            if region is not None:
-                region_top_left, region_bottom_right = region
+    page_width = doc.DocumentPreferences.PageWidth
+    page_height = doc.DocumentPreferences.PageHeight
+    folder_plan = plan_folder(model_folder, config, page_width, page_height, target_page=target_page)
+    if folder_plan is not None:
+        place_folder_plan(doc, folder_plan, config, backend, pages=pages)
+
+# UI actions each page took when frames were filled through the UI: click off the page,
+# Selection tool, drag over the page (move, down, move, up), fill hotkey, click off the
+# page again, Type tool. Pages with typed credits still click off the page (two actions).
+FILL_UI_ACTIONS = 11
+DESELECT_UI_ACTIONS = 2
+
+def place_folder_plan(doc, folder_plan, config, backend, pages=None, resources=None):
+    """
+    Replay one model folder's planned pages over COM: acquire each page, add and
+    fill its image frames, and add the credits frame on the folder's first page.
+    No layout decision is taken here; everything comes from the planner.FolderPlan.
+    Frames are fitted with Fit() as they are placed, so a page needs no mouse or
+    keyboard action unless its credits are typed.
+    resources (a resources.DocumentResources) defaults to one for this folder alone.
+    Returns (pages used, frames placed, credits added).
+    """
+    if resources is None:
+        resources = DocumentResources.for_folders(doc, backend.app, [folder_plan])
+    # Typed credits take their page corners and box position from the folder's settings.
+    folder_config = compile_config(config).folder(folder_plan.folder)
+    frames_placed = 0
+    credits_added = 0
+
+    for page_plan in folder_plan.pages:
+        # Page boundary: the only place a run can be cancelled (see cancellation.py).
+        check_cancelled()
+        with span("page", category="page", layout=page_plan.layout, frames=len(page_plan.frames)):
+            page_images = frames_placed
+            target_page = page_plan.target
+            if pages is not None:
+                page = pages.acquire(target_page)
+            elif target_page is not None:
+                page = get_empty_page(doc, target_page)
+                if page is None:
+                    page = doc.Pages.Add()
             else:
-                ratio_tl, ratio_br = get_region_from_opencv()
-                config["text_frame_top_left_ratio"] = list(ratio_tl)
-                config["text_frame_bottom_right_ratio"] = list(ratio_br)
-                save_config(config, os.path.join(config["project_dir"], "config.json"))
-                region = retrieve_ratio_region(config)
-                region_top_left, region_bottom_right = region
-
-            box_tl, box_br, click_pt = compute_text_box_coordinates(region_top_left, region_bottom_right, config, credits_text)
-            insert_text_frame_and_type(credits_text, box_tl, box_br, click_pt, config, is_first_page=True)
-            first_page_for_model = False
-
-
-
-            
+                page = get_empty_page(doc)
+                if page is None:
+                    page = doc.Pages.Add()
+
+            for frame in page_plan.frames:
+                print(f"[INFO] Placing image: {frame.image}")
+                rect = page.Rectangles.Add()
+                rect.GeometricBounds = list(frame.bounds)
+                try:
+                    rect.Place(frame.image)
+                    # Fill the frame proportionally, as Ctrl+Alt+Shift+C does, without selecting anything.
+                    rect.Fit(FILL_PROPORTIONALLY)
+                    frames_placed += 1
+                except Exception as e:
+                    print(f"[ERROR] Placing image {frame.image}: {e}")
+            page_images = frames_placed - page_images
+
+            credits = page_plan.credits
+            if credits is not None:
+                with span("credits", folder=os.path.basename(folder_plan.folder)):
+                    credits_frame = None
+                    if config.get("credits_mode", "frame") != "typewrite":
+                        credits_frame = insert_credits_frame(doc, page, credits, resources)
+
+                    if credits_frame is None:
+                        # Typed credits need the page on screen (see page_region.py) and nothing selected:
+                        # click just outside the page to deactivate any active frame.
+                        page_aspect = doc.DocumentPreferences.PageWidth / doc.DocumentPreferences.PageHeight
+                        (page_tl, page_br) = backend.page_locator.region(folder_config, aspect=page_aspect)
+                        backend.ui.moveTo(page_br[0] + 10, page_tl[1] + 10)
+                        backend.ui.click()
+                        credits_text = credits.text.replace("\r", "\n")
+                        # Compute the text box coordinates based on the credits text.
+                        box_tl, box_br, click_pt = compute_text_box_coordinates(page_tl, page_br, folder_config, credits_text)
+                        insert_text_frame_and_type(credits_text, box_tl, box_br, click_pt, folder_config, backend, is_first_page=True,
+                                                   font=credits.font, color=credits.color, resources=resources)
+                    credits_added += 1
+        report_progress("page", images=page_images)
+
+    return len(folder_plan.pages), frames_placed, credits_added
 
 def cleanup_indd_files(project_dir, template_file, output_file):
     # Convert to lowercase for case-insensitive comparison.
@@ -504,14 +295,213 @@ def cleanup_indd_files(project_dir, template_file, output_file):
 # MAIN AUTOMATION FUNCTION
 ########################################
 
-def run_automation(config):
+def find_model_folders(project_dir):
+    """
+    Return the model folders of a project: subdirectories holding a Credits.txt
+    and at least one JPG image. Read from the project index (see project_index.py),
+    so repeated calls only stat the project's directories.
+    """
+    return load_project_index(project_dir).model_folders()
+
+def populate_document(doc, model_folders, config, backend, target_page=None, insert_after=None,
+                      checkpoint=None, working_path=None):
+    """
+    Place every model folder's images and credits into doc (over COM, or as one script), behind
+    insert_after if given; folders a checkpoint records as done are skipped. Returns the issue plan.
+    """
+    # Decide the whole issue before touching the document; the rest only replays the plan.
+    with span("plan"):
+        plan = cached_plan_issue(model_folders, config,
+                                 doc.DocumentPreferences.PageWidth,
+                                 doc.DocumentPreferences.PageHeight,
+                                 target_page=target_page if insert_after is None else None,
+                                 cache_dir=os.path.join(config["project_dir"], ".plan_cache"),
+                                 seed=checkpoint.seed if checkpoint is not None else None)
+    issue_plan = plan
+
+    # Optionally lay out against downscaled proxies and relink the originals at the end.
+    proxies = {}
+    if config.get("proxy_images"):
+        project_dir = config["project_dir"]
+        with span("proxies"):
+            index = ImageIndex(os.path.join(project_dir, ".image_index.json"))
+            index.scan([folder_plan.folder for folder_plan in plan.folders])
+            index.save()
+            proxies = generate_proxies(plan, config.get("proxy_dir") or os.path.join(project_dir, ".proxies"),
+                                       ppi=config.get("proxy_ppi", 150), index=index)
+            plan = plan_with_proxies(plan, proxies)
+
+    if checkpoint is not None:
+        checkpoint.begin(plan.seed)
+        done = [folder_plan for folder_plan in plan.folders if checkpoint.folder_done(folder_plan.folder)]
+        if done:
+            print(f"[INFO] Skipping {len(done)} model folder(s) finished by the interrupted run.")
+            plan = plan._replace(folders=tuple(folder_plan for folder_plan in plan.folders
+                                               if not checkpoint.folder_done(folder_plan.folder)))
+            if insert_after is not None:
+                insert_after = checkpoint.insert_after
+
+    report_progress("issue", folders=len(plan.folders),
+                    pages=sum(len(folder_plan.pages) for folder_plan in plan.folders))
+
+    if config.get("execution_mode", "com") == "script":
+        # Compile every page, frame and credits block into one ExtendScript
+        # program and run it with a single DoScript round trip.
+        from script_compiler import compile_plan, run_script
+        check_cancelled()
+        try:
+            with span("script", folders=len(plan.folders)):
+                summary = run_script(backend.app, compile_plan(plan, doc.Name, insert_after=insert_after,
+                                                               relink=proxies))
+        except Exception as e:
+            print("[ERROR] Running the compiled issue script failed:", e)
+            return issue_plan
+        report_progress("page", pages=summary["pages"], images=summary["frames"])
+        if checkpoint is not None and not summary["errors"]:
+            # The script is all or nothing, so its folders are checkpointed together.
+            results = {folder_plan.folder: (len(folder_plan.pages),
+                                            sum(len(page.frames) for page in folder_plan.pages),
+                                            sum(1 for page in folder_plan.pages if page.credits is not None))
+                       for folder_plan in plan.folders}
+            if insert_after is not None:
+                insert_after += summary["pages"]
+            checkpoint.commit_folders(doc, working_path, results, insert_after=insert_after)
+        return issue_plan
+
+    if insert_after is not None:
+        pages = InsertionCursor(doc, doc.Pages.Item(insert_after))
+    else:
+        pages = EmptyPageAllocator(doc)
+    # Every swatch and font the credits need, resolved before the first page.
+    with span("resources"):
+        resources = DocumentResources.for_folders(doc, backend.app, plan.folders)
+
+    for folder_plan in plan.folders:
+        print(f"[INFO] Processing model folder: {folder_plan.folder}")
+        report_progress("folder", folder=os.path.basename(folder_plan.folder))
+        with span("folder", category="folder", folder=os.path.basename(folder_plan.folder),
+                  pages=len(folder_plan.pages)):
+            counts = place_folder_plan(doc, folder_plan, config, backend, pages=pages, resources=resources)
+            if checkpoint is not None:
+                if insert_after is not None:
+                    insert_after += counts[0]
+                with span("checkpoint"):
+                    checkpoint.commit_folders(doc, working_path, {folder_plan.folder: counts},
+                                              insert_after=insert_after)
+
+    if proxies:
+        with span("relink"):
+            relink_originals(doc, proxies)
+
+    page_count = sum(len(folder_plan.pages) for folder_plan in plan.folders)
+    typed = 0
+    if config.get("credits_mode", "frame") == "typewrite":
+        typed = sum(1 for folder_plan in plan.folders for page in folder_plan.pages if page.credits is not None)
+    print(f"[INFO] Frames filled over COM: {page_count * FILL_UI_ACTIONS - typed * DESELECT_UI_ACTIONS} "
+          f"UI actions eliminated on {page_count} pages.")
+    return issue_plan
+
+def run_inplace_assembly(config, backend):
+    """
+    Single-pass alternative to split -> temp -> merge (config["assembly_mode"] = "inplace").
+    Open the template once, insert the generated pages directly after split_page,
+    drop the split page itself (as the split does) and save the result as output.indd.
+    config["target_page"] does not apply: the pages go where split_page is.
+    No template page is copied and only one document is saved.
+    Returns the output path, or None when the run stopped early.
+    """
+    project_dir   = config["project_dir"]
+    template_path = os.path.join(project_dir, config["template_file"])
+    output_path   = os.path.join(project_dir, "output.indd")
+    split_page    = config["split_page"]
+
+    if config.get("target_page") is not None:
+        print("[WARN] target_page is ignored with assembly_mode \"inplace\": "
+              "the pages are inserted after split_page.")
+
+    with span("folder scan"):
+        model_folders = find_model_folders(project_dir)
+    if not model_folders:
+        print("[WARN] No model folders found (folders with Credits.txt and JPG images).")
+        return
+
+    checkpoint = None
+    working_path = os.path.join(project_dir, "temp.indd")
+    if config.get("checkpoints", False):
+        checkpoint = RunCheckpoint.load(project_dir, run_key(config, model_folders))
+
+    try:
+        indesign = backend.app
+    except Exception as e:
+        print("[ERROR] Unable to launch InDesign:", e)
+        return
+
+    # A template seen before is validated from its page map without opening it.
+    template_maps = template_map_cache(config)
+    page_map = template_maps.get(template_path)
+    if page_map is not None and not 1 <= split_page <= page_map.page_count:
+        print("Invalid split page number")
+        return
+
+    # Continue from the working copy an interrupted run saved, if there is one.
+    resume_path = checkpoint.resume_document() if checkpoint is not None else None
+    try:
+        with span("open template"):
+            doc = indesign.Open(resume_path or template_path)
+    except Exception as e:
+        print("[ERROR] Unable to open template:", e)
+        return
+
+    if page_map is None and not resume_path:
+        page_map = template_maps.record(template_path, doc)
+        template_maps.save()
+    # The map describes the template, not a resumed working copy.
+    total_pages = page_map.page_count if page_map is not None and not resume_path else doc.Pages.Count
+    if split_page < 1 or split_page > total_pages:
+        print("Invalid split page number")
+        doc.Close(SAVE_NO)
+        return
+    marker_page = doc.Pages.Item(split_page)
+
+    # Laid out as single pages, like the split/merge working document.
+    try:
+        doc.DocumentPreferences.FacingPages = False
+    except Exception:
+        pass
+
+    with span("populate"):
+        plan = populate_document(doc, model_folders, config, backend, insert_after=split_page,
+                                 checkpoint=checkpoint, working_path=working_path)
+
+    try:
+        with span("save"):
+            marker_page.Delete()
+            doc.Save(output_path)
+        print("[INFO] Document saved to:", output_path)
+    except Exception as e:
+        print("[ERROR] Saving document:", e)
+        return
+    if config.get("incremental"):
+        record_build(config, plan, doc.Pages.Count)
+    doc.Close(SAVE_NO)
+
+    checkpoint_saves = 0
+    if checkpoint is not None:
+        checkpoint_saves = checkpoint.saves
+        checkpoint.discard()
+        if os.path.exists(working_path):
+            os.remove(working_path)
+    print(f"[INFO] Assembly (inplace): 0 page copies, {1 + checkpoint_saves} document(s) saved.")
+    return output_path
+
+def run_split_merge_assembly(config, backend):
     """
     Open the InDesign template and process each model folder (subdirectories with a Credits.txt and JPG images).
     The template is first split into two documents based on a user-given empty page number.
     Automation is performed on the start document, and then the finish document is merged back.
     Finally, after all text boxes have been created, their positions are saved and the line spacing is adjusted.
+    Returns the output path, or None when the run stopped early.
     """
-
     project_dir   = config["project_dir"]
     template_file = config["template_file"]
     template_path = os.path.join(project_dir, template_file)
@@ -521,18 +511,44 @@ def run_automation(config):
     split_page = config["split_page"]
 
     indd_files = [start_file, temp_path, finish_file]
-    
-    split_template(template_path, start_file, finish_file, split_page)
+
+    # Progress of an interrupted run with the same inputs is picked up again.
+    checkpoint = None
+    if config.get("checkpoints", False):
+        checkpoint = RunCheckpoint.load(project_dir, run_key(config, find_model_folders(project_dir)))
+
+    split_copies = 0
+    if checkpoint is not None and checkpoint.stage_done("split") and \
+            os.path.exists(start_file) and os.path.exists(finish_file):
+        print("[INFO] Reusing start and finish documents of the interrupted run.")
+    else:
+        # A template seen before is validated from its page map without opening it.
+        template_maps = template_map_cache(config)
+        page_map = template_maps.get(template_path)
+        if page_map is not None and not 1 <= split_page <= page_map.page_count:
+            print("Invalid split page number")
+            return
+        with span("split"):
+            split_copies = split_template(template_path, start_file, finish_file, split_page, app=backend.app,
+                                          template_maps=template_maps)
+        template_maps.save()
+        if checkpoint is not None and split_copies:
+            checkpoint.mark_stage("split")
 
     try:
-        indesign = win32com.client.Dispatch("InDesign.Application")
+        indesign = backend.app
     except Exception as e:
         print("[ERROR] Unable to launch InDesign:", e)
         return
 
+    resume_path = checkpoint.resume_document() if checkpoint is not None else None
     try:
-        doc = indesign.Documents.Add()
-        doc.Save(temp_path)
+        with span("new document"):
+            if resume_path:
+                doc = indesign.Open(resume_path)
+            else:
+                doc = indesign.Documents.Add()
+                doc.Save(temp_path)
     except Exception as e:
         print("[ERROR] Unable to open template:", e)
         return
@@ -547,35 +563,16 @@ def run_automation(config):
 
     target_page = config.get("target_page", None)
 
-    model_folders = []
-    for entry in os.listdir(project_dir):
-        full_path = os.path.join(project_dir, entry)
-        if os.path.isdir(full_path):
-            if os.path.isfile(os.path.join(full_path, "Credits.txt")):
-                jpg_files = [f for f in os.listdir(full_path) if f.lower().endswith(".jpg")]
-                if jpg_files:
-                    model_folders.append(full_path)
+    with span("folder scan"):
+        model_folders = find_model_folders(project_dir)
 
     if not model_folders:
         print("[WARN] No model folders found (folders with Credits.txt and JPG images).")
         return
 
-    for i, model_folder in enumerate(model_folders):
-        print(f"[INFO] Processing model folder: {model_folder}")
-        tp = target_page if i == 0 and target_page is not None else None
-        place_model_images(working_doc, model_folder, config, target_page=tp)
-        
-
-    # --- AFTER ALL TEXT IS WRITTEN, ADJUST THE LINE SPACING FOR ALL SAVED TEXT FRAMES ---
-    try:
-        new_leading_factor = config.get("leading_decrease_factor", 0.8)
-        base_size = config.get("credits_font_size", 24)
-        new_leading = base_size * new_leading_factor
-        for tf in created_text_frames:
-            tf.ParentStory.Leading = new_leading
-        print(f"[INFO] Adjusted line spacing (leading) to {new_leading} for {len(created_text_frames)} text frames.")
-    except Exception as e:
-        print("[ERROR] Adjusting line spacing for saved text frames failed:", e)
+    with span("populate"):
+        plan = populate_document(working_doc, model_folders, config, backend, target_page=target_page,
+                                 checkpoint=checkpoint, working_path=temp_path)
 
     temp_path = os.path.join(project_dir, "temp.indd")
     output_path = os.path.join(project_dir, "output.indd")
@@ -583,18 +580,87 @@ def run_automation(config):
     try:
         if os.path.exists(temp_path):
             os.remove(temp_path)
-        working_doc.Save(temp_path)
+        with span("save"):
+            working_doc.Save(temp_path)
         print("[INFO] Document saved to:", temp_path)
         
     except Exception as e:
         print("[ERROR] Saving document:", e)
 
     
-    merge_indd_files(indd_files, output_path)
+    with span("merge"):
+        merge_copies = merge_indd_files(indd_files, output_path, app=backend.app)
+    if config.get("incremental"):
+        # Every page of output.indd is one copy made by the merge.
+        record_build(config, plan, merge_copies)
 
     output_file = "output.indd"
 
-    cleanup_indd_files(project_dir, template_file, output_file)
+    with span("cleanup"):
+        cleanup_indd_files(project_dir, template_file, output_file)
+
+    checkpoint_saves = 0
+    if checkpoint is not None:
+        checkpoint_saves = checkpoint.saves
+        checkpoint.discard()
+
+    # start, finish, temp (twice) and the merged output, plus one save per checkpoint.
+    print(f"[INFO] Assembly (split_merge): {(split_copies or 0) + (merge_copies or 0)} page copies, "
+          f"{5 + checkpoint_saves} documents saved.")
+    return output_path
+
+def run_automation(config, backend=None, tracer=None):
+    """
+    Build the issue of config["project_dir"] with the given backend (config["backend"] by default).
+    Returns the path of output.indd, or None when the run stopped early.
+    """
+    config = compile_config(config)
+    if backend is None:
+        backend = create_backend(config)
+
+    profiler = None
+    if config.get("profile_com", False):
+        profiler = backend.enable_profiling()
+        profiler.reset()
+    property_cache = None
+    if config.get("property_cache", True):
+        property_cache = backend.enable_property_cache()
+        property_cache.reset()
+    waiter = backend.waiter.configure(config)
+    waiter.reset()
+    locator = backend.page_locator
+
+    if tracer is None and config.get("trace", True):
+        tracer = Tracer()
+    try:
+        with tracer.activate() if tracer is not None else contextlib.nullcontext():
+            with span("run_automation", project=os.path.basename(config["project_dir"]),
+                      assembly_mode=config.get("assembly_mode", "split_merge"),
+                      execution_mode=config.get("execution_mode", "com")):
+                # With config["incremental"], only the pages of changed model folders are
+                # regenerated in the existing output.indd (see rebuild.py).
+                if config.get("incremental") and rebuild_changed_folders(config, backend,
+                                                                         find_model_folders(config["project_dir"])):
+                    return os.path.join(config["project_dir"], "output.indd")
+                if config.get("assembly_mode", "split_merge") == "inplace":
+                    return run_inplace_assembly(config, backend)
+                return run_split_merge_assembly(config, backend)
+    finally:
+        if profiler is not None:
+            print(profiler.report(config.get("profile_report_limit", 15)))
+        if property_cache is not None:
+            print(property_cache.report())
+        if waiter.stats:
+            print(waiter.report())
+        if locator.detected or locator.reused:
+            print(locator.report())
+        if tracer is not None:
+            trace_path = os.path.join(config["project_dir"], "output.trace.json")
+            try:
+                tracer.write(trace_path)
+                print("[INFO] Stage trace saved to:", trace_path)
+            except OSError as e:
+                print(f"[WARN] Could not write stage trace {trace_path}: {e}")
 
 
 if __name__ == "__main__":
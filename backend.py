@@ -0,0 +1,887 @@
+#!/usr/bin/env python
+# backend.py
+
+import json
+import os
+import re
+import time
+from collections import Counter
+
+########################################
+# INDESIGN CONSTANTS
+########################################
+
+# Enumeration values as exposed through the InDesign COM type library.
+AFTER = 1634104421          # LocationOptions.AFTER
+BEFORE = 1650812527         # LocationOptions.BEFORE
+AT_END = 1701733408         # LocationOptions.AT_END
+FILL_PROPORTIONALLY = 1718185072  # FitOptions.FILL_PROPORTIONALLY, as Ctrl+Alt+Shift+C applies it
+JAVASCRIPT = 1246973031     # ScriptLanguage.JAVASCRIPT
+SAVE_NO = 1852776480        # SaveOptions.NO
+
+########################################
+# BACKEND INTERFACE
+########################################
+
+class DocumentBackend:
+    """
+    One application session (backend.app: Documents, Open, DoScript) and the UI driver
+    for the mouse and keyboard steps; anything answering to the InDesign COM names fits.
+    """
+    name = "base"
+
+    def __init__(self):
+        self._connection = None
+        self._app = None
+        self._ui = None
+        self._waiter = None
+        self._page_locator = None
+        self.profiler = None
+        self.property_cache = None
+
+    @property
+    def connection(self):
+        """The application object itself, without the profiling and caching proxies."""
+        if self._connection is None:
+            self._connection = self.connect()
+        return self._connection
+
+    @property
+    def app(self):
+        # The application behind its proxies: the property cache answers first,
+        # so the profiler only times the calls that reach the application.
+        if self._app is None:
+            self._app = self.connection
+            if self.profiler is not None:
+                self._app = self.profiler.wrap(self._app)
+            if self.property_cache is not None:
+                self._app = self.property_cache.wrap(self._app)
+        return self._app
+
+    def enable_profiling(self, profiler=None):
+        """
+        Time every application call from now on (see profiler.py) and return the
+        profiler. Calling it again keeps the profiler already in place.
+        """
+        if self.profiler is None:
+            from profiler import ComProfiler
+            self.profiler = profiler or ComProfiler()
+            self._app = None
+        return self.profiler
+
+    def enable_property_cache(self, cache=None):
+        """
+        Answer repeated reads of page sizes, page counts and pages by number from
+        a cache from now on (see com_cache.py) and return the cache. Calling it
+        again keeps the cache already in place.
+        """
+        if self.property_cache is None:
+            from com_cache import PropertyCache
+            self.property_cache = cache or PropertyCache()
+            self._app = None
+        return self.property_cache
+
+    @property
+    def ui(self):
+        if self._ui is None:
+            self._ui = self.create_ui()
+        return self._ui
+
+    @property
+    def waiter(self):
+        """The session's wait.Waiter, for the UI steps that have to wait on the application."""
+        if self._waiter is None:
+            from wait import Waiter
+            self._waiter = Waiter(self)
+        return self._waiter
+
+    @property
+    def page_locator(self):
+        """The session's page_region.PageLocator: where the page being built is on screen."""
+        if self._page_locator is None:
+            from page_region import PageLocator
+            self._page_locator = PageLocator(self)
+        return self._page_locator
+
+    def connect(self):
+        """Return the application object for this session."""
+        raise NotImplementedError
+
+    def create_ui(self):
+        """Return the mouse/keyboard driver for this session."""
+        raise NotImplementedError
+
+
+class ComBackend(DocumentBackend):
+    """The real thing: InDesign over COM, driven with pyautogui."""
+    name = "com"
+
+    def __init__(self, prog_id="InDesign.Application"):
+        super().__init__()
+        self.prog_id = prog_id
+
+    def connect(self):
+        import win32com.client
+        return win32com.client.Dispatch(self.prog_id)
+
+    def create_ui(self):
+        return PyAutoGuiDriver()
+
+
+class PyAutoGuiDriver:
+    """
+    Pass-through to pyautogui. Exposes the pyautogui names the pipeline uses
+    (press, hotkey, moveTo, mouseDown, mouseUp, click, typewrite, screenshot, size)
+    plus sleep(), so a recording driver can stand in for it.
+    """
+
+    def __init__(self):
+        import pyautogui
+        pyautogui.FAILSAFE = False
+        self._gui = pyautogui
+
+    def __getattr__(self, name):
+        return getattr(self._gui, name)
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+def create_backend(config=None):
+    """
+    Return the backend selected by config["backend"] ("com" by default).
+    Options for the fake backend are read from config["fake_backend"].
+    """
+    config = config or {}
+    name = config.get("backend", "com")
+    if name == "com":
+        return ComBackend()
+    if name == "fake":
+        return FakeBackend(**config.get("fake_backend", {}))
+    raise ValueError(f"Unknown document backend: {name}")
+
+########################################
+# CALL RECORDING
+########################################
+
+class CallLog:
+    """
+    Every operation performed against a fake backend, in order, as
+    (operation, args, seconds) tuples. ui_wait accumulates the dead time the
+    UI driver was asked to spend (sleeps, animated moves, typing intervals).
+    """
+
+    def __init__(self):
+        self.records = []
+        self.ui_wait = 0.0
+
+    def record(self, op, args, elapsed):
+        self.records.append((op, args, elapsed))
+
+    def clear(self):
+        self.records = []
+        self.ui_wait = 0.0
+
+    def counts(self):
+        return Counter(op for op, _, _ in self.records)
+
+    def count(self, op):
+        return sum(1 for name, _, _ in self.records if name == op)
+
+    def total_time(self):
+        return sum(elapsed for _, _, elapsed in self.records)
+
+    def summary(self, limit=20):
+        """Return a printable table of the most frequent operations."""
+        counts = self.counts()
+        lines = [f"{len(self.records)} calls, {self.total_time():.3f}s simulated latency, "
+                 f"{self.ui_wait:.1f}s UI dead time"]
+        for op, n in counts.most_common(limit):
+            lines.append(f"  {n:8d}  {op}")
+        return "\n".join(lines)
+
+########################################
+# IN-MEMORY FAKE
+########################################
+
+class FakeComError(Exception):
+    """Raised where the COM backend would raise pywintypes.com_error."""
+
+
+class FakeBackend(DocumentBackend):
+    """
+    An in-memory stand-in for InDesign that records every call ("Pages.Item", "Rectangle.GeometricBounds=")
+    in self.log, with optional latency. Saved documents live in self.disk (and on disk with persist=True).
+    """
+    name = "fake"
+
+    def __init__(self, latency=None, default_latency=0.0, template_pages=16,
+                 template_empty_pages=(8,), page_size=(612.0, 792.0),
+                 screen_size=(1920, 1080), page_on_screen=(0.298, 0.106, 0.651, 0.918),
+                 simulate_sleeps=False, persist=False,
+                 fonts=("Arial\tRegular", "Arial\tBold", "Blackadder ITC\tRegular",
+                        "Minion Pro\tRegular", "Minion Pro\tBold")):
+        super().__init__()
+        self.fonts = tuple(fonts)
+        self.latency = dict(latency or {})
+        self.default_latency = default_latency
+        self.template_pages = template_pages
+        self.template_empty_pages = set(template_empty_pages)
+        self.page_size = tuple(page_size)
+        self.screen_size = tuple(screen_size)
+        self.page_on_screen = tuple(page_on_screen) if page_on_screen else None
+        self.simulate_sleeps = simulate_sleeps
+        self.persist = persist
+        self.disk = {}
+        self.log = CallLog()
+
+    def connect(self):
+        return FakeApplication(self)
+
+    def create_ui(self):
+        return FakeUiDriver(self)
+
+    def call(self, op, args=()):
+        delay = self.latency.get(op, self.default_latency)
+        start = time.perf_counter()
+        if delay:
+            time.sleep(delay)
+        self.log.record(op, args, time.perf_counter() - start)
+
+    def write(self, path, snapshot):
+        self.disk[os.path.normcase(os.path.abspath(path))] = snapshot
+        if self.persist:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+
+    def read(self, path):
+        key = os.path.normcase(os.path.abspath(path))
+        if key in self.disk:
+            return self.disk[key]
+        if self.persist and os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+                if snapshot.get("fake_indesign"):
+                    return snapshot
+            except (ValueError, UnicodeDecodeError):
+                pass
+        return None
+
+
+def _recorded(name):
+    """A property whose reads and writes are recorded as backend calls."""
+    def getter(self):
+        self._call(name)
+        return self._props.get(name)
+
+    def setter(self, value):
+        self._call(name + "=", value)
+        self._props[name] = value
+
+    return property(getter, setter)
+
+
+def _plain(value):
+    """Reduce a property value to something JSON can store."""
+    if isinstance(value, (FakeColor, FakeStyle)):
+        return value._props.get("Name")
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+class _FakeObject:
+    kind = "Object"
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._props = {}
+
+    def _call(self, member, *args):
+        self._backend.call(self.kind + "." + member, args)
+
+
+class _FakeCollection(_FakeObject):
+    """A read-only 1-indexed collection over a callable returning a list."""
+
+    def __init__(self, backend, kind, source):
+        super().__init__(backend)
+        self.kind = kind
+        self._source = source
+
+    @property
+    def Count(self):
+        self._call("Count")
+        return len(self._source())
+
+    def Item(self, index):
+        self._call("Item", index)
+        items = self._source()
+        if isinstance(index, str):
+            for item in items:
+                if item._props.get("Name") == index:
+                    return item
+            raise FakeComError(f"{self.kind}: no item named {index!r}")
+        if index < 1 or index > len(items):
+            raise FakeComError(f"{self.kind}: index {index} out of range")
+        return items[index - 1]
+
+
+class FakeApplication(_FakeObject):
+    kind = "Application"
+
+    def __init__(self, backend):
+        super().__init__(backend)
+        self._documents = []
+        self._untitled = 0
+        self.Documents = FakeDocuments(backend, self)
+        fonts = []
+        for name in backend.fonts:
+            font = FakeFont(backend)
+            font._props["Name"] = name
+            fonts.append(font)
+        self.Fonts = _FakeCollection(backend, "Fonts", lambda: fonts)
+
+    @property
+    def ActiveDocument(self):
+        self._call("ActiveDocument")
+        if not self._documents:
+            raise FakeComError("No documents are open.")
+        return self._documents[-1]
+
+    def Open(self, path, show_window=True):
+        self._call("Open", path)
+        snapshot = self._backend.read(path)
+        doc = FakeDocument(self._backend, self, os.path.basename(path))
+        doc._full_name = path
+        if snapshot is not None:
+            doc._load(snapshot)
+        else:
+            for index in range(1, self._backend.template_pages + 1):
+                page = doc._new_page()
+                if index not in self._backend.template_empty_pages:
+                    item = FakeRectangle(self._backend, page)
+                    item._props["GeometricBounds"] = [0, 0, 10, 10]
+                    page._items.append(item)
+        self._documents.append(doc)
+        return doc
+
+    def DoScript(self, script, language=JAVASCRIPT, arguments=None):
+        self._call("DoScript", len(script))
+        from script_compiler import PLAN_MARKER, emulate_script
+        if PLAN_MARKER in script:
+            return emulate_script(self, script)
+        match = re.match(r"app\.documents\.itemByName\('(.*)'\)\.close\(", script)
+        if match:
+            for doc in list(self._documents):
+                if doc._props.get("Name") == match.group(1):
+                    self._documents.remove(doc)
+                    break
+        return None
+
+
+class FakeDocuments(_FakeCollection):
+
+    def __init__(self, backend, app):
+        super().__init__(backend, "Documents", lambda: app._documents)
+        self._app = app
+
+    def Add(self):
+        self._call("Add")
+        self._app._untitled += 1
+        doc = FakeDocument(self._backend, self._app, f"Untitled-{self._app._untitled}")
+        doc._new_page()
+        self._app._documents.append(doc)
+        return doc
+
+
+class FakeDocumentPreferences(_FakeObject):
+    kind = "DocumentPreferences"
+    PageWidth = _recorded("PageWidth")
+    PageHeight = _recorded("PageHeight")
+    FacingPages = _recorded("FacingPages")
+
+
+class FakeDocument(_FakeObject):
+    kind = "Document"
+
+    def __init__(self, backend, app, name):
+        super().__init__(backend)
+        self._app = app
+        self._pages = []
+        self._colors = []
+        self._paragraph_styles = []
+        self._character_styles = []
+        self._selection = []
+        self._full_name = None
+        self._props["Name"] = name
+        self.DocumentPreferences = FakeDocumentPreferences(backend)
+        width, height = backend.page_size
+        self.DocumentPreferences._props.update(PageWidth=width, PageHeight=height, FacingPages=True)
+        for swatch in ("Black", "Paper", "Registration"):
+            color = FakeColor(backend, self)
+            color._props["Name"] = swatch
+            self._colors.append(color)
+        self._paragraph_styles.append(FakeStyle(backend, "ParagraphStyle", "[Basic Paragraph]"))
+        self._character_styles.append(FakeStyle(backend, "CharacterStyle", "[None]"))
+        self.Pages = FakePages(backend, self)
+        self.Colors = FakeColors(backend, self)
+        self.ParagraphStyles = FakeStyles(backend, "ParagraphStyles", "ParagraphStyle", self._paragraph_styles)
+        self.CharacterStyles = FakeStyles(backend, "CharacterStyles", "CharacterStyle", self._character_styles)
+        self.Selection = _FakeCollection(backend, "Selection", lambda: self._selection)
+        self.TextFrames = _FakeCollection(backend, "TextFrames", self._text_frames)
+        self.Links = _FakeCollection(backend, "Links", self._links)
+
+    Name = _recorded("Name")
+
+    @property
+    def FullName(self):
+        self._call("FullName")
+        return self._full_name
+
+    def _new_page(self, index=None):
+        page = FakePage(self._backend, self)
+        if index is None:
+            self._pages.append(page)
+        else:
+            self._pages.insert(index, page)
+        return page
+
+    def _text_frames(self):
+        return [item for page in self._pages for item in page._items
+                if isinstance(item, FakeTextFrame)]
+
+    def _links(self):
+        return [FakeLink(self._backend, item) for page in self._pages for item in page._items
+                if item._props.get("Graphic")]
+
+    def Save(self, path=None):
+        self._call("Save", path)
+        if path is not None:
+            self._full_name = path
+            self._props["Name"] = os.path.basename(path)
+        if self._full_name is None:
+            raise FakeComError("Document has never been saved; a path is required.")
+        self._backend.write(self._full_name, self._snapshot())
+        return self
+
+    def Close(self, saving=SAVE_NO):
+        self._call("Close")
+        if self in self._app._documents:
+            self._app._documents.remove(self)
+
+    def _snapshot(self):
+        prefs = self.DocumentPreferences._props
+        return {
+            "fake_indesign": 1,
+            "page_width": prefs["PageWidth"],
+            "page_height": prefs["PageHeight"],
+            "colors": [{k: _plain(v) for k, v in c._props.items()} for c in self._colors],
+            "paragraph_styles": [{k: _plain(v) for k, v in s._props.items()} for s in self._paragraph_styles],
+            "character_styles": [{k: _plain(v) for k, v in s._props.items()} for s in self._character_styles],
+            "pages": [[item._snapshot() for item in page._items] for page in self._pages],
+        }
+
+    def _load(self, snapshot):
+        self.DocumentPreferences._props.update(
+            PageWidth=snapshot["page_width"], PageHeight=snapshot["page_height"])
+        self._colors = []
+        for props in snapshot.get("colors", []):
+            color = FakeColor(self._backend, self)
+            color._props.update(props)
+            self._colors.append(color)
+        for key, kind, styles in (("paragraph_styles", "ParagraphStyle", self._paragraph_styles),
+                                  ("character_styles", "CharacterStyle", self._character_styles)):
+            if key in snapshot:
+                styles[:] = []
+                for props in snapshot[key]:
+                    style = FakeStyle(self._backend, kind)
+                    style._props.update(props)
+                    styles.append(style)
+        for items in snapshot["pages"]:
+            page = self._new_page()
+            for data in items:
+                page._items.append(_item_from_snapshot(self._backend, page, data))
+
+
+class FakePages(_FakeCollection):
+
+    def __init__(self, backend, doc):
+        super().__init__(backend, "Pages", lambda: doc._pages)
+        self._doc = doc
+
+    def Add(self, at=AT_END, reference=None):
+        self._call("Add")
+        if reference is None or at == AT_END:
+            return self._doc._new_page()
+        index = self._doc._pages.index(reference)
+        return self._doc._new_page(index + 1 if at == AFTER else index)
+
+
+class FakePage(_FakeObject):
+    kind = "Page"
+
+    def __init__(self, backend, doc):
+        super().__init__(backend)
+        self._doc = doc
+        self._items = []
+        self.PageItems = _FakeCollection(backend, "PageItems", lambda: self._items)
+        self.Rectangles = FakeItems(backend, self, "Rectangles", FakeRectangle)
+        self.TextFrames = FakeItems(backend, self, "TextFrames", FakeTextFrame)
+
+    @property
+    def Name(self):
+        self._call("Name")
+        return str(self._doc._pages.index(self) + 1)
+
+    @property
+    def DocumentOffset(self):
+        self._call("DocumentOffset")
+        return self._doc._pages.index(self)
+
+    def Duplicate(self, at=AT_END, reference=None):
+        self._call("Duplicate")
+        if reference is None:
+            target_doc, index = self._doc, len(self._doc._pages)
+        else:
+            target_doc = reference._doc
+            index = target_doc._pages.index(reference)
+            index = index + 1 if at == AFTER else index
+        page = target_doc._new_page(index)
+        for item in self._items:
+            page._items.append(_item_from_snapshot(self._backend, page, item._snapshot()))
+        if target_doc is not self._doc:
+            # Like InDesign, bring the source's swatches and styles along (by name) into the other document.
+            for source, target in ((self._doc._colors, target_doc._colors),
+                                   (self._doc._paragraph_styles, target_doc._paragraph_styles),
+                                   (self._doc._character_styles, target_doc._character_styles)):
+                names = {entry._props.get("Name") for entry in target}
+                target.extend(entry for entry in source if entry._props.get("Name") not in names)
+        return page
+
+    def Delete(self):
+        self._call("Delete")
+        self._doc._pages.remove(self)
+
+
+class FakeItems(_FakeCollection):
+    """Page.Rectangles / Page.TextFrames: the page items of one type."""
+
+    def __init__(self, backend, page, kind, item_class):
+        super().__init__(backend, kind,
+                         lambda: [i for i in page._items if isinstance(i, item_class)])
+        self._page = page
+        self._item_class = item_class
+
+    def Add(self):
+        self._call("Add")
+        item = self._item_class(self._backend, self._page)
+        self._page._items.append(item)
+        return item
+
+
+class _FakePageItem(_FakeObject):
+
+    def __init__(self, backend, page):
+        super().__init__(backend)
+        self._page = page
+
+    GeometricBounds = _recorded("GeometricBounds")
+
+    def Delete(self):
+        self._call("Delete")
+        self._page._items.remove(self)
+
+    def _snapshot(self):
+        data = {k: _plain(v) for k, v in self._props.items()}
+        data["type"] = self.kind
+        return data
+
+
+class FakeRectangle(_FakePageItem):
+    kind = "Rectangle"
+
+    def __init__(self, backend, page):
+        super().__init__(backend, page)
+        self.Graphics = _FakeCollection(
+            backend, "Graphics",
+            lambda: [self] if self._props.get("Graphic") else [])
+
+    def Place(self, path):
+        self._call("Place", path)
+        self._props["Graphic"] = path
+
+    def Fit(self, option):
+        self._call("Fit", option)
+
+
+class FakeLink(_FakeObject):
+    """The link of a placed graphic; relinking changes what the frame shows."""
+    kind = "Link"
+
+    def __init__(self, backend, rectangle):
+        super().__init__(backend)
+        self._rectangle = rectangle
+
+    @property
+    def FilePath(self):
+        self._call("FilePath")
+        return self._rectangle._props.get("Graphic")
+
+    def Relink(self, path):
+        self._call("Relink", path)
+        self._rectangle._props["Graphic"] = path
+
+    def Update(self):
+        self._call("Update")
+
+
+class FakeTextFrame(_FakePageItem):
+    kind = "TextFrame"
+
+    def __init__(self, backend, page):
+        super().__init__(backend, page)
+        self._props["Contents"] = ""
+        self.ParentStory = FakeStory(backend, self)
+
+    Contents = _recorded("Contents")
+
+    def _snapshot(self):
+        data = super()._snapshot()
+        data["story"] = {k: _plain(v) for k, v in self.ParentStory._props.items()}
+        paragraphs = [{k: _plain(v) for k, v in text._props.items()} for text in self.ParentStory._paragraph_texts]
+        if any(paragraphs):
+            data["paragraphs"] = paragraphs
+        return data
+
+
+class FakeText(_FakeObject):
+    """A range of story text; formatting writes are recorded but not split out."""
+    kind = "Text"
+    AppliedFont = _recorded("AppliedFont")
+    PointSize = _recorded("PointSize")
+    FillColor = _recorded("FillColor")
+    Leading = _recorded("Leading")
+    AppliedParagraphStyle = _recorded("AppliedParagraphStyle")
+    AppliedCharacterStyle = _recorded("AppliedCharacterStyle")
+
+
+class FakeStory(FakeText):
+    kind = "Story"
+
+    def __init__(self, backend, frame):
+        super().__init__(backend)
+        self._frame = frame
+        self.Texts = _FakeCollection(backend, "Texts", lambda: [self])
+        self.Paragraphs = _FakeCollection(backend, "Paragraphs", self._paragraphs)
+        # Paragraph formatting is kept until the contents change.
+        self._paragraph_texts = []
+        self._paragraph_contents = None
+
+    @property
+    def Contents(self):
+        self._call("Contents")
+        return self._frame._props.get("Contents") or ""
+
+    def _paragraphs(self):
+        contents = self._frame._props.get("Contents") or ""
+        if contents != self._paragraph_contents:
+            lines = re.split(r"\r|\n", contents) if contents else []
+            self._paragraph_texts = [FakeText(self._backend) for _ in lines]
+            self._paragraph_contents = contents
+        return self._paragraph_texts
+
+
+class FakeColor(_FakeObject):
+    kind = "Color"
+
+    def __init__(self, backend, doc):
+        super().__init__(backend)
+        self._doc = doc
+
+    Name = _recorded("Name")
+    ColorValue = _recorded("ColorValue")
+
+
+class FakeFont(_FakeObject):
+    kind = "Font"
+
+    Name = _recorded("Name")
+
+
+class FakeStyle(_FakeObject):
+    """A paragraph or character style."""
+
+    def __init__(self, backend, kind, name=None):
+        super().__init__(backend)
+        self.kind = kind
+        if name is not None:
+            self._props["Name"] = name
+
+    Name = _recorded("Name")
+    AppliedFont = _recorded("AppliedFont")
+    PointSize = _recorded("PointSize")
+    FillColor = _recorded("FillColor")
+    Leading = _recorded("Leading")
+
+
+class FakeStyles(_FakeCollection):
+
+    def __init__(self, backend, kind, style_kind, styles):
+        super().__init__(backend, kind, lambda: styles)
+        self._style_kind = style_kind
+        self._styles = styles
+
+    def Add(self):
+        self._call("Add")
+        style = FakeStyle(self._backend, self._style_kind)
+        self._styles.append(style)
+        return style
+
+
+class FakeColors(_FakeCollection):
+
+    def __init__(self, backend, doc):
+        super().__init__(backend, "Colors", lambda: doc._colors)
+        self._doc = doc
+
+    def Add(self):
+        self._call("Add")
+        color = FakeColor(self._backend, self._doc)
+        self._doc._colors.append(color)
+        return color
+
+
+def _item_from_snapshot(backend, page, data):
+    item_class = FakeTextFrame if data.get("type") == "TextFrame" else FakeRectangle
+    item = item_class(backend, page)
+    story = data.get("story")
+    item._props.update({k: v for k, v in data.items() if k not in ("type", "story", "paragraphs")})
+    if story:
+        item.ParentStory._props.update(story)
+    if data.get("paragraphs"):
+        for text, props in zip(item.ParentStory._paragraphs(), data["paragraphs"]):
+            text._props.update(props)
+    return item
+
+########################################
+# FAKE UI DRIVER
+########################################
+
+class _FakeScreenshot:
+    """
+    A screen grab of the fake's InDesign window: its size, and for NumPy a gray
+    pasteboard under the menu bars with the page drawn (white, bordered) at
+    page_box, the screen pixels (left, top, right, bottom) given by the backend's
+    page_on_screen. region crops it like pyautogui's region argument.
+    """
+
+    def __init__(self, screen_size, page_box=None, region=None):
+        self.screen_size = screen_size
+        self.page_box = page_box
+        self.region = region
+        self.size = tuple(region[2:]) if region else screen_size
+
+    def __array__(self, dtype=None, copy=None):
+        import numpy as np
+        width, height = self.screen_size
+        pixels = np.full((height, width, 3), 205, dtype=np.uint8)
+        pixels[:height // 12] = 50
+        if self.page_box is not None:
+            left, top, right, bottom = self.page_box
+            pixels[top - 1:bottom + 1, left - 1:right + 1] = 30
+            pixels[top:bottom, left:right] = 255
+        if self.region:
+            x, y, w, h = self.region
+            pixels = pixels[y:y + h, x:x + w]
+        return pixels.astype(dtype) if dtype else pixels
+
+
+class FakeUiDriver:
+    """
+    Records mouse and keyboard actions instead of performing them, adding their dead time to log.ui_wait;
+    a Type tool drag and typewrite() build the same text frame the live pyautogui path does.
+    """
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._tool = None
+        self._dragging = False
+
+    def _wait(self, seconds):
+        self._backend.log.ui_wait += seconds
+        if self._backend.simulate_sleeps and seconds:
+            time.sleep(seconds)
+
+    def sleep(self, seconds):
+        self._backend.call("UI.sleep", (seconds,))
+        self._wait(seconds)
+
+    def press(self, key):
+        self._backend.call("UI.press", (key,))
+        self._tool = key
+
+    def hotkey(self, *keys):
+        self._backend.call("UI.hotkey", keys)
+
+    def moveTo(self, x, y, duration=0.0):
+        self._backend.call("UI.moveTo", (x, y))
+        self._wait(duration)
+
+    def mouseDown(self):
+        self._backend.call("UI.mouseDown")
+        self._dragging = True
+
+    def mouseUp(self):
+        self._backend.call("UI.mouseUp")
+        if self._dragging and self._tool == "t":
+            self._create_text_frame()
+        elif self._dragging and self._tool == "v":
+            self._select_page_items()
+        self._dragging = False
+
+    def click(self):
+        self._backend.call("UI.click")
+
+    def typewrite(self, text, interval=0.0):
+        self._backend.call("UI.typewrite", (len(text),))
+        self._wait(interval * len(text))
+        doc = self._active_document()
+        if doc is not None and doc._selection:
+            frame = doc._selection[0]
+            frame._props["Contents"] = (frame._props.get("Contents") or "") + text
+
+    def screenshot(self, region=None):
+        self._backend.call("UI.screenshot")
+        width, height = self._backend.screen_size
+        page_box = None
+        if self._backend.page_on_screen is not None:
+            left, top, right, bottom = self._backend.page_on_screen
+            page_box = (int(left * width), int(top * height), int(right * width), int(bottom * height))
+        return _FakeScreenshot(self._backend.screen_size, page_box, region)
+
+    def size(self):
+        self._backend.call("UI.size")
+        return self._backend.screen_size
+
+    def _active_document(self):
+        app = self._backend.connection
+        return app._documents[-1] if app._documents else None
+
+    def _create_text_frame(self):
+        doc = self._active_document()
+        if doc is None or not doc._pages:
+            return
+        pages = [page for page in doc._pages if page._items] or doc._pages
+        page = pages[-1]
+        frame = FakeTextFrame(self._backend, page)
+        page._items.append(frame)
+        doc._selection[:] = [frame]
+
+    def _select_page_items(self):
+        doc = self._active_document()
+        if doc is None:
+            return
+        pages = [page for page in doc._pages if page._items]
+        doc._selection[:] = list(pages[-1]._items) if pages else []
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# batch.py
+
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+from config_module import project_config
+
+########################################
+# PROJECT LIST
+########################################
+
+def read_manifest(manifest_path):
+    """
+    Return the projects of a batch manifest as (project_dir, overrides) pairs.
+    The manifest is a JSON list, or an object with a "projects" list, whose
+    entries are project directories or {"project_dir": ..., "config": {...}}
+    objects. Relative directories are taken relative to the manifest.
+    """
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("projects", [])
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    projects = []
+    for entry in data:
+        if isinstance(entry, str):
+            entry = {"project_dir": entry}
+        project_dir = os.path.join(base_dir, entry["project_dir"])
+        projects.append((os.path.normpath(project_dir), dict(entry.get("config", {}))))
+    return projects
+
+def load_project_config(project_dir, overrides=None):
+    """
+    The compiled config of a project for an unattended run (see
+    config_module.project_config): defaults, global_config.json, the project's
+    config.json, then overrides. project_dir always wins over the directory
+    recorded in the file (configs are often copied between machines).
+    """
+    return project_config(project_dir, overrides)
+
+########################################
+# LOGGING
+########################################
+
+class _ThreadRoutedStream:
+    """A sys.stdout that sends each thread's output to that thread's own stream."""
+
+    def __init__(self, default):
+        self.default = default
+        self.targets = {}
+
+    def write(self, text):
+        return self.targets.get(threading.get_ident(), self.default).write(text)
+
+    def flush(self):
+        self.targets.get(threading.get_ident(), self.default).flush()
+
+    def __getattr__(self, name):
+        return getattr(self.default, name)
+
+_route_lock = threading.Lock()
+
+@contextlib.contextmanager
+def _stdout_to(stream):
+    """
+    Redirect print() on the current thread only, unlike contextlib.redirect_stdout,
+    so several projects can log to their own files at the same time.
+    """
+    with _route_lock:
+        if not isinstance(sys.stdout, _ThreadRoutedStream):
+            sys.stdout = _ThreadRoutedStream(sys.stdout)
+        router = sys.stdout
+    ident = threading.get_ident()
+    router.targets[ident] = stream
+    try:
+        yield stream
+    finally:
+        del router.targets[ident]
+
+########################################
+# BATCH RUN
+########################################
+
+def run_project(project_dir, overrides=None, log_path=None, backend=None):
+    """
+    Run the pipeline on one project without any GUI (logging to log_path if given) and
+    return its result dict: status "ok", "failed", "cancelled" or "error", timings and error.
+    """
+    from automation import run_automation
+    from backend import create_backend
+    from cancellation import RunCancelled
+    from tracing import Tracer
+
+    result = {"project": project_dir, "status": "error", "output": None, "seconds": 0.0,
+              "stages": {}, "app_calls": 0, "app_seconds": 0.0, "error": None}
+    start = time.perf_counter()
+    tracer = Tracer()
+    try:
+        if not os.path.isdir(project_dir):
+            raise FileNotFoundError(f"Project directory not found: {project_dir}")
+        config = load_project_config(project_dir, overrides)
+        if backend is None:
+            backend = create_backend(config)
+        with contextlib.ExitStack() as stack:
+            if log_path:
+                log = stack.enter_context(open(log_path, "w", encoding="utf-8"))
+                stack.enter_context(_stdout_to(log))
+            output = run_automation(config, backend, tracer=tracer)
+        result["output"] = output
+        result["status"] = "ok" if output else "failed"
+    except RunCancelled as e:
+        result["status"] = "cancelled"
+        result["error"] = str(e)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        result["stages"] = {name: round(seconds, 3) for name, seconds in tracer.stage_totals().items()}
+        if backend is not None and backend.profiler is not None:
+            calls, seconds = backend.profiler.totals()
+            result["app_calls"], result["app_seconds"] = calls, round(seconds, 3)
+    return result
+
+def run_batch(projects, log_name=None):
+    """
+    Run (project_dir, overrides) pairs back to back and return the batch summary
+    {"projects": [result, ...], "ok": n, "failed": n, "seconds": total}. One
+    project failing does not stop the batch. log_name, when given, is the file
+    each project's log is written to inside its project directory.
+    """
+    start = time.perf_counter()
+    results = []
+    for index, (project_dir, overrides) in enumerate(projects, 1):
+        print(f"[INFO] Batch {index}/{len(projects)}: {project_dir}")
+        log_path = os.path.join(project_dir, log_name) if log_name else None
+        result = run_project(project_dir, overrides, log_path=log_path)
+        print(f"[INFO] Batch {index}/{len(projects)}: {result['status']} in {result['seconds']:.1f}s"
+              + (f" ({result['error']})" if result["error"] else ""))
+        results.append(result)
+    ok = sum(1 for result in results if result["status"] == "ok")
+    return {"projects": results, "ok": ok, "failed": len(results) - ok,
+            "seconds": round(time.perf_counter() - start, 3)}
+
+def format_summary(summary):
+    """Return a printable table of a run_batch summary."""
+    lines = [f"{'status':<8} {'seconds':>9} {'app calls':>10}  project"]
+    for result in summary["projects"]:
+        lines.append(f"{result['status']:<8} {result['seconds']:>9.1f} {result['app_calls']:>10}  "
+                     f"{result['project']}")
+    lines.append(f"{summary['ok']} ok, {summary['failed']} failed, {summary['seconds']:.1f}s total.")
+    return "\n".join(lines)
+
+def _parse_override(text):
+    key, _, value = text.partition("=")
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+def main(argv=None):
+    """Command line entry point; returns the process exit status."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build magazine issues without the GUI.")
+    parser.add_argument("projects", nargs="*", help="project directories (each with a config.json)")
+    parser.add_argument("--manifest", help="JSON file listing the projects to build")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a config value for every project (VALUE is parsed as JSON if it can be)")
+    parser.add_argument("--json", dest="json_path", help="write the batch summary as JSON to this file ('-' for stdout)")
+    parser.add_argument("--log", dest="log_name", help="write each project's log to this file in its directory")
+    args = parser.parse_args(argv)
+
+    overrides = dict(_parse_override(text) for text in args.overrides)
+    projects = [(os.path.normpath(project_dir), {}) for project_dir in args.projects]
+    if args.manifest:
+        projects += read_manifest(args.manifest)
+    if not projects:
+        parser.error("no projects given")
+    projects = [(project_dir, dict(overrides, **project_overrides)) for project_dir, project_overrides in projects]
+
+    summary = run_batch(projects, log_name=args.log_name)
+    print(format_summary(summary))
+    if args.json_path == "-":
+        print(json.dumps(summary, indent=2))
+    elif args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print("[INFO] Batch summary saved to:", args.json_path)
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
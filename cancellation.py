@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# cancellation.py
+
+import contextlib
+import threading
+import time
+
+_local = threading.local()
+
+class RunCancelled(Exception):
+    """Raised at the next page boundary once a run's CancelToken is cancelled."""
+
+class CancelToken:
+    """Cooperative cancellation of a run, from another thread or by a timeout; checked between pages."""
+
+    def __init__(self, timeout=None):
+        self._event = threading.Event()
+        self.reason = None
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+
+    def cancel(self, reason="cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self):
+        if not self._event.is_set() and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("timed out")
+        return self._event.is_set()
+
+    def check(self):
+        if self.cancelled:
+            raise RunCancelled(self.reason)
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Make this the token check_cancelled() consults on the current thread."""
+        previous = getattr(_local, "token", None)
+        _local.token = self
+        try:
+            yield self
+        finally:
+            _local.token = previous
+
+
+def check_cancelled():
+    """Raise RunCancelled if the run on this thread has been cancelled."""
+    token = getattr(_local, "token", None)
+    if token is not None:
+        token.check()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# checkpoint.py
+
+import hashlib
+import json
+import os
+
+# Manifest file kept in the project directory while a run is in progress.
+CHECKPOINT_FILE = ".checkpoint.json"
+
+# Settings that change what a run produces; a manifest written under different
+# values (or for a different template or set of folders) is not resumed.
+RUN_CONFIG_KEYS = ("template_file", "split_page", "target_page", "assembly_mode", "execution_mode",
+                   "proxy_images", "proxy_ppi")
+
+def run_key(config, model_folders):
+    """Hash the inputs that decide whether an interrupted run can be picked up again."""
+    template_path = os.path.join(config["project_dir"], config["template_file"])
+    try:
+        stat = os.stat(template_path)
+        template_state = [stat.st_size, stat.st_mtime_ns]
+    except OSError:
+        template_state = None
+    inputs = {key: config.get(key) for key in RUN_CONFIG_KEYS}
+    data = json.dumps([inputs, template_state, sorted(model_folders)], sort_keys=True)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+########################################
+# CHECKPOINT MANIFEST
+########################################
+
+class RunCheckpoint:
+    """
+    Progress of one run (layout seed, finished stages and folders, working document), saved
+    atomically after the split and every model folder so a rerun can pick up where it stopped.
+    """
+
+    def __init__(self, path, key):
+        self.path = path
+        self.key = key
+        self.seed = None
+        self.stages = []
+        self.folders = {}
+        self.document = None
+        self.saves = 0
+
+    @classmethod
+    def load(cls, project_dir, key):
+        """
+        Return the checkpoint of project_dir. A manifest left by an interrupted run
+        with the same key is resumed; any other manifest is ignored.
+        """
+        checkpoint = cls(os.path.join(project_dir, CHECKPOINT_FILE), key)
+        if not os.path.isfile(checkpoint.path):
+            return checkpoint
+        try:
+            with open(checkpoint.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Ignoring unreadable checkpoint {checkpoint.path}: {e}")
+            return checkpoint
+        if data.get("version") != 1 or data.get("run_key") != key:
+            print("[INFO] Inputs changed since the last interrupted run; starting over.")
+            return checkpoint
+        checkpoint.seed = data.get("seed")
+        checkpoint.stages = list(data.get("stages", []))
+        checkpoint.folders = dict(data.get("folders", {}))
+        checkpoint.document = data.get("document")
+        if checkpoint.resumed:
+            print(f"[INFO] Resuming interrupted run: {len(checkpoint.folders)} model folder(s) "
+                  f"already done ({', '.join(checkpoint.stages) or 'no stages'} complete).")
+        return checkpoint
+
+    @property
+    def resumed(self):
+        """True when earlier progress was loaded from the manifest."""
+        return bool(self.stages or self.folders)
+
+    def stage_done(self, stage):
+        return stage in self.stages
+
+    def mark_stage(self, stage):
+        if stage not in self.stages:
+            self.stages.append(stage)
+            self.save()
+
+    def begin(self, seed):
+        """Record the layout seed of the plan being replayed."""
+        if self.seed != seed:
+            self.seed = seed
+            self.save()
+
+    def folder_done(self, folder):
+        return folder in self.folders
+
+    def commit_folders(self, doc, document_path, results, insert_after=None):
+        """
+        Save doc to document_path, then mark the folders of results
+        ({folder: (pages used, frames placed, credits added)}) as finished. The
+        document is saved first so the manifest never runs ahead of it.
+        """
+        doc.Save(document_path)
+        self.saves += 1
+        for folder, (pages, frames, credits) in results.items():
+            self.folders[folder] = {"order": len(self.folders), "pages": pages,
+                                    "frames": frames, "credits": credits}
+        self.document = {"path": document_path, "pages": doc.Pages.Count, "insert_after": insert_after}
+        self.save()
+
+    @property
+    def insert_after(self):
+        """Page number generated pages continue behind, or None."""
+        return (self.document or {}).get("insert_after")
+
+    def resume_document(self):
+        """Path of the saved working document to continue from, or None."""
+        path = (self.document or {}).get("path")
+        if path and os.path.exists(path):
+            return path
+        return None
+
+    def save(self):
+        data = {"version": 1, "run_key": self.key, "seed": self.seed, "stages": self.stages,
+                "folders": self.folders, "document": self.document}
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"[WARN] Could not write checkpoint {self.path}: {e}")
+
+    def discard(self):
+        """Remove the manifest once the run has completed."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"[WARN] Could not remove checkpoint {self.path}: {e}")
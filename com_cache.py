@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# com_cache.py
+
+import types
+
+from backend import AFTER, AT_END
+from profiler import ProfiledObject, member_kind
+
+# Property reads answered from the cache once read, per kind of object. Each
+# kind here exists once per document, so a value is kept per (kind, property)
+# in the document's scope. Writes to these properties are written through; the
+# page count changes only through the page mutations CachedObject wraps.
+CACHED_PROPERTIES = {
+    "Document": {"DocumentPreferences", "Pages"},
+    "DocumentPreferences": {"PageWidth", "PageHeight", "FacingPages"},
+    "Pages": {"Count"},
+}
+
+_PAGE_COUNT = ("Pages", "Count")
+_METHOD_TYPES = (types.MethodType, types.BuiltinMethodType, types.FunctionType)
+_PLAIN_TYPES = (str, bytes, int, float, bool, complex, type(None))
+
+def _target(value):
+    """The application object under any proxies (this cache's and the profiler's)."""
+    while isinstance(value, (CachedObject, ProfiledObject)):
+        value = object.__getattribute__(value, "_target")
+    return value
+
+def _unwrap(value):
+    if isinstance(value, CachedObject):
+        return object.__getattribute__(value, "_target")
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap(item) for item in value)
+    return value
+
+########################################
+# DOCUMENT SCOPES
+########################################
+
+class _DocumentScope:
+    """The cached state of one open document: property values and pages by number."""
+
+    def __init__(self, document):
+        self.document = document
+        self.values = {}
+        self.pages = {}
+
+    def pages_changed(self):
+        self.values.pop(_PAGE_COUNT, None)
+        self.pages = {}
+
+    def page_appended(self, page):
+        """A page was added at the end: the new count and last page are known without asking."""
+        count = self.values.get(_PAGE_COUNT)
+        if count is None:
+            self.pages_changed()
+            return
+        self.values[_PAGE_COUNT] = count + 1
+        self.pages[count + 1] = page
+
+    def last_page(self):
+        count = self.values.get(_PAGE_COUNT)
+        return self.pages.get(count) if count is not None else None
+
+########################################
+# CACHING PROXY
+########################################
+
+class CachedObject:
+    """
+    Stands in for one application object, like profiler.ProfiledObject; reads of
+    CACHED_PROPERTIES and Pages.Item(number) are answered from the document's scope.
+    """
+    __slots__ = ("_target", "_cache", "_kind", "_scope")
+
+    def __init__(self, target, cache, kind, scope):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_cache", cache)
+        object.__setattr__(self, "_kind", kind)
+        object.__setattr__(self, "_scope", scope)
+
+    def __getattr__(self, name):
+        target = object.__getattribute__(self, "_target")
+        cache = object.__getattribute__(self, "_cache")
+        kind = object.__getattribute__(self, "_kind")
+        scope = object.__getattribute__(self, "_scope")
+        cached = scope is not None and name in CACHED_PROPERTIES.get(kind, ())
+        if cached and (kind, name) in scope.values:
+            cache.hits += 1
+            return scope.values[(kind, name)]
+        value = getattr(target, name)
+        if isinstance(value, _METHOD_TYPES):
+            return cache._method(self, value, name)
+        value = cache.wrap(value, member_kind(kind, name), scope)
+        if cached:
+            cache.misses += 1
+            scope.values[(kind, name)] = value
+        return value
+
+    def __setattr__(self, name, value):
+        target = object.__getattribute__(self, "_target")
+        kind = object.__getattribute__(self, "_kind")
+        scope = object.__getattribute__(self, "_scope")
+        setattr(target, name, _unwrap(value))
+        if scope is not None and name in CACHED_PROPERTIES.get(kind, ()):
+            scope.values[(kind, name)] = value
+
+    def __repr__(self):
+        return f"<cached {object.__getattribute__(self, '_kind')} {object.__getattribute__(self, '_target')!r}>"
+
+
+class PropertyCache:
+    """
+    Read-through cache of page sizes, page counts and pages by number, one scope per
+    open document; page mutations, Document.Close and DoScript invalidate it.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._scopes = []
+
+    def wrap(self, value, kind="Application", scope=None):
+        if isinstance(value, _PLAIN_TYPES) or isinstance(value, CachedObject):
+            return value
+        if isinstance(value, (list, tuple)):
+            return type(value)(self.wrap(item, member_kind(kind, "Item", called=True), scope) for item in value)
+        if kind == "Document":
+            scope = self._scope(value)
+        return CachedObject(value, self, kind, scope)
+
+    def _scope(self, document):
+        target = _target(document)
+        for scope in self._scopes:
+            try:
+                if scope.document is target or scope.document == target:
+                    return scope
+            except Exception:
+                continue
+        scope = _DocumentScope(target)
+        self._scopes.append(scope)
+        return scope
+
+    def _method(self, proxy, method, name):
+        kind = object.__getattribute__(proxy, "_kind")
+        scope = object.__getattribute__(proxy, "_scope")
+        result_kind = member_kind(kind, name, called=True)
+
+        def call(*args, **kwargs):
+            if kind == "Pages" and name == "Item" and scope is not None and len(args) == 1 \
+                    and isinstance(args[0], int) and args[0] in scope.pages:
+                self.hits += 1
+                return scope.pages[args[0]]
+            at = args[0] if args else kwargs.get("at", AT_END)
+            reference = args[1] if len(args) > 1 else kwargs.get("reference")
+            result_scope = scope
+            if kind == "Page" and name == "Duplicate" and reference is not None:
+                # The copy lands in the reference page's document.
+                result_scope = object.__getattribute__(reference, "_scope") \
+                    if isinstance(reference, CachedObject) else None
+            result = self.wrap(method(*[_unwrap(arg) for arg in args],
+                                      **{key: _unwrap(value) for key, value in kwargs.items()}),
+                               result_kind, result_scope)
+            if name == "DoScript":
+                self._invalidate(self._scopes)
+            elif kind == "Pages" and name == "Item" and scope is not None:
+                if len(args) == 1 and isinstance(args[0], int):
+                    self.misses += 1
+                    scope.pages[args[0]] = result
+            elif (kind, name) in (("Pages", "Add"), ("Page", "Duplicate")):
+                if result_scope is None:
+                    self._invalidate(self._scopes)
+                else:
+                    self._added(result_scope, at, reference, result)
+            elif (kind, name) in (("Page", "Delete"), ("Document", "Close")) and scope is not None:
+                self._invalidate([scope])
+                if name == "Close" and scope in self._scopes:
+                    self._scopes.remove(scope)
+            return result
+        return call
+
+    def _added(self, scope, at, reference, page):
+        """A page was added to a document: extend its known pages if it went at the end."""
+        if at == AT_END or (at == AFTER and reference is not None and reference is scope.last_page()):
+            scope.page_appended(page)
+        else:
+            self._invalidate([scope])
+
+    def _invalidate(self, scopes):
+        for scope in scopes:
+            scope.pages_changed()
+            self.invalidations += 1
+
+    def reset(self):
+        """Forget every document's scope and the counters, as at the start of a run."""
+        self.hits = self.misses = self.invalidations = 0
+        self._scopes = []
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self):
+        return (f"[INFO] Property cache: {self.hits} hits, {self.misses} misses "
+                f"({self.hit_rate() * 100:.1f}% hit rate), {self.invalidations} invalidations.")
@@ -3,20 +3,273 @@
 
 import json
 import os
+import threading
+from collections.abc import Mapping
+
+# Config file of the application (next to the scripts), of a project and of a model folder.
+GLOBAL_CONFIG_FILE = "global_config.json"
+CONFIG_FILE = "config.json"
+
+# Settings a run starts from, before global_config.json, the project's config.json
+# and each model folder's config.json are laid over them.
+DEFAULTS = {
+    "template_file": "template.indd",
+    "credits_file": "Credits.txt",
+    "credits_font": ["Blackadder ITC\tRegular", "Arial\tRegular"],
+    "credits_font_size": 24,
+    "credits_colors": ["Black"],
+    "text_box_position": ["bottom_center"],
+    "layouts": ["single", "double", "four"],
+}
+
+# Settings a model folder's config.json overrides for that folder's pages. The
+# folder configs also carry project_dir and template_file (they were copied from
+# the templates the folders came from); those belong to the project and are ignored.
+FOLDER_KEYS = ("credits_file", "credits_font", "credits_colors", "credits_font_size", "text_box_position",
+               "layouts", "layout_probabilities", "leading_decrease_factor", "credits_metrics",
+               "text_frame_top_left_ratio", "text_frame_bottom_right_ratio")
+
+# Expected values of the known settings; any other key is kept as it is.
+_NAME_LISTS = ("credits_font", "credits_colors", "text_box_position", "layouts", "font_dirs")
+_REQUIRED_LISTS = ("credits_font", "credits_colors", "text_box_position")
+_STRINGS = ("project_dir", "template_file", "credits_file", "assembly_mode", "execution_mode",
+            "credits_mode", "backend", "indesign_exe", "proxy_dir")
+_NUMBERS = ("credits_font_size", "leading_decrease_factor", "proxy_ppi", "ui_wait_timeout",
+            "ui_poll_interval")
+_DURATIONS = ("ui_drag_duration", "ui_typing_interval")
+_PAGE_NUMBERS = ("target_page", "split_page")
+_RATIOS = ("text_frame_top_left_ratio", "text_frame_bottom_right_ratio")
+_CHOICES = {"assembly_mode": ("split_merge", "inplace"), "execution_mode": ("com", "script"),
+            "credits_mode": ("frame", "typewrite")}
+
+_lock = threading.Lock()
+_files = {}             # path -> (mtime_ns, size, settings)
+_compiled = {}          # (path, mtime_ns, size) of every layer -> Config
+
+########################################
+# READING AND WRITING
+########################################
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def _read(path):
+    """The settings of a JSON file ({} if it does not exist), parsed again only when its mtime or size changes."""
+    stamp = _stamp(path)
+    if stamp is None:
+        return {}, None
+    with _lock:
+        cached = _files.get(path)
+    if cached is not None and cached[:2] == stamp:
+        return cached[2], stamp
+    with open(path, "r", encoding="utf-8") as f:
+        settings = json.load(f)
+    if not isinstance(settings, dict):
+        raise ValueError(f"{path} must hold a JSON object of settings.")
+    with _lock:
+        _files[path] = stamp + (settings,)
+    return settings, stamp
+
+def _plain(value):
+    if isinstance(value, Mapping):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
 
 def load_config(config_path):
     """Load configuration settings from a JSON file."""
-    if not os.path.exists(config_path):
-        return {}
-    with open(config_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return _plain(_read(config_path)[0])
 
 def save_config(config, config_path):
-    """Save the configuration dictionary back to the JSON file."""
-    with open(config_path, "w", encoding="utf-8") as f:
-        json.dump(config, f, indent=4)
+    """
+    Save the configuration (a dict or a Config) back to the JSON file. The file is
+    written next to it and then moved into place, so a crash leaves either the
+    old or the new settings behind.
+    """
+    settings = _plain(config)
+    tmp_path = config_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(settings, f, indent=4)
+    os.replace(tmp_path, config_path)
+    stamp = _stamp(config_path)
+    if stamp is not None:
+        with _lock:
+            _files[config_path] = stamp + (settings,)
     print(f"[INFO] Configuration saved to: {config_path}")
 
+########################################
+# VALIDATION
+########################################
+
+def _number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _validate(key, value, source):
+    """The value of one setting in its compiled form; raises ValueError when it is not valid."""
+    def invalid(expected):
+        return ValueError(f"{key} in {source} must be {expected}, not {value!r}.")
+
+    if key in _NAME_LISTS:
+        if isinstance(value, str):
+            # A single name is accepted where a list is expected ("credits_font": "Arial\tRegular").
+            value = (value,)
+        if not isinstance(value, (list, tuple)) or not all(isinstance(item, str) for item in value):
+            raise invalid("a name or a list of names")
+        if key in _REQUIRED_LISTS and not value:
+            raise invalid("at least one name")
+        return tuple(value)
+    if key in _STRINGS:
+        if not isinstance(value, str):
+            raise invalid("a string")
+        if key in _CHOICES and value not in _CHOICES[key]:
+            raise invalid(" or ".join(repr(choice) for choice in _CHOICES[key]))
+        return value
+    if key in _NUMBERS:
+        if not _number(value) or value <= 0:
+            raise invalid("a positive number")
+        return value
+    if key in _DURATIONS:
+        if not _number(value) or value < 0:
+            raise invalid("a number of seconds (0 or more)")
+        return value
+    if key in _PAGE_NUMBERS:
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+            raise invalid("a page number")
+        return value
+    if key in _RATIOS:
+        if not isinstance(value, (list, tuple)) or len(value) != 2 \
+                or not all(_number(item) and 0 <= item <= 1 for item in value):
+            raise invalid("two screen ratios between 0 and 1")
+        return tuple(value)
+    if key == "layout_probabilities":
+        if not isinstance(value, Mapping) or not value \
+                or not all(_number(item) and item >= 0 for item in value.values()):
+            raise invalid("an object of layout weights")
+        return _FrozenDict(value)
+    if key == "page_size":
+        if value is not None and (not isinstance(value, (list, tuple)) or len(value) != 2
+                                  or not all(_number(item) and item > 0 for item in value)):
+            raise invalid("a [width, height] in points")
+        return tuple(value) if value is not None else None
+    return _freeze(value)
+
+def _freeze(value):
+    if isinstance(value, Mapping):
+        return _FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+class _FrozenDict(dict):
+    """A dict setting of a Config (fake_backend, layout_probabilities). Still a dict for json and **."""
+
+    def _frozen(self, *args, **kwargs):
+        raise TypeError("Config settings are read-only; use Config.replace().")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _frozen
+
+########################################
+# COMPILED CONFIG
+########################################
+
+class Config(Mapping):
+    """
+    The settings of a run, validated once and read-only; folder() lays a model folder's FOLDER_KEYS
+    over them and replace() returns a changed copy.
+    """
+    __slots__ = ("_values", "_folders")
+
+    def __init__(self, values=(), source="config"):
+        compiled = {}
+        for key, value in dict(values).items():
+            compiled[key] = _validate(key, value, source)
+        object.__setattr__(self, "_values", compiled)
+        object.__setattr__(self, "_folders", {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Config is read-only; use Config.replace().")
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return f"Config({self._values!r})"
+
+    def replace(self, values=(), **changes):
+        """A copy with some settings changed (validated like the rest)."""
+        changes = dict(values, **changes)
+        config = Config.__new__(Config)
+        compiled = dict(self._values)
+        for key, value in changes.items():
+            compiled[key] = _validate(key, value, "the run's overrides")
+        object.__setattr__(config, "_values", compiled)
+        object.__setattr__(config, "_folders", {})
+        return config
+
+    def folder(self, model_folder):
+        """The settings of one model folder: these, with its own config.json's FOLDER_KEYS on top."""
+        config = self._folders.get(model_folder)
+        if config is None:
+            path = os.path.join(model_folder, CONFIG_FILE)
+            settings, _ = _read(path)
+            overrides = {key: settings[key] for key in FOLDER_KEYS if key in settings}
+            config = self.replace(overrides) if overrides else self
+            self._folders[model_folder] = config
+        return config
+
+    def to_dict(self):
+        """The settings as a plain dict of lists and dicts, as save_config writes them."""
+        return _plain(self._values)
+
+
+def compile_config(config, source="config"):
+    """A Config of a settings dict laid over DEFAULTS (validated once); a Config is returned as it is."""
+    if isinstance(config, Config):
+        return config
+    return Config(dict(DEFAULTS, **config), source)
+
+def project_config(project_dir, overrides=None, global_path=GLOBAL_CONFIG_FILE):
+    """
+    The compiled settings of a project: DEFAULTS, then global_path, then the
+    project's config.json, then overrides. project_dir always wins over the
+    directory recorded in the files (configs are often copied between machines).
+    Without overrides the compiled layers are cached until one of the files changes.
+    """
+    project_dir = os.path.abspath(project_dir)
+    layers = []
+    for path in (os.path.abspath(global_path), os.path.join(project_dir, CONFIG_FILE)):
+        settings, stamp = _read(path)
+        layers.append((path, stamp, settings))
+    key = tuple((path, stamp) for path, stamp, _ in layers)
+    if not overrides:
+        with _lock:
+            cached = _compiled.get(key)
+        if cached is not None:
+            # A copy, so folder() looks at the model folders' files again for this run.
+            return cached.replace()
+    config = Config(DEFAULTS, "the defaults")
+    for path, _, settings in layers:
+        config = config.replace(settings) if settings else config
+    if overrides:
+        config = config.replace(overrides)
+    config = config.replace(project_dir=project_dir)
+    if not overrides:
+        with _lock:
+            _compiled[key] = config
+    return config
+
+
 if __name__ == "__main__":
     # Example usage
     cfg_path = "config.json"
@@ -1,26 +1,33 @@
 #!/usr/bin/env python
 # automation.py
 
-import win32com.client
-import os
+from backend import ComBackend
 
-def split_template(template_file, start_file, finish_file, split_page):
+def split_template(template_file, start_file, finish_file, split_page, app=None, template_maps=None):
     """
     Splits the InDesign template into two documents:
       - Pages 1 to (split_page - 1) are duplicated into the 'start' document.
       - Pages (split_page + 1) to the end are duplicated into the 'finish' document.
       
     The new documents are saved to start_file and finish_file.
+    'app' is the application object to use; InDesign over COM when omitted.
+    With 'template_maps' (a template_map.TemplateMapCache), the page count comes
+    from the template's cached page map, which is recorded on first use.
+    Returns the number of pages duplicated.
     """
     # Constant for duplicating a page after a reference page.
     AFTER = 1634104421  # Adjust if necessary.
 
     # Launch the InDesign application.
-    app = win32com.client.Dispatch("InDesign.Application")
+    if app is None:
+        app = ComBackend().app
 
     # Open the template document invisibly.
     template_doc = app.Open(template_file, False)
-    total_pages = template_doc.Pages.Count
+    page_map = None
+    if template_maps is not None:
+        page_map = template_maps.get(template_file) or template_maps.record(template_file, template_doc)
+    total_pages = page_map.page_count if page_map is not None else template_doc.Pages.Count
 
     # Validate the split page number.
     if split_page < 1 or split_page > total_pages:
@@ -28,7 +35,7 @@ def split_template(template_file, start_file, finish_file, split_page):
         doc_name = template_doc.Name
         close_script = "app.documents.itemByName('{}').close(SaveOptions.NO);".format(doc_name)
         app.DoScript(close_script, 1246973031)
-        return
+        return 0
 
     # Create two new documents for the "start" and "finish" portions.
     start_doc = app.Documents.Add()
@@ -72,6 +79,7 @@ def split_template(template_file, start_file, finish_file, split_page):
     print("Split complete.")
     print("Start file saved to:", start_file)
     print("Finish file saved to:", finish_file)
+    return (split_page - 1) + (total_pages - split_page)
 
 # Example usage:
 if __name__ == "__main__":
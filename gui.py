@@ -2,6 +2,8 @@
 # gui.py
 
 import os
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk
 import tkinter.filedialog as fd
@@ -10,18 +12,12 @@ import tkinter.messagebox as mb
 # Import the sv_ttk module for a modern dark theme.
 import sv_ttk
 
-from config_module import load_config, save_config
+from config_module import DEFAULTS, GLOBAL_CONFIG_FILE, load_config, project_config, save_config
 from automation import run_automation
-
-def find_file_recursive(directory, filename):
-    """
-    Recursively search for a file within the given directory.
-    Returns the full path to the file if found; otherwise, returns None.
-    """
-    for root_dir, _, files in os.walk(directory):
-        if filename in files:
-            return os.path.join(root_dir, filename)
-    return None
+from cancellation import CancelToken, RunCancelled
+from progress import ProgressReporter, format_duration
+from project_index import load_project_index
+from template_map import check_split_page, template_map_cache
 
 def run_gui():
     root = tk.Tk()
@@ -122,7 +118,7 @@ def run_gui():
     }
 
     # Load global config (for the InDesign executable).
-    global_config_path = "global_config.json"
+    global_config_path = GLOBAL_CONFIG_FILE
     global_config = load_config(global_config_path)
     if "indesign_exe" in global_config:
         indesign_path_var.set(global_config["indesign_exe"])
@@ -150,16 +146,109 @@ def run_gui():
             countdown_label.config(text="Starting now!")
             root.after(500, begin_automation, local_config)
 
-    def begin_automation(local_config):
-        root.withdraw()
+    # ----- Background run -----
+    # The run happens on a worker thread; it only talks to Tk through run_events,
+    # which the main loop polls with root.after.
+    run_events = queue.Queue()
+    run_state = {"token": None, "window": None}
+
+    def automation_worker(local_config, token):
+        try:
+            import pythoncom  # COM must be initialised on every thread that uses it.
+            pythoncom.CoInitialize()
+        except ImportError:
+            pythoncom = None
         try:
-            run_automation(local_config)
+            reporter = ProgressReporter(lambda snapshot: run_events.put(("progress", snapshot)))
+            with token.activate(), reporter.activate():
+                output = run_automation(local_config)
+            run_events.put(("done", output))
+        except RunCancelled as ex:
+            run_events.put(("cancelled", str(ex)))
         except Exception as ex:
-            mb.showerror("Automation Error", str(ex))
+            run_events.put(("error", str(ex)))
         finally:
-            root.deiconify()
-            btn_run.state(['!disabled'])
+            if pythoncom is not None:
+                pythoncom.CoUninitialize()
+
+    def open_progress_window():
+        # A small window in the corner of the screen, away from the document being built.
+        window = tk.Toplevel(root)
+        window.title("InDesign Automation")
+        window.resizable(False, False)
+        window.attributes("-topmost", True)
+        frame = ttk.Frame(window, padding="10 10 10 10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        window.status_label = ttk.Label(frame, text="Starting...", width=50)
+        window.status_label.pack(anchor=tk.W)
+        window.bar = ttk.Progressbar(frame, orient="horizontal", length=360, mode="determinate")
+        window.bar.pack(fill=tk.X, pady=5)
+        window.time_label = ttk.Label(frame, text="")
+        window.time_label.pack(anchor=tk.W)
+        window.cancel_button = ttk.Button(frame, text="Cancel", command=cancel_automation)
+        window.cancel_button.pack(pady=(5, 0))
+        window.protocol("WM_DELETE_WINDOW", cancel_automation)
+        window.update_idletasks()
+        x = window.winfo_screenwidth() - window.winfo_width() - 40
+        y = window.winfo_screenheight() - window.winfo_height() - 80
+        window.geometry(f"+{x}+{y}")
+        return window
+
+    def cancel_automation():
+        token = run_state["token"]
+        window = run_state["window"]
+        if token is None or window is None:
+            return
+        token.cancel()
+        window.cancel_button.state(['disabled'])
+        window.status_label.config(text="Cancelling at the next page...")
+
+    def show_progress(snapshot):
+        window = run_state["window"]
+        if snapshot["pages"]:
+            window.bar.config(maximum=snapshot["pages"], value=snapshot["pages_done"])
+        if not run_state["token"].cancelled:
+            window.status_label.config(text=snapshot["message"])
+        eta = snapshot["eta"]
+        window.time_label.config(text=f"Elapsed {format_duration(snapshot['elapsed'])}"
+                                      + (f", about {format_duration(eta)} left" if eta is not None else ""))
+
+    def finish_automation(kind, detail):
+        run_state["window"].destroy()
+        run_state.update(token=None, window=None)
+        root.deiconify()
+        btn_run.state(['!disabled'])
+        if kind == "error":
             countdown_label.config(text="")
+            mb.showerror("Automation Error", detail)
+        elif kind == "cancelled":
+            countdown_label.config(text=f"Run {detail}.")
+        elif detail:
+            countdown_label.config(text=f"Done: {detail}")
+        else:
+            countdown_label.config(text="The run stopped early; see the console for details.")
+
+    def poll_run_events():
+        while True:
+            try:
+                kind, detail = run_events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                show_progress(detail)
+            else:
+                finish_automation(kind, detail)
+                return
+        root.after(100, poll_run_events)
+
+    def begin_automation(local_config):
+        # Keep the main window out of the way of the application being driven.
+        root.withdraw()
+        token = CancelToken()
+        run_state.update(token=token, window=open_progress_window())
+        threading.Thread(target=automation_worker, args=(local_config, token),
+                         name="automation", daemon=True).start()
+        root.after(100, poll_run_events)
 
     def on_run():
         indesign_path = indesign_path_var.get().strip()
@@ -184,26 +273,24 @@ def run_gui():
         local_config = load_config(local_config_path)
 
         if is_new_project:
+            # One scan of the project tree answers every check below; the pipeline reuses it.
+            project_index = load_project_index(project_dir)
+
             # Basic check: at least one .jpg image should exist (recursively).
-            jpg_found = False
-            for root_dir, _, files in os.walk(project_dir):
-                if any(f.lower().endswith(".jpg") for f in files):
-                    jpg_found = True
-                    break
-            if not jpg_found:
+            if not project_index.has_images():
                 mb.showerror("Error", "No .jpg images found in project folder.")
                 return
 
             # Recursively look for the Credits.txt file.
             credits_file = local_config.get("credits_file", "Credits.txt")
-            credits_path = find_file_recursive(project_dir, credits_file)
+            credits_path = project_index.find_file(credits_file)
             if not credits_path:
                 mb.showerror("Error", f"{credits_file} not found in project folder.")
                 return
 
             # Recursively look for the template.indd file.
             template_file = local_config.get("template_file", "template.indd")
-            template_path = find_file_recursive(project_dir, template_file)
+            template_path = project_index.find_file(template_file)
             if not template_path:
                 mb.showerror("Error", f"Template file not found: {template_file}")
                 return
@@ -242,21 +329,34 @@ def run_gui():
                     local_config.pop(key, None)
         else:
             local_config["project_dir"] = project_dir
-            local_config.setdefault("template_file", "template.indd")
-            local_config.setdefault("credits_file", "Credits.txt")
-            local_config.setdefault("credits_font", ["Blackadder ITC\tRegular", "Arial\tRegular"])
-            local_config.setdefault("credits_font_size", 24)
-            local_config.setdefault("text_box_position", ["bottom_center"])
-            local_config.setdefault("layouts", ["single", "double", "four"])
+            for key, value in DEFAULTS.items():
+                local_config.setdefault(key, value)
             if not use_coords:
                 for key in ["text_frame_top_left_ratio", "text_frame_bottom_right_ratio",
                             "text_frame_top_left", "text_frame_bottom_right"]:
                     local_config.pop(key, None)
 
+        # Check the split page against the template's page map, when an earlier run recorded one.
+        split_page = local_config.get("split_page")
+        page_map = template_map_cache(local_config).get(os.path.join(project_dir, local_config["template_file"]))
+        if page_map is not None and split_page is not None:
+            problem = check_split_page(page_map, split_page)
+            if problem and not 1 <= split_page <= page_map.page_count:
+                mb.showerror("Error", problem)
+                return
+            if problem and not mb.askokcancel("Split Page", f"{problem}\n\nRun anyway?"):
+                return
+
         save_config(local_config, local_config_path)
+        # The run reads the compiled layers: defaults, global config, this project's config.
+        try:
+            run_config = project_config(project_dir)
+        except ValueError as e:
+            mb.showerror("Error", f"Invalid configuration: {e}")
+            return
         btn_run.state(['disabled'])
         countdown_label.config(text="Starting in 5 seconds...")
-        root.after(1000, countdown, 4, local_config)
+        root.after(1000, countdown, 4, run_config)
 
     # ------------- Build Main GUI Content -------------
     # All widgets are added to scrollable_frame.
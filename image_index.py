@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# image_index.py
+
+import json
+import mmap
+import os
+import struct
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+########################################
+# JPEG HEADER PARSING
+########################################
+
+# What the pipeline knows about an image without decoding it. width/height are
+# the stored pixel dimensions; orientation is the EXIF value (1 = upright,
+# 5-8 = rotated a quarter turn); dpi is (x, y) or None when the file has none.
+ImageInfo = namedtuple("ImageInfo", "path size mtime width height orientation dpi")
+
+# Start-of-frame markers carrying the frame dimensions (DHT, JPG and DAC excluded).
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+class JpegHeaderError(ValueError):
+    """The file is not a JPEG, or its header ends before the frame size."""
+
+def _parse_exif(data, start, end):
+    """Return (orientation, dpi) from the IFD0 of an APP1 Exif payload."""
+    if data[start:start + 6] != b"Exif\x00\x00":
+        return None, None
+    tiff = start + 6
+    byte_order = data[tiff:tiff + 2]
+    if byte_order == b"II":
+        endian = "<"
+    elif byte_order == b"MM":
+        endian = ">"
+    else:
+        return None, None
+
+    def unpack(fmt, offset):
+        return struct.unpack_from(endian + fmt, data, offset)
+
+    ifd = tiff + unpack("I", tiff + 4)[0]
+    if ifd + 2 > end:
+        return None, None
+    orientation = None
+    resolution = {}
+    unit = 2  # inches
+    for i in range(unpack("H", ifd)[0]):
+        entry = ifd + 2 + i * 12
+        if entry + 12 > end:
+            break
+        tag, kind, _ = unpack("HHI", entry)
+        if tag == 0x0112:
+            orientation = unpack("H", entry + 8)[0]
+        elif tag == 0x0128:
+            unit = unpack("H", entry + 8)[0]
+        elif tag in (0x011A, 0x011B) and kind == 5:
+            value_at = tiff + unpack("I", entry + 8)[0]
+            if value_at + 8 <= end:
+                numerator, denominator = unpack("II", value_at)
+                if denominator:
+                    resolution[tag] = numerator / denominator
+    dpi = None
+    if 0x011A in resolution and 0x011B in resolution:
+        dpi = (resolution[0x011A], resolution[0x011B])
+        if unit == 3:  # centimetres
+            dpi = (dpi[0] * 2.54, dpi[1] * 2.54)
+    return orientation, dpi
+
+def _parse_jfif_dpi(data, start):
+    """Return (x, y) dpi from an APP0 JFIF payload, or None."""
+    if data[start:start + 5] != b"JFIF\x00":
+        return None
+    units, x_density, y_density = struct.unpack_from(">BHH", data, start + 7)
+    if units == 1:
+        return (float(x_density), float(y_density))
+    if units == 2:
+        return (x_density * 2.54, y_density * 2.54)
+    return None
+
+def parse_jpeg_header(data):
+    """
+    Walk the marker segments of a JPEG in 'data' (bytes or an mmap) up to the
+    first start-of-frame and return (width, height, orientation, dpi). Only the
+    header segments are touched; no pixel data is read or decoded.
+    """
+    if data[0:2] != b"\xff\xd8":
+        raise JpegHeaderError("missing SOI marker")
+    size = len(data)
+    offset = 2
+    orientation = None
+    dpi = None
+    while offset + 4 <= size:
+        if data[offset] != 0xFF:
+            raise JpegHeaderError(f"bad marker at byte {offset}")
+        marker = data[offset + 1]
+        if marker == 0xFF:          # fill byte
+            offset += 1
+            continue
+        if marker in (0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7):
+            offset += 2             # standalone markers
+            continue
+        length = struct.unpack_from(">H", data, offset + 2)[0]
+        start = offset + 4
+        end = offset + 2 + length
+        if marker in _SOF_MARKERS:
+            height, width = struct.unpack_from(">HH", data, start + 1)
+            return width, height, orientation or 1, dpi
+        if marker == 0xDA:          # start of scan: no frame header found
+            break
+        if marker == 0xE1 and orientation is None:
+            exif_orientation, exif_dpi = _parse_exif(data, start, min(end, size))
+            orientation = exif_orientation
+            dpi = exif_dpi or dpi
+        elif marker == 0xE0 and dpi is None:
+            dpi = _parse_jfif_dpi(data, start)
+        offset = end
+    raise JpegHeaderError("no start-of-frame marker before the image data")
+
+def read_jpeg_info(path, stat=None):
+    """Return the ImageInfo of a JPEG file, reading its header through a memory map."""
+    stat = stat or os.stat(path)
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            width, height, orientation, dpi = parse_jpeg_header(data)
+    return ImageInfo(path, stat.st_size, stat.st_mtime_ns, width, height, orientation, dpi)
+
+def oriented_size(info):
+    """(width, height) as displayed, i.e. swapped for EXIF orientations 5-8."""
+    if info.orientation in (5, 6, 7, 8):
+        return info.height, info.width
+    return info.width, info.height
+
+########################################
+# PERSISTENT INDEX
+########################################
+
+class ImageIndex:
+    """
+    JPEG header metadata of a set of model folders (scanned in parallel), cached in a JSON file
+    and trusted while each file's size and mtime are unchanged.
+    """
+
+    def __init__(self, cache_path=None, workers=None):
+        self.cache_path = cache_path
+        self.workers = workers
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.errors = {}
+        if cache_path and os.path.isfile(cache_path):
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    for row in json.load(f).get("images", []):
+                        if row[6] is not None:
+                            row[6] = tuple(row[6])
+                        self.entries[row[0]] = ImageInfo(*row)
+            except (OSError, ValueError, TypeError, IndexError):
+                self.entries = {}
+
+    def _scan_folder(self, model_folder):
+        found, hits, misses, errors = {}, 0, 0, {}
+        with os.scandir(model_folder) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.lower().endswith((".jpg", ".jpeg")):
+                    continue
+                stat = entry.stat()
+                path = os.path.join(model_folder, entry.name)
+                cached = self.entries.get(path)
+                if cached is not None and cached.size == stat.st_size and cached.mtime == stat.st_mtime_ns:
+                    found[path] = cached
+                    hits += 1
+                    continue
+                try:
+                    found[path] = read_jpeg_info(path, stat)
+                    misses += 1
+                except (OSError, ValueError, struct.error) as e:
+                    errors[path] = str(e)
+        return model_folder, found, hits, misses, errors
+
+    def scan(self, model_folders):
+        """
+        (Re)index the JPEGs of the given folders. Entries for these folders that no
+        longer exist on disk are dropped; other folders' entries are kept.
+        """
+        model_folders = list(model_folders)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(self._scan_folder, model_folders))
+        for model_folder, found, hits, misses, errors in results:
+            for path in [p for p in self.entries if os.path.dirname(p) == model_folder]:
+                if path not in found:
+                    del self.entries[path]
+            self.entries.update(found)
+            self.hits += hits
+            self.misses += misses
+            self.errors.update(errors)
+        for path, error in sorted(self.errors.items()):
+            print(f"[WARN] Could not read JPEG header of {path}: {error}")
+        return self
+
+    def get(self, path):
+        return self.entries.get(path)
+
+    def save(self):
+        """Write the index back to its cache file (atomically)."""
+        if not self.cache_path:
+            return
+        rows = [list(info) for info in sorted(self.entries.values())]
+        temp_path = self.cache_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "images": rows}, f)
+        os.replace(temp_path, self.cache_path)
@@ -1,11 +1,19 @@
 #!/usr/bin/env python
 # main.py
 
-from gui import run_gui
+import sys
 
-def main():
-    """Entry point."""
+def main(argv=None):
+    """
+    Entry point. Without arguments the GUI opens; with project directories or
+    --manifest the issues are built headless, back to back (see batch.py).
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        from batch import main as batch_main
+        return batch_main(argv)
+    from gui import run_gui
     run_gui()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
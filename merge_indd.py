@@ -1,7 +1,6 @@
-import win32com.client
-import os
+from backend import ComBackend
 
-def merge_indd_files(indd_files, output_file):
+def merge_indd_files(indd_files, output_file, app=None):
     """
     Merges the InDesign documents specified in 'indd_files' into a single document,
     and saves it as 'output_file'. Pages from each file are appended in order.
@@ -9,16 +8,21 @@ def merge_indd_files(indd_files, output_file):
     Parameters:
       indd_files (list of str): Full paths to the source InDesign documents.
       output_file (str): Full path for the merged output document.
+      app: Application object to use (InDesign over COM when omitted).
+
+    Returns the number of pages duplicated.
     """
     # Constant for duplicating a page after a reference page.
     # (This value is commonly 1634104421; adjust if needed.)
     AFTER = 1634104421
 
     # Launch InDesign application.
-    app = win32com.client.Dispatch("InDesign.Application")
+    if app is None:
+        app = ComBackend().app
 
     # Create a new document for merged content.
     merged_doc = app.Documents.Add()
+    pages_copied = 0
 
     # Loop through each source document.
     for file_path in indd_files:
@@ -33,6 +37,7 @@ def merge_indd_files(indd_files, output_file):
             last_page = merged_doc.Pages.Item(merged_doc.Pages.Count)
             # Duplicate the source page into the merged document after the last page.
             src_page.Duplicate(AFTER, last_page)
+            pages_copied += 1
 
         # Close the source document without saving changes.
         src_doc.Close()
@@ -47,6 +52,7 @@ def merge_indd_files(indd_files, output_file):
     merged_doc.Close()
 
     print("Merged document saved to:", output_file)
+    return pages_copied
 
 
 # Example usage:
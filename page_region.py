@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# page_region.py
+
+import zlib
+
+# Screenshots are analysed at 1/DETECT_STEP resolution; the edges found are then
+# refined at full resolution within DETECT_STEP pixels.
+DETECT_STEP = 4
+
+########################################
+# DETECTION
+########################################
+
+def _gray(image):
+    import numpy as np
+    image = np.asarray(image)
+    if image.ndim == 3:
+        return image[..., :3].astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    return image.astype(np.float32)
+
+def _downsample(image, step):
+    """Mean of step x step blocks, so one-pixel page borders survive the downsampling."""
+    import numpy as np
+    image = np.asarray(image)
+    height, width = (size // step * step for size in image.shape[:2])
+    rest = image.shape[2:]
+    # Sum the block rows, then the block columns, as whole-array adds of uint16.
+    rows = image[:height, :width].reshape((height // step, step, -1))
+    total = rows[:, 0].astype(np.uint16)
+    for offset in range(1, step):
+        total += rows[:, offset]
+    columns = total.reshape((height // step, width // step, step) + rest)
+    total = columns[:, :, 0].copy()
+    for offset in range(1, step):
+        total += columns[:, :, offset]
+    return total.astype(np.float32) / (step * step)
+
+def _longest_runs(mask):
+    """Per row of a boolean array, the (start, stop) of its longest run of True; (0, 0) for none."""
+    import numpy as np
+    rows, width = mask.shape
+    padded = np.zeros((rows, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    steps = np.diff(padded, axis=1)
+    run_rows, starts = np.nonzero(steps == 1)
+    stops = np.nonzero(steps == -1)[1]
+    runs = np.zeros((rows, 2), dtype=np.int64)
+    if len(starts):
+        # Sort runs by (row, length): the last run of each row is its longest.
+        order = np.lexsort((stops - starts, run_rows))
+        last = np.r_[run_rows[order][1:] != run_rows[order][:-1], True]
+        runs[run_rows[order][last], 0] = starts[order][last]
+        runs[run_rows[order][last], 1] = stops[order][last]
+    return runs
+
+def _candidates_numpy(gray, min_side, threshold=24.0):
+    """Rectangles (left, top, right, bottom) framed by long horizontal and vertical edges."""
+    import numpy as np
+    rows = _longest_runs(np.abs(np.diff(gray, axis=0)) > threshold)
+    columns = _longest_runs((np.abs(np.diff(gray, axis=1)) > threshold).T)
+    lines = [(y + 1, start, stop) for y, (start, stop) in enumerate(rows) if stop - start >= min_side]
+    found = []
+    for index, (top, left, right) in enumerate(lines):
+        for bottom, left2, right2 in lines[index + 1:]:
+            if bottom - top < min_side or abs(left - left2) > 2 or abs(right - right2) > 2:
+                continue
+            # Both sides must be vertical edges (give or take two columns) spanning the rows between the lines.
+            span = bottom - top
+            if all((np.minimum(columns[max(x - 3, 0):x + 2, 1], bottom)
+                    - np.maximum(columns[max(x - 3, 0):x + 2, 0], top)).max(initial=0) >= 0.8 * span
+                   for x in (left, right)):
+                found.append((left, top, right, bottom))
+    return found
+
+def _candidates_opencv(gray, min_side):
+    import cv2
+    import numpy as np
+    edges = cv2.Canny(gray.astype(np.uint8), 30, 90)
+    edges = cv2.dilate(edges, None)
+    contours, _ = cv2.findContours(edges, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    found = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if w < min_side or h < min_side:
+            continue
+        polygon = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(polygon) == 4 and cv2.contourArea(polygon) >= 0.85 * w * h:
+            found.append((x, y, x + w, y + h))
+    return found
+
+def _refine(image, box, step):
+    """Move each edge of a box found at 1/step resolution onto the strongest full-resolution edge."""
+    import numpy as np
+    image = np.asarray(image)
+    left, top, right, bottom = (int(value) * step for value in box)
+    height, width = image.shape[:2]
+    rows = _gray(image[:, max(left, 0):min(right, width):step])
+    columns = _gray(image[max(top, 0):min(bottom, height):step, :])
+
+    def strongest(profile, around):
+        low, high = max(around - step, 1), min(around + step, len(profile) - 1)
+        if high <= low:
+            return around
+        strength = np.abs(profile[low:high] - profile[low - 1:high - 1]).mean(axis=1)
+        return low + int(np.argmax(strength))
+
+    top = strongest(rows, top)
+    bottom = strongest(rows, bottom)
+    left = strongest(columns.T, left)
+    right = strongest(columns.T, right)
+    return left, top, right, bottom
+
+def detect_page_region(image, aspect=None, step=DETECT_STEP, tolerance=0.15):
+    """
+    Find the page on a screenshot of InDesign: the largest rectangle outlined by
+    edges, between 5% and 95% of the screen, whose width/height is within
+    tolerance of aspect (the page's, when given). Edges and contours come from
+    OpenCV when it is installed and from NumPy otherwise, on a copy downsampled
+    by step. Returns (left, top, right, bottom) in pixels, or None.
+    """
+    small = _gray(_downsample(image, step))
+    height, width = small.shape
+    min_side = max(min(height, width) // 8, 4)
+    try:
+        boxes = _candidates_opencv(small, min_side)
+    except ImportError:
+        boxes = _candidates_numpy(small, min_side)
+    best = None
+    for left, top, right, bottom in boxes:
+        w, h = right - left, bottom - top
+        area = w * h / (width * height)
+        if not 0.05 <= area <= 0.95:
+            continue
+        if aspect and abs(w / h - aspect) > tolerance * aspect:
+            continue
+        if best is None or w * h > (best[2] - best[0]) * (best[3] - best[1]):
+            best = (left, top, right, bottom)
+    return _refine(image, best, step) if best is not None else None
+
+def viewport_checksum(image, box, margin=6):
+    """
+    CRC of the band of screen just outside a page box (the page border, its shadow
+    and the pasteboard next to it). Scrolling or zooming moves the page's edge
+    through the band; placing items on the page does not touch it.
+    """
+    import numpy as np
+    pixels = np.asarray(image)
+    height, width = pixels.shape[:2]
+    left, top, right, bottom = box
+    outer = (max(left - margin, 0), max(top - margin, 0), min(right + margin, width), min(bottom + margin, height))
+    bands = (pixels[outer[1]:top, outer[0]:outer[2]:2], pixels[bottom:outer[3], outer[0]:outer[2]:2],
+             pixels[top:bottom:2, outer[0]:left], pixels[top:bottom:2, right:outer[2]])
+    checksum = zlib.crc32(repr((width, height, box)).encode())
+    for band in bands:
+        # Drop the low bits so screen noise and antialiasing do not count as a change.
+        checksum = zlib.crc32(np.ascontiguousarray(band >> 4).tobytes(), checksum)
+    return checksum
+
+########################################
+# PAGE LOCATOR
+########################################
+
+def configured_ratios(config):
+    """The page's (left, top, right, bottom) screen ratios from config, or None."""
+    if "text_frame_top_left_ratio" in config and "text_frame_bottom_right_ratio" in config:
+        return tuple(config["text_frame_top_left_ratio"]) + tuple(config["text_frame_bottom_right_ratio"])
+    return None
+
+class PageLocator:
+    """
+    Where the page being built is on screen: detected on a screenshot when the viewport changed,
+    else reused; the config's text_frame_*_ratio corners when nothing is found.
+    """
+
+    def __init__(self, backend, step=DETECT_STEP, margin=6):
+        self.backend = backend
+        self.step = step
+        self.margin = margin
+        self.screen_size = None
+        self.box = None
+        self.checksum = None
+        self.detected = 0
+        self.reused = 0
+        self._warned = False
+
+    def size(self):
+        """The screen's (width, height), asked once."""
+        if self.screen_size is None:
+            self.screen_size = tuple(self.backend.ui.size())
+        return self.screen_size
+
+    def ratios(self):
+        """The last page box as (left, top, right, bottom) screen ratios, or None."""
+        if self.box is None:
+            return None
+        width, height = self.size()
+        left, top, right, bottom = self.box
+        return left / width, top / height, right / width, bottom / height
+
+    def region(self, config, aspect=None):
+        """Pixel corners ((left, top), (right, bottom)) of the page on screen."""
+        if config.get("page_detection", True):
+            try:
+                box = self._locate(aspect)
+            except ImportError:
+                box = None
+            if box is not None:
+                return (box[0], box[1]), (box[2], box[3])
+        ratios = configured_ratios(config)
+        if ratios is None:
+            raise RuntimeError("The page was not found on screen and the config has no "
+                               "text_frame_top_left_ratio/text_frame_bottom_right_ratio to fall back on.")
+        width, height = self.size()
+        return ((int(ratios[0] * width), int(ratios[1] * height)),
+                (int(ratios[2] * width), int(ratios[3] * height)))
+
+    def _locate(self, aspect):
+        import numpy as np
+        image = np.asarray(self.backend.ui.screenshot())
+        height, width = image.shape[:2]
+        if self.box is not None and (width, height) == self.screen_size \
+                and viewport_checksum(image, self.box, self.margin) == self.checksum:
+            self.reused += 1
+            return self.box
+        self.screen_size = (width, height)
+        self.box = detect_page_region(image, aspect=aspect, step=self.step)
+        self.detected += 1
+        if self.box is None:
+            if not self._warned:
+                print("[WARN] The page was not found on screen; using the configured page corners.")
+                self._warned = True
+            self.checksum = None
+            return None
+        self.checksum = viewport_checksum(image, self.box, self.margin)
+        return self.box
+
+    def report(self):
+        where = f"at {self.box[:2]}-{self.box[2:]}" if self.box is not None else "not found"
+        return (f"[INFO] Page on screen: {self.detected} detection(s), {self.reused} reused "
+                f"from the unchanged viewport; last {where}.")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# pages.py
+
+from backend import AFTER
+
+########################################
+# PAGE SOURCES
+########################################
+
+# A page source hands place_model_images the page each layout goes on:
+#     page = pages.acquire(target_page)
+# Without one, place_model_images falls back to get_empty_page.
+
+class InsertionCursor:
+    """
+    Inserts generated pages one after another behind a reference page (one Pages.Add each);
+    target_page is ignored.
+    """
+
+    def __init__(self, doc, after_page):
+        self.doc = doc
+        self.last_page = after_page
+        self.pages_added = 0
+
+    def acquire(self, target_page=None):
+        self.last_page = self.doc.Pages.Add(AFTER, self.last_page)
+        self.pages_added += 1
+        return self.last_page
+
+
+class EmptyPageAllocator:
+    """
+    Hands out a document's empty pages in page order like get_empty_page, from an index built once,
+    then adds pages at the end. Pages must not be inserted or emptied behind its back.
+    """
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._empty = {}
+        self._order = []
+        self.pages_added = 0
+        page_count = doc.Pages.Count
+        for index in range(1, page_count + 1):
+            page = doc.Pages.Item(index)
+            if page.PageItems.Count == 0:
+                self._empty[index] = page
+                self._order.append(index)
+        # _order is ascending; _next is the first slot that may still be empty.
+        self._next = 0
+
+    def acquire(self, target_page=None):
+        if target_page is not None and target_page in self._empty:
+            return self._empty.pop(target_page)
+        while self._next < len(self._order):
+            index = self._order[self._next]
+            self._next += 1
+            if index in self._empty:
+                return self._empty.pop(index)
+        self.pages_added += 1
+        return self.doc.Pages.Add()
+
+    @property
+    def empty_pages(self):
+        """1-based numbers of the indexed pages that have not been handed out."""
+        return sorted(self._empty)
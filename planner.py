@@ -0,0 +1,366 @@
+#!/usr/bin/env python
+# planner.py
+
+import hashlib
+import json
+import math
+import os
+import random
+from collections import namedtuple
+
+from config_module import compile_config
+from project_index import list_images
+from text_metrics import bold_font_name
+
+########################################
+# PLAN STRUCTURE
+########################################
+
+# An issue plan is decided entirely in Python before InDesign is touched and is
+# then only replayed, call by call over COM or as one compiled script. Every
+# part is an immutable namedtuple; plan_to_dict/plan_from_dict round-trip it
+# through JSON.
+#
+# Bounds are [top, left, bottom, right] in page coordinates, as GeometricBounds.
+IssuePlan = namedtuple("IssuePlan", "seed page_width page_height folders")
+FolderPlan = namedtuple("FolderPlan", "folder pages")
+PagePlan = namedtuple("PagePlan", "target layout frames credits")
+FramePlan = namedtuple("FramePlan", "bounds image")
+CreditsPlan = namedtuple("CreditsPlan", "bounds text font bold_font size bold_size "
+                                        "color color_value leading")
+
+########################################
+# LAYOUT SELECTION FUNCTION
+########################################
+
+def choose_layout(num_remaining, config, rng=random):
+    """
+    Choose a layout mode based on the number of images remaining and the probabilities
+    specified in the config. 'rng' is the random source (the random module by default,
+    a seeded random.Random when planning).
+    """
+    layout_probs = config.get("layout_probabilities", {"single": 0.33, "double": 0.33, "four": 0.34})
+    if num_remaining == 1:
+        return "single"
+    elif num_remaining == 2:
+        return "double"
+    elif num_remaining == 3:
+        population = ["single", "double"]
+        weights = [layout_probs.get("single", 0.5), layout_probs.get("double", 0.5)]
+        return rng.choices(population, weights=weights)[0]
+    else:
+        population = ["single", "double", "four"]
+        weights = [layout_probs.get("single", 0.33),
+                   layout_probs.get("double", 0.33),
+                   layout_probs.get("four", 0.34)]
+        return rng.choices(population, weights=weights)[0]
+
+# Number of image frames on a page for each layout mode.
+IMAGES_PER_LAYOUT = {"single": 1, "double": 2, "four": 4}
+
+def layout_frame_bounds(images_per_page, page_width, page_height):
+    """
+    Return the [top, left, bottom, right] bounds of the image frames for a page
+    holding images_per_page images (1, 2 or 4).
+    """
+    frames = []
+    if images_per_page == 1:
+        frames.append([0, 0, page_height, page_width])
+    elif images_per_page == 2:
+        frames.append([0, 0, page_height, page_width / 2])
+        frames.append([0, page_width / 2, page_height, page_width])
+    elif images_per_page == 4:
+        frames.append([0, 0, page_height / 2, page_width / 2])
+        frames.append([0, page_width / 2, page_height / 2, page_width])
+        frames.append([page_height / 2, 0, page_height, page_width / 2])
+        frames.append([page_height / 2, page_width / 2, page_height, page_width])
+    return frames
+
+########################################
+# CREDITS TEXT BOX
+########################################
+
+# CMYK values for credits swatches that are missing from the document
+# (adjust these values as needed). Unknown names fall back to black.
+CREDIT_SWATCH_VALUES = {
+    "red":    [0, 100, 100, 0],
+    "black":  [0, 0, 0, 100],
+    "blue":   [100, 75, 0, 0],
+    "green":  [75, 0, 100, 0],
+    "yellow": [0, 0, 100, 0]
+}
+
+# Swatch of the credits when a config lists no credits_colors.
+DEFAULT_CREDITS_COLORS = ("Black",)
+
+def compute_text_box_coordinates(region_top_left, region_bottom_right, config, text_content=None, font=None):
+    """
+    Compute the coordinates for the text box that will contain the credits.
+    The height (box_h) is calculated based on the number of lines in text_content.
+    If text_content is not provided or is empty, a default of 3 lines is assumed.
+
+    With font (an InDesign font name) and a region in points, the height is measured
+    from the font's glyph widths instead, wrapped to the region's width with the
+    bold first paragraph (see text_metrics.py); config["credits_metrics"] = False
+    keeps the line-count estimate.
+    
+    After the initial calculation, this function shifts the box vertically if needed
+    so that the entire box remains within the defined region.
+    """
+    base_font_size = config.get("credits_font_size", 24)
+    position  = config.get("text_box_position", ["bottom_center"])[0]
+
+    region_width  = region_bottom_right[0] - region_top_left[0]
+    region_height = region_bottom_right[1] - region_top_left[1]
+
+    line_multiplier = 1.2
+    if text_content:
+        line_count = len(text_content.splitlines())
+        if line_count == 0:
+            line_count = 3
+    else:
+        line_count = 3
+
+    # Calculate the desired box height based on the number of lines.
+    box_h = int(line_count * base_font_size * line_multiplier)
+    box_w = region_width
+    if font is not None and text_content and config.get("credits_metrics", True):
+        from text_metrics import measure_credits
+        leading = base_font_size * config.get("leading_decrease_factor", 0.8)
+        measured = measure_credits(text_content, font, base_font_size, base_font_size * 1.5, leading,
+                                   box_w, config)
+        if measured is not None:
+            box_h = math.ceil(measured[1])
+
+    # Determine the initial top-left y-coordinate based on the desired position.
+    if position == "center":
+        tl_y = region_top_left[1] + (region_height - box_h) // 2
+    elif position == "top_center":
+        tl_y = region_top_left[1]
+    elif position == "bottom_center":
+        tl_y = region_bottom_right[1] - box_h
+    else:
+        tl_y = region_top_left[1] + (region_height - box_h) // 2
+
+    tl_x = region_top_left[0]
+
+    # --- SHIFT THE BOX IF IT FALLS OUTSIDE THE REGION ---
+    if box_h > region_height:
+        box_h = region_height
+        tl_y = region_top_left[1]
+    else:
+        if tl_y < region_top_left[1]:
+            tl_y = region_top_left[1]
+        if tl_y + box_h > region_bottom_right[1]:
+            tl_y = region_bottom_right[1] - box_h
+
+    box_tl = (tl_x, tl_y)
+    box_br = (tl_x + box_w, tl_y + box_h)
+    click_pt = ((box_tl[0] + box_br[0]) // 2, (box_tl[1] + box_br[1]) // 2)
+    return box_tl, box_br, click_pt
+
+
+def plan_credits(credits_text, config, page_width, page_height, rng=random):
+    """
+    Plan the credits text frame for a model folder's first page, in page
+    coordinates: bounds, contents (paragraphs separated by carriage returns),
+    font, size, swatch and the leading the frame ends up with. The font and
+    color are picked from config["credits_font"] and config["credits_colors"]
+    (Black when the config lists no colors).
+    """
+    base_size = config.get("credits_font_size", 24)
+    base_font = rng.choice(config["credits_font"])
+    color = rng.choice(config.get("credits_colors") or DEFAULT_CREDITS_COLORS)
+    box_tl, box_br, _ = compute_text_box_coordinates((0, 0), (page_width, page_height),
+                                                     config, credits_text, font=base_font)
+    return CreditsPlan(
+        bounds=(box_tl[1], box_tl[0], box_br[1], box_br[0]),
+        text="\r".join(credits_text.splitlines()),
+        font=base_font,
+        bold_font=bold_font_name(base_font),
+        size=base_size,
+        bold_size=base_size * 1.5,
+        color=color,
+        color_value=tuple(CREDIT_SWATCH_VALUES.get(color.lower(), [0, 0, 0, 100])),
+        leading=base_size * config.get("leading_decrease_factor", 0.8),
+    )
+
+########################################
+# PLANNING
+########################################
+
+def list_model_images(model_folder):
+    """Return the sorted .jpg file names in a model folder (see project_index.list_images)."""
+    return list_images(model_folder)
+
+def read_credits(model_folder, credits_file="Credits.txt"):
+    """Return the stripped credits text of a model folder ("" if there is none)."""
+    credits_path = os.path.join(model_folder, credits_file)
+    if not os.path.isfile(credits_path):
+        return ""
+    with open(credits_path, "r", encoding="utf-8") as f:
+        return f.read().strip()
+
+def plan_folder(model_folder, config, page_width, page_height, target_page=None, rng=random):
+    """
+    Plan one model folder: split its images into pages by choose_layout, give
+    every image a frame and put the credits on the first page. target_page is
+    requested for the first page only. Returns None for a folder without images.
+    The folder's own config.json overrides the planning settings (see
+    config_module.Config.folder).
+    """
+    config = compile_config(config).folder(model_folder)
+    image_files = list_model_images(model_folder)
+    if not image_files:
+        print(f"[WARN] No images found in {model_folder}.")
+        return None
+    credits_text = read_credits(model_folder, config.get("credits_file", "Credits.txt"))
+    if not credits_text:
+        print(f"[WARN] No Credits.txt found in {model_folder}.")
+
+    pages = []
+    image_index = 0
+    while image_index < len(image_files):
+        layout_mode = choose_layout(len(image_files) - image_index, config, rng)
+        images_per_page = IMAGES_PER_LAYOUT.get(layout_mode, 1)
+        frames = []
+        for bounds in layout_frame_bounds(images_per_page, page_width, page_height):
+            if image_index >= len(image_files):
+                break
+            frames.append(FramePlan(tuple(bounds), os.path.join(model_folder, image_files[image_index])))
+            image_index += 1
+        first_page = not pages
+        credits = None
+        if first_page and credits_text:
+            credits = plan_credits(credits_text, config, page_width, page_height, rng)
+        pages.append(PagePlan(target_page if first_page else None, layout_mode, tuple(frames), credits))
+    return FolderPlan(model_folder, tuple(pages))
+
+def folder_rng(seed, model_folder):
+    """The random source of one model folder in the issue planned with seed."""
+    return random.Random(f"{seed}|{os.path.basename(model_folder)}")
+
+def plan_issue(model_folders, config, page_width, page_height, target_page=None, seed=None):
+    """
+    Plan the whole issue: every page, frame, image and credits box of every model
+    folder, in order. target_page applies to the first folder's first page.
+
+    Each folder's random choices come from folder_rng(seed, folder), so a folder
+    is planned alike whether the whole issue or only that folder is planned. The
+    seed defaults to config["layout_seed"]; without one a fresh seed is drawn and
+    recorded in the plan (and printed) so the run can be reproduced.
+    """
+    if seed is None:
+        seed = config.get("layout_seed")
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+        print(f"[INFO] Layout plan seed: {seed} (set layout_seed to reproduce this issue).")
+
+    config = compile_config(config)
+    folders = []
+    for i, model_folder in enumerate(model_folders):
+        folder_plan = plan_folder(model_folder, config, page_width, page_height,
+                                  target_page=target_page if i == 0 else None,
+                                  rng=folder_rng(seed, model_folder))
+        if folder_plan is not None:
+            folders.append(folder_plan)
+    return IssuePlan(seed, page_width, page_height, tuple(folders))
+
+########################################
+# SERIALIZATION AND CACHING
+########################################
+
+def plan_to_dict(plan):
+    """Return the plan as nested dicts and lists, ready for json.dump."""
+    def convert(value):
+        if isinstance(value, tuple) and hasattr(value, "_asdict"):
+            return {key: convert(item) for key, item in value._asdict().items()}
+        if isinstance(value, (tuple, list)):
+            return [convert(item) for item in value]
+        return value
+    return convert(plan)
+
+def plan_from_dict(data):
+    """Rebuild an IssuePlan from plan_to_dict output."""
+    def credits(c):
+        if c is None:
+            return None
+        return CreditsPlan(**dict(c, bounds=tuple(c["bounds"]), color_value=tuple(c["color_value"])))
+    folders = tuple(
+        FolderPlan(f["folder"], tuple(
+            PagePlan(p["target"], p["layout"],
+                     tuple(FramePlan(tuple(fr["bounds"]), fr["image"]) for fr in p["frames"]),
+                     credits(p["credits"]))
+            for p in f["pages"]))
+        for f in data["folders"])
+    return IssuePlan(data["seed"], data["page_width"], data["page_height"], folders)
+
+def save_plan(plan, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(plan_to_dict(plan), f, indent=2)
+
+def load_plan(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return plan_from_dict(json.load(f))
+
+# Version of the plan format and of the planner's own rules (2: bold_font is
+# "Family\tBold"; 3: a random source per folder); cached plans of another version
+# are not reused.
+PLAN_VERSION = 3
+
+# Config keys that change what plan_issue produces.
+PLAN_CONFIG_KEYS = ("layout_probabilities", "credits_font", "credits_colors", "credits_font_size",
+                    "text_box_position", "leading_decrease_factor", "credits_file", "credits_metrics",
+                    "font_dirs")
+
+def plan_cache_key(model_folders, config, page_width, page_height, target_page, seed):
+    """
+    Hash everything a plan depends on: the plan version, the planning config, page
+    size, target page, seed, and each folder's file names, sizes and modification times.
+    """
+    h = hashlib.sha1()
+    inputs = {key: config.get(key) for key in PLAN_CONFIG_KEYS}
+    h.update(json.dumps([PLAN_VERSION, inputs, page_width, page_height, target_page, seed],
+                        sort_keys=True).encode("utf-8"))
+    for model_folder in model_folders:
+        h.update(model_folder.encode("utf-8"))
+        with os.scandir(model_folder) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if entry.is_file():
+                    stat = entry.stat()
+                    h.update(f"{entry.name}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8"))
+    return h.hexdigest()
+
+def cached_plan_issue(model_folders, config, page_width, page_height, target_page=None, cache_dir=None,
+                      seed=None):
+    """
+    plan_issue with an on-disk cache under cache_dir, used only when the plan is
+    reproducible (a seed is given or config["layout_seed"] is set); unseeded runs
+    are planned afresh.
+    """
+    if seed is None:
+        seed = config.get("layout_seed")
+    if seed is None or cache_dir is None:
+        return plan_issue(model_folders, config, page_width, page_height, target_page=target_page, seed=seed)
+    key = plan_cache_key(model_folders, config, page_width, page_height, target_page, seed)
+    path = os.path.join(cache_dir, f"plan-{key}.json")
+    if os.path.isfile(path):
+        try:
+            plan = load_plan(path)
+            print(f"[INFO] Reusing cached layout plan: {path}")
+            return plan
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    plan = plan_issue(model_folders, config, page_width, page_height, target_page=target_page, seed=seed)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        save_plan(plan, path)
+    except OSError as e:
+        print(f"[WARN] Could not cache layout plan: {e}")
+    return plan
+
+def plan_summary(plan):
+    """Return (folders, pages, frames, credits) counts of a plan."""
+    pages = [page for folder in plan.folders for page in folder.pages]
+    return (len(plan.folders), len(pages), sum(len(p.frames) for p in pages),
+            sum(1 for p in pages if p.credits is not None))
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# profiler.py
+
+import os
+import sys
+import time
+import types
+
+# Modules whose functions application calls are attributed to (the "stages" of a run).
+PIPELINE_MODULES = {"automation", "get_split", "merge_indd", "pages", "rebuild", "checkpoint",
+                    "proxies", "script_compiler"}
+
+# Kind of the object a property returns, where it is not the property name itself.
+_PROPERTY_KINDS = {
+    "ActiveDocument": "Document",
+    "ParentStory": "Story",
+    "FillColor": "Color",
+}
+
+# Kind of the object a method returns, where it is not the singular of the
+# collection it is called on (Pages.Item -> Page, Documents.Add -> Document).
+_CALL_KINDS = {
+    "Open": "Document",
+}
+
+_PLAIN_TYPES = (str, bytes, int, float, bool, complex, type(None))
+
+def _singular(kind):
+    return kind[:-1] if kind.endswith("s") else kind
+
+def member_kind(kind, member, called=False):
+    """Kind of the object a property read (or, if called, a method call) on a kind object returns."""
+    if called:
+        return _CALL_KINDS.get(member, _singular(kind))
+    return _PROPERTY_KINDS.get(member, member)
+
+def _unwrap(value):
+    if isinstance(value, ProfiledObject):
+        return object.__getattribute__(value, "_target")
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap(item) for item in value)
+    return value
+
+########################################
+# PROFILING PROXY
+########################################
+
+class ProfiledObject:
+    """
+    Stands in for one object of the application's object model. Property reads,
+    property writes and method calls are passed through to the real object and
+    timed; anything returned that is not a plain value comes back wrapped too,
+    so a whole session is covered once the application object is wrapped.
+    """
+    __slots__ = ("_target", "_profiler", "_kind")
+
+    def __init__(self, target, profiler, kind):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_profiler", profiler)
+        object.__setattr__(self, "_kind", kind)
+
+    def __getattr__(self, name):
+        target = object.__getattribute__(self, "_target")
+        profiler = object.__getattribute__(self, "_profiler")
+        kind = object.__getattribute__(self, "_kind")
+        start = time.perf_counter()
+        value = getattr(target, name)
+        if isinstance(value, (types.MethodType, types.BuiltinMethodType)):
+            return profiler._method(value, f"{kind}.{name}", member_kind(kind, name, called=True))
+        profiler.record(f"{kind}.{name}", time.perf_counter() - start)
+        return profiler.wrap(value, member_kind(kind, name))
+
+    def __setattr__(self, name, value):
+        target = object.__getattribute__(self, "_target")
+        profiler = object.__getattribute__(self, "_profiler")
+        kind = object.__getattribute__(self, "_kind")
+        start = time.perf_counter()
+        setattr(target, name, _unwrap(value))
+        profiler.record(f"{kind}.{name}=", time.perf_counter() - start)
+
+    def __repr__(self):
+        return f"<profiled {object.__getattribute__(self, '_kind')} {object.__getattribute__(self, '_target')!r}>"
+
+
+class ComProfiler:
+    """
+    Counts and wall time of every application call per operation ("Pages.Item",
+    "Document.Save="), attributed to the nearest PIPELINE_MODULES function on the stack.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self._callers = {}
+        self.started = time.perf_counter()
+
+    def wrap(self, value, kind="Application"):
+        if isinstance(value, _PLAIN_TYPES) or isinstance(value, ProfiledObject):
+            return value
+        if isinstance(value, (list, tuple)):
+            return type(value)(self.wrap(item, _singular(kind)) for item in value)
+        return ProfiledObject(value, self, kind)
+
+    def _method(self, method, op, result_kind):
+        def call(*args, **kwargs):
+            args = [_unwrap(arg) for arg in args]
+            kwargs = {key: _unwrap(value) for key, value in kwargs.items()}
+            start = time.perf_counter()
+            try:
+                return self.wrap(method(*args, **kwargs), result_kind)
+            finally:
+                self.record(op, time.perf_counter() - start)
+        return call
+
+    def _caller(self):
+        frame = sys._getframe(3)
+        while frame is not None:
+            code = frame.f_code
+            label = self._callers.get(code)
+            if label is None:
+                module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                name = getattr(code, "co_qualname", code.co_name)
+                label = f"{module}.{name}" if module in PIPELINE_MODULES else ""
+                self._callers[code] = label
+            if label:
+                return label
+            frame = frame.f_back
+        return "(outside pipeline)"
+
+    def record(self, op, elapsed):
+        key = (op, self._caller())
+        entry = self.stats.get(key)
+        if entry is None:
+            self.stats[key] = [1, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+
+    def reset(self):
+        self.stats = {}
+        self.started = time.perf_counter()
+
+    ########################################
+    # REPORTS
+    ########################################
+
+    def totals(self):
+        """Return (calls, seconds) over every recorded operation."""
+        return (sum(entry[0] for entry in self.stats.values()),
+                sum(entry[1] for entry in self.stats.values()))
+
+    def hot_calls(self, limit=15):
+        """
+        Operations by total time, as (op, calls, seconds, max seconds, top caller)
+        tuples, the caller being the stage that spent most time on the operation.
+        """
+        by_op = {}
+        for (op, caller), (count, seconds, longest) in self.stats.items():
+            entry = by_op.setdefault(op, [0, 0.0, 0.0, None, -1.0])
+            entry[0] += count
+            entry[1] += seconds
+            entry[2] = max(entry[2], longest)
+            if seconds > entry[4]:
+                entry[3], entry[4] = caller, seconds
+        rows = [(op, count, seconds, longest, caller)
+                for op, (count, seconds, longest, caller, _) in by_op.items()]
+        rows.sort(key=lambda row: (-row[2], -row[1], row[0]))
+        return rows[:limit]
+
+    def stage_summary(self):
+        """Stages by total time, as (stage, calls, seconds) tuples."""
+        by_stage = {}
+        for (_, caller), (count, seconds, _) in self.stats.items():
+            entry = by_stage.setdefault(caller, [0, 0.0])
+            entry[0] += count
+            entry[1] += seconds
+        rows = [(stage, count, seconds) for stage, (count, seconds) in by_stage.items()]
+        rows.sort(key=lambda row: (-row[2], -row[1], row[0]))
+        return rows
+
+    def report(self, limit=15):
+        """Return the hot-call report and per-stage summary as printable text."""
+        calls, seconds = self.totals()
+        elapsed = time.perf_counter() - self.started
+        lines = [f"[INFO] COM profile: {calls} calls, {seconds:.3f}s in the application "
+                 f"({elapsed:.3f}s wall time)."]
+        lines.append(f"  {'calls':>8} {'total s':>9} {'mean ms':>8} {'max ms':>8}  operation (top stage)")
+        for op, count, total, longest, caller in self.hot_calls(limit):
+            lines.append(f"  {count:>8} {total:>9.3f} {total / count * 1000:>8.3f} {longest * 1000:>8.3f}  "
+                         f"{op} ({caller})")
+        lines.append(f"  {'calls':>8} {'total s':>9} {'share':>8}  stage")
+        for stage, count, total in self.stage_summary():
+            share = total / seconds * 100 if seconds else 0.0
+            lines.append(f"  {count:>8} {total:>9.3f} {share:>7.1f}%  {stage}")
+        return "\n".join(lines)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# progress.py
+
+import contextlib
+import threading
+import time
+
+_local = threading.local()
+
+########################################
+# PROGRESS REPORTER
+########################################
+
+class ProgressReporter:
+    """
+    Turns the pipeline's progress reports into snapshot dicts (folder, pages done, elapsed, ETA)
+    passed to a callback on the pipeline's thread.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.started = time.perf_counter()
+        self.folders = 0
+        self.folder_index = 0
+        self.folder = None
+        self.pages = 0
+        self.pages_done = 0
+        self.images = 0
+        self._pages_started = None
+
+    def update(self, event, **fields):
+        if event == "issue":
+            self.folders = fields.get("folders", 0)
+            self.pages = fields.get("pages", 0)
+            self.folder_index = self.pages_done = self.images = 0
+            self._pages_started = time.perf_counter()
+            message = f"Planned {self.pages} pages in {self.folders} model folders."
+        elif event == "folder":
+            self.folder_index += 1
+            self.folder = fields.get("folder")
+            message = f"Model folder {self.folder_index}/{self.folders}: {self.folder}"
+        elif event == "page":
+            self.pages_done += fields.get("pages", 1)
+            self.images += fields.get("images", 0)
+            message = f"Page {self.pages_done}/{self.pages}, {self.images} images placed."
+        else:
+            message = fields.get("message", event)
+        self.callback(self.snapshot(message))
+
+    def snapshot(self, message=""):
+        now = time.perf_counter()
+        eta = None
+        if self.pages_done and self._pages_started is not None:
+            per_page = (now - self._pages_started) / self.pages_done
+            eta = per_page * max(self.pages - self.pages_done, 0)
+        return {"folder_index": self.folder_index, "folders": self.folders, "folder": self.folder,
+                "pages_done": self.pages_done, "pages": self.pages, "images": self.images,
+                "elapsed": now - self.started, "eta": eta, "message": message}
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Make this the reporter report_progress() updates on the current thread."""
+        previous = getattr(_local, "reporter", None)
+        _local.reporter = self
+        try:
+            yield self
+        finally:
+            _local.reporter = previous
+
+
+def report_progress(event, **fields):
+    """
+    Report a step of the run on this thread to the active ProgressReporter, or
+    do nothing without one. Events: "issue" (folders, pages), "folder" (folder),
+    "page" (images, and pages when a report covers more than one), or any stage
+    name with a message.
+    """
+    reporter = getattr(_local, "reporter", None)
+    if reporter is not None:
+        reporter.update(event, **fields)
+
+
+def format_duration(seconds):
+    """Return seconds as "m:ss" (or "h:mm:ss"), for progress displays."""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# project_index.py
+
+import json
+import os
+import threading
+import time
+
+PROJECT_INDEX_FILE = ".project_index.json"
+# Index files of another version (1: subdirectories sorted case-sensitively) are rescanned.
+PROJECT_INDEX_VERSION = 2
+
+# A directory modified this close to its scan may have changed again within the
+# same mtime tick, so its listing is not trusted on the next scan.
+_RACY_SECONDS = 2.0
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def _folder_order(name):
+    return name.lower(), name
+
+########################################
+# PROJECT INDEX
+########################################
+
+class ProjectIndex:
+    """
+    The file tree of a project, listed once with os.scandir and relisted per directory only
+    when its mtime changes. Names starting with "." are not indexed.
+    """
+
+    def __init__(self, project_dir, cache_path=None):
+        self.project_dir = os.path.abspath(project_dir)
+        self.cache_path = cache_path
+        # Relative directory path ("" for the project) -> [mtime_ns, files, subdirectories].
+        self.directories = {}
+        self.scanned_at = 0.0
+        self.listed = 0
+        self.reused = 0
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == PROJECT_INDEX_VERSION:
+                    self.directories = data["directories"]
+                    self.scanned_at = data["scanned_at"]
+            except (OSError, ValueError, KeyError, TypeError):
+                self.directories = {}
+
+    def _path(self, relative):
+        return os.path.join(self.project_dir, relative) if relative else self.project_dir
+
+    def scan(self):
+        """Bring the index up to date with the disk; returns True if anything changed."""
+        previous = self.directories
+        started = time.time()
+        racy_ns = int((self.scanned_at - _RACY_SECONDS) * 1e9)
+        directories = {}
+        self.listed = self.reused = 0
+        pending = [""]
+        while pending:
+            relative = pending.pop()
+            path = self._path(relative)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            cached = previous.get(relative)
+            if cached is not None and cached[0] == mtime and mtime < racy_ns:
+                files, subdirectories = cached[1], cached[2]
+                self.reused += 1
+            else:
+                files, subdirectories = [], []
+                try:
+                    with os.scandir(path) as entries:
+                        for entry in entries:
+                            if entry.name.startswith("."):
+                                continue
+                            if entry.is_dir():
+                                subdirectories.append(entry.name)
+                            elif entry.is_file():
+                                files.append(entry.name)
+                except OSError:
+                    continue
+                files.sort()
+                # Case-insensitively, like a Windows directory listing, so model folders keep their issue order.
+                subdirectories.sort(key=_folder_order)
+                self.listed += 1
+            directories[relative] = [mtime, files, subdirectories]
+            pending.extend(os.path.join(relative, name) for name in reversed(subdirectories))
+        # Only listings count: saving the index itself touches the project's mtime.
+        changed = ({relative: listing[1:] for relative, listing in directories.items()}
+                   != {relative: listing[1:] for relative, listing in previous.items()})
+        self.directories = directories
+        self.scanned_at = started
+        return changed
+
+    def save(self):
+        """Write the index back to its cache file (atomically)."""
+        if not self.cache_path:
+            return
+        temp_path = self.cache_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": PROJECT_INDEX_VERSION, "scanned_at": self.scanned_at, "directories": self.directories}, f)
+        os.replace(temp_path, self.cache_path)
+
+    ########################################
+    # QUERIES
+    ########################################
+
+    def _listing(self, folder):
+        relative = os.path.relpath(os.path.abspath(folder), self.project_dir)
+        return self.directories.get("" if relative == "." else relative)
+
+    def files(self, folder):
+        """Sorted file names of a directory of the project ([] if it is not indexed)."""
+        listing = self._listing(folder)
+        return list(listing[1]) if listing is not None else []
+
+    def images(self, folder):
+        """Sorted .jpg file names of a directory of the project."""
+        return [name for name in self.files(folder) if name.lower().endswith(".jpg")]
+
+    def model_folders(self, credits_file="Credits.txt"):
+        """Subdirectories of the project holding a credits file and at least one JPG image."""
+        folders = []
+        for name in self.directories.get("", [0, [], []])[2]:
+            files = self.directories.get(name, [0, [], []])[1]
+            if credits_file in files and any(f.lower().endswith(".jpg") for f in files):
+                folders.append(os.path.join(self.project_dir, name))
+        return folders
+
+    def folder_config(self, folder):
+        """Path of a directory's own config.json, or None."""
+        return os.path.join(folder, "config.json") if "config.json" in self.files(folder) else None
+
+    def walk(self):
+        """(directory path, file names) pairs, top-down like os.walk."""
+        pending = [""]
+        while pending:
+            relative = pending.pop()
+            listing = self.directories.get(relative)
+            if listing is None:
+                continue
+            yield self._path(relative), listing[1]
+            pending.extend(os.path.join(relative, name) for name in reversed(listing[2]))
+
+    def find_file(self, filename):
+        """Full path of the first file of that name in the project, or None."""
+        for path, files in self.walk():
+            if filename in files:
+                return os.path.join(path, filename)
+        return None
+
+    def has_images(self):
+        """Whether any directory of the project holds a .jpg image."""
+        return any(name.lower().endswith(".jpg") for _, files in self.walk() for name in files)
+
+    def templates(self):
+        """Full paths of the .indd files in the project directory itself."""
+        return [os.path.join(self.project_dir, name) for name in self.files(self.project_dir)
+                if name.lower().endswith(".indd")]
+
+
+def load_project_index(project_dir):
+    """
+    Return the up-to-date index of a project, kept in memory for the process and
+    in project_dir/.project_index.json between runs.
+    """
+    project_dir = os.path.abspath(project_dir)
+    with _indexes_lock:
+        index = _indexes.get(project_dir)
+        if index is None:
+            index = _indexes[project_dir] = ProjectIndex(project_dir,
+                                                         os.path.join(project_dir, PROJECT_INDEX_FILE))
+        if index.scan():
+            try:
+                index.save()
+            except OSError as e:
+                print(f"[WARN] Could not write project index {index.cache_path}: {e}")
+    return index
+
+def list_images(folder):
+    """
+    Sorted .jpg names of a folder. When the folder's project index is loaded and the
+    folder is unchanged since it was listed, this costs one stat instead of a listing.
+    """
+    folder = os.path.abspath(folder)
+    index = _indexes.get(os.path.dirname(folder))
+    if index is not None:
+        listing = index._listing(folder)
+        try:
+            if listing is not None and listing[0] == os.stat(folder).st_mtime_ns:
+                return [name for name in listing[1] if name.lower().endswith(".jpg")]
+        except OSError:
+            pass
+    return sorted(f for f in os.listdir(folder) if f.lower().endswith(".jpg"))
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# proxies.py
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from image_index import ImageIndex, oriented_size
+
+########################################
+# PROXY SIZING
+########################################
+
+# Page coordinates are in points.
+POINTS_PER_INCH = 72.0
+
+def proxy_pixel_size(info, frame_bounds, ppi):
+    """
+    Stored (width, height) in pixels a proxy needs so that, filled proportionally
+    into a frame of frame_bounds ([top, left, bottom, right] in points), it still
+    has 'ppi' pixels per inch. Never larger than the original.
+    """
+    frame_w = (frame_bounds[3] - frame_bounds[1]) / POINTS_PER_INCH * ppi
+    frame_h = (frame_bounds[2] - frame_bounds[0]) / POINTS_PER_INCH * ppi
+    shown_w, shown_h = oriented_size(info)
+    scale = min(1.0, max(frame_w / shown_w, frame_h / shown_h))
+    width = max(1, round(info.width * scale))
+    height = max(1, round(info.height * scale))
+    return width, height
+
+def proxy_resolution(original_size, dpi, size):
+    """
+    The whole-number (x, y) resolution and the pixel size, close to size, of a
+    proxy with the same physical size as an original of original_size pixels at
+    dpi. JPEG stores whole-number resolutions, so the pixel size follows the
+    rounded resolution; the physical size is then off by under half a pixel.
+    """
+    resolution = tuple(max(1, round(d * s / o)) for d, s, o in zip(dpi, size, original_size))
+    pixels = tuple(max(1, min(o, round(o * r / d))) for o, r, d in zip(original_size, resolution, dpi))
+    return resolution, pixels
+
+def _content_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+# Proxies of another version are not reused (2: the resolution keeps the original's
+# physical size; 3: one proxy per original path, so relinking can tell copies apart).
+PROXY_VERSION = 3
+
+def _proxy_exif(exif, dpi):
+    """EXIF bytes with the resolution tags set to dpi (InDesign reads them before JFIF's)."""
+    exif[0x011A], exif[0x011B] = dpi       # XResolution, YResolution
+    exif[0x0128] = 2                       # ResolutionUnit: inches
+    return exif.tobytes()
+
+def proxy_file_name(source, digest, width, height):
+    """
+    <hash>-<w>x<h>-<path hash>.v<PROXY_VERSION>.jpg: named after the content, and
+    after the original's path, so that byte-identical originals (IMG_6975.JPG and
+    IMG_6975(1).JPG) each get a proxy of their own to be relinked from.
+    """
+    path_hash = hashlib.sha1(os.path.normcase(os.path.abspath(source)).encode("utf-8")).hexdigest()[:8]
+    return f"{digest}-{width}x{height}-{path_hash}.v{PROXY_VERSION}.jpg"
+
+def make_proxy(job):
+    """
+    Worker: write a downscaled copy of job's source JPEG into the content-addressed
+    proxy directory (<proxy_dir>/<hash[:2]>/, see proxy_file_name) unless it is
+    already there. EXIF (and so orientation) is carried over. The proxy keeps the
+    original's physical size (see proxy_resolution; an original without a
+    resolution counts as 72 ppi), so a placed proxy and its relinked original fill
+    a frame alike. Returns (source, proxy_path, created) or (source, None, error message).
+    """
+    source, (width, height), _, proxy_dir, quality = job
+    temp_path = None
+    try:
+        digest = _content_hash(source)
+        proxy_path = os.path.join(proxy_dir, digest[:2], proxy_file_name(source, digest, width, height))
+        if os.path.isfile(proxy_path):
+            return source, proxy_path, False
+
+        from PIL import Image
+        with Image.open(source) as image:
+            original_size = image.size
+            dpi = tuple(value if value and value > 0 else POINTS_PER_INCH
+                        for value in image.info.get("dpi", (0, 0)))
+            exif = image.getexif()
+            # Let the JPEG decoder scale by 1/2, 1/4 or 1/8 while decoding.
+            proxy_dpi, size = proxy_resolution(original_size, dpi, (width, height))
+            image.draft("RGB", size)
+            image = image.convert("RGB").resize(size, Image.LANCZOS)
+            os.makedirs(os.path.dirname(proxy_path), exist_ok=True)
+            temp_path = proxy_path + f".{os.getpid()}.tmp"
+            options = {"quality": quality, "dpi": proxy_dpi}
+            if exif:
+                options["exif"] = _proxy_exif(exif, proxy_dpi)
+            image.save(temp_path, "JPEG", **options)
+        os.replace(temp_path, proxy_path)
+        return source, proxy_path, True
+    except Exception as e:
+        # Leave no half-written proxy behind.
+        if temp_path is not None and os.path.exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        return source, None, str(e)
+
+########################################
+# PROXY STAGE
+########################################
+
+def plan_proxy_jobs(plan, index, ppi):
+    """
+    One job per distinct image of the plan, sized for the largest frame it is
+    planned into. Images missing from the index are left out (placed as is).
+    """
+    sizes = {}
+    for folder in plan.folders:
+        for page in folder.pages:
+            for frame in page.frames:
+                info = index.get(frame.image)
+                if info is None:
+                    continue
+                size = proxy_pixel_size(info, frame.bounds, ppi)
+                if frame.image not in sizes or size[0] > sizes[frame.image][0]:
+                    sizes[frame.image] = size
+    return sizes
+
+def generate_proxies(plan, proxy_dir, ppi=150, quality=85, workers=None, index=None):
+    """
+    Downscale every image of the plan to its planned frame size at 'ppi' in a
+    process pool and return {original path: proxy path}. Images that fail, or
+    would not get smaller, map to nothing and are placed from the original.
+    Requires Pillow; without it no proxies are made.
+    """
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("[WARN] Pillow is not installed; placing original images.")
+        return {}
+
+    if index is None:
+        index = ImageIndex().scan(sorted({folder.folder for folder in plan.folders}))
+    sizes = plan_proxy_jobs(plan, index, ppi)
+    jobs = [(source, size, ppi, proxy_dir, quality) for source, size in sorted(sizes.items())
+            if size != (index.get(source).width, index.get(source).height)]
+    mapping = {}
+    created = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for source, proxy_path, result in pool.map(make_proxy, jobs, chunksize=4):
+            if proxy_path is None:
+                print(f"[WARN] Could not make a proxy of {source}: {result}")
+                continue
+            mapping[source] = proxy_path
+            created += bool(result)
+    print(f"[INFO] Proxies: {len(mapping)} images ({created} generated, "
+          f"{len(mapping) - created} cached) in {proxy_dir}")
+    return mapping
+
+def plan_with_proxies(plan, mapping):
+    """Return a copy of the plan placing proxies wherever the mapping has one."""
+    folders = []
+    for folder in plan.folders:
+        pages = []
+        for page in folder.pages:
+            frames = tuple(frame._replace(image=mapping.get(frame.image, frame.image))
+                           for frame in page.frames)
+            pages.append(page._replace(frames=frames))
+        folders.append(folder._replace(pages=tuple(pages)))
+    return plan._replace(folders=tuple(folders))
+
+def relink_originals(doc, mapping):
+    """
+    Final step after layout: point every link that references a proxy back at
+    its original image and update it. Returns the number of links relinked.
+    """
+    originals = {os.path.normcase(os.path.abspath(proxy)): source for source, proxy in mapping.items()}
+    relinked = 0
+    links = doc.Links
+    for i in range(1, links.Count + 1):
+        link = links.Item(i)
+        source = originals.get(os.path.normcase(os.path.abspath(link.FilePath)))
+        if source is None:
+            continue
+        try:
+            link.Relink(source)
+            link.Update()
+            relinked += 1
+        except Exception as e:
+            print(f"[ERROR] Relinking {link.FilePath} to {source}: {e}")
+    print(f"[INFO] Relinked {relinked} proxies to their originals.")
+    return relinked
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# rebuild.py
+
+import hashlib
+import json
+import os
+
+from backend import SAVE_NO
+from config_module import compile_config
+from planner import PLAN_CONFIG_KEYS, IssuePlan, folder_rng, plan_folder
+from progress import report_progress
+from tracing import span
+
+# Build graph kept next to output.indd: which inputs produced which pages.
+BUILD_GRAPH_FILE = ".build_graph.json"
+
+# Settings that move or reshape every generated page; changing any of them
+# (or the template itself) calls for a full rebuild.
+LAYOUT_CONFIG_KEYS = ("template_file", "split_page", "assembly_mode")
+
+########################################
+# FINGERPRINTS
+########################################
+
+def _file_digest(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def folder_fingerprint(model_folder, config, known_files=None):
+    """
+    Content hash of a model folder: its JPEGs and credits file, by content, and
+    the planning config with the folder's own overrides. known_files ({name:
+    [size, mtime_ns, sha1]}, from the previous build) lets unchanged files skip
+    rehashing. Returns (hash, files).
+    """
+    known_files = known_files or {}
+    config = compile_config(config).folder(model_folder)
+    credits_file = config.get("credits_file", "Credits.txt")
+    files = {}
+    with os.scandir(model_folder) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if not entry.is_file():
+                continue
+            if not (entry.name.lower().endswith(".jpg") or entry.name == credits_file):
+                continue
+            stat = entry.stat()
+            known = known_files.get(entry.name)
+            if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+                digest = known[2]
+            else:
+                digest = _file_digest(entry.path)
+            files[entry.name] = [stat.st_size, stat.st_mtime_ns, digest]
+    h = hashlib.sha1()
+    inputs = {key: config.get(key) for key in PLAN_CONFIG_KEYS}
+    h.update(json.dumps(inputs, sort_keys=True).encode("utf-8"))
+    for name, (_, _, digest) in files.items():
+        h.update(f"{name}|{digest}".encode("utf-8"))
+    return h.hexdigest(), files
+
+def layout_key(config):
+    """Hash of the template and the settings shared by every folder's pages."""
+    template_path = os.path.join(config["project_dir"], config["template_file"])
+    try:
+        stat = os.stat(template_path)
+        template_state = [stat.st_size, stat.st_mtime_ns]
+    except OSError:
+        template_state = None
+    inputs = {key: config.get(key) for key in LAYOUT_CONFIG_KEYS}
+    data = json.dumps([inputs, template_state], sort_keys=True)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+########################################
+# BUILD GRAPH
+########################################
+
+class BuildGraph:
+    """
+    Dependency graph of output.indd: the build's layout seed and, per model folder in issue order,
+    its content hash and page range. The first folder's pages start at split_page.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.layout_key = None
+        self.seed = None
+        self.page_count = None
+        self.folders = []
+        self._fingerprints = {}
+
+    @classmethod
+    def load(cls, project_dir):
+        graph = cls(os.path.join(project_dir, BUILD_GRAPH_FILE))
+        if not os.path.isfile(graph.path):
+            return graph
+        try:
+            with open(graph.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == 2:
+                graph.layout_key = data["layout_key"]
+                graph.seed = data["seed"]
+                graph.page_count = data["page_count"]
+                graph.folders = list(data["folders"])
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[WARN] Ignoring unreadable build graph {graph.path}: {e}")
+        return graph
+
+    def entry(self, folder):
+        for entry in self.folders:
+            if entry["folder"] == folder:
+                return entry
+        return None
+
+    def fingerprint(self, model_folder, config):
+        """folder_fingerprint, reusing the file digests of the previous build."""
+        if model_folder not in self._fingerprints:
+            entry = self.entry(model_folder)
+            known = entry["files"] if entry else None
+            self._fingerprints[model_folder] = folder_fingerprint(model_folder, config, known)
+        return self._fingerprints[model_folder]
+
+    def changed_folders(self, model_folders, config):
+        """
+        Model folders whose pages must be regenerated, in issue order, or None when
+        the graph cannot be used (no previous build, the template or shared layout
+        settings changed, or folders were added, removed or reordered).
+        """
+        if not self.folders or self.layout_key != layout_key(config):
+            return None
+        if [entry["folder"] for entry in self.folders] != list(model_folders):
+            return None
+        return [entry["folder"] for entry in self.folders
+                if self.fingerprint(entry["folder"], config)[0] != entry["hash"]]
+
+    def record(self, config, plan, first_page, page_count):
+        """Replace the graph with the folders of a full build's plan."""
+        self.layout_key = layout_key(config)
+        self.seed = plan.seed
+        self.page_count = page_count
+        self.folders = []
+        page = first_page
+        for folder_plan in plan.folders:
+            fingerprint, files = self.fingerprint(folder_plan.folder, config)
+            self.folders.append({"folder": folder_plan.folder, "hash": fingerprint, "files": files,
+                                 "first_page": page, "pages": len(folder_plan.pages)})
+            page += len(folder_plan.pages)
+
+    def replace(self, folder, config, new_pages):
+        """Record a rebuilt folder and shift the page ranges behind it."""
+        entry = self.entry(folder)
+        fingerprint, files = self.fingerprint(folder, config)
+        shift = new_pages - entry["pages"]
+        entry.update(hash=fingerprint, files=files, pages=new_pages)
+        for other in self.folders:
+            if other["first_page"] > entry["first_page"]:
+                other["first_page"] += shift
+        self.page_count += shift
+
+    def save(self):
+        data = {"version": 2, "layout_key": self.layout_key, "seed": self.seed, "page_count": self.page_count,
+                "folders": self.folders}
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"[WARN] Could not write build graph {self.path}: {e}")
+
+########################################
+# INCREMENTAL REBUILD
+########################################
+
+def rebuild_changed_folders(config, backend, model_folders):
+    """
+    Regenerate only the page ranges of output.indd whose model folder changed.
+    Each changed folder is replanned and its new pages are inserted behind its old
+    range, which is then deleted; every other page is left untouched. Returns
+    True when output.indd is up to date, False when a full build is needed.
+    """
+    from automation import place_folder_plan
+    from pages import InsertionCursor
+    from resources import DocumentResources
+
+    project_dir = config["project_dir"]
+    output_path = os.path.join(project_dir, "output.indd")
+    graph = BuildGraph.load(project_dir)
+    if not os.path.exists(output_path):
+        return False
+    changed = graph.changed_folders(model_folders, config)
+    if changed is None:
+        print("[INFO] No usable build graph for this issue; doing a full build.")
+        return False
+    if not changed:
+        print("[INFO] Incremental rebuild: no model folder changed; output.indd is up to date.")
+        return True
+
+    doc = backend.app.Open(output_path)
+    if doc.Pages.Count != graph.page_count:
+        print("[WARN] output.indd was changed outside the pipeline; doing a full build.")
+        doc.Close(SAVE_NO)
+        return False
+
+    page_width = doc.DocumentPreferences.PageWidth
+    page_height = doc.DocumentPreferences.PageHeight
+    # The old page counts stand in for the new ones, which are only known once replanned.
+    report_progress("issue", folders=len(changed), pages=sum(graph.entry(folder)["pages"] for folder in changed))
+    # Shared by the changed folders; each swatch and font is resolved on first use.
+    resources = DocumentResources(doc, backend.app)
+    # Back to front, so the page numbers of the folders still to do stay valid.
+    for folder in reversed(changed):
+        entry = graph.entry(folder)
+        # Planned as a full build with the same seed would plan it.
+        folder_plan = plan_folder(folder, config, page_width, page_height, rng=folder_rng(graph.seed, folder))
+        if folder_plan is None:
+            doc.Close(SAVE_NO)
+            return False
+        print(f"[INFO] Rebuilding pages {entry['first_page']}-{entry['first_page'] + entry['pages'] - 1} "
+              f"for {folder}")
+        last_old_page = entry["first_page"] + entry["pages"] - 1
+        report_progress("folder", folder=os.path.basename(folder))
+        with span("folder", category="folder", folder=os.path.basename(folder), pages=len(folder_plan.pages)):
+            if config.get("execution_mode", "com") == "script":
+                from script_compiler import compile_plan, run_script
+                subplan = IssuePlan(None, page_width, page_height, (folder_plan,))
+                summary = run_script(backend.app, compile_plan(subplan, doc.Name, insert_after=last_old_page))
+                report_progress("page", pages=summary["pages"], images=summary["frames"])
+            else:
+                cursor = InsertionCursor(doc, doc.Pages.Item(last_old_page))
+                place_folder_plan(doc, folder_plan, config, backend, pages=cursor, resources=resources)
+            for _ in range(entry["pages"]):
+                doc.Pages.Item(entry["first_page"]).Delete()
+        graph.replace(folder, config, len(folder_plan.pages))
+
+    doc.Save(output_path)
+    doc.Close(SAVE_NO)
+    graph.save()
+    print(f"[INFO] Incremental rebuild: {len(changed)} of {len(model_folders)} model folder(s) regenerated.")
+    return True
+
+def record_build(config, plan, page_count):
+    """Write the build graph of a full build of output.indd from its issue plan."""
+    graph = BuildGraph.load(config["project_dir"])
+    graph.record(config, plan, config["split_page"], page_count)
+    graph.save()
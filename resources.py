@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# resources.py
+
+from planner import CREDIT_SWATCH_VALUES
+from text_metrics import bold_font_name
+
+def credits_style_name(font_name, color, size, leading):
+    """Name of the credits paragraph style of a font and color: "Credits Arial Red 24/19.2"."""
+    family = font_name.partition("\t")[0]
+    return f"Credits {family} {color} {size:g}/{leading:g}"
+
+def title_style_name(font_name, size):
+    """Name of the character style of the credits' bold first paragraph: "Credits Title Arial 36"."""
+    family = font_name.partition("\t")[0]
+    return f"Credits Title {family} {size:g}"
+
+########################################
+# DOCUMENT RESOURCES
+########################################
+
+class DocumentResources:
+    """
+    The swatches, fonts and credits styles of one open document, each looked up (or created)
+    once; existing credits styles are updated to the current definition.
+    """
+
+    def __init__(self, doc, app):
+        self.doc = doc
+        self.app = app
+        self.swatches = {}
+        self.created = []
+        self._installed = {}
+        self.styles = {}
+
+    @classmethod
+    def for_folders(cls, doc, app, folder_plans):
+        """Resources for the credits of planner.FolderPlans."""
+        credits = [page.credits for folder_plan in folder_plans for page in folder_plan.pages
+                   if page.credits is not None]
+        resources = cls(doc, app).prepare([c.color for c in credits], [c.font for c in credits])
+        for c in credits:
+            resources.credits_styles(c.font, c.bold_font, c.color, c.size, c.bold_size, c.leading)
+        return resources
+
+    def prepare(self, colors=(), fonts=()):
+        """Resolve colors (creating the missing swatches) and fonts with their bold faces."""
+        missing = []
+        for name in dict.fromkeys(colors):
+            if name in self.swatches:
+                continue
+            try:
+                self.swatches[name] = self.doc.Colors.Item(name)
+            except Exception:
+                missing.append(name)
+        for name in missing:
+            swatch = self.doc.Colors.Add()
+            swatch.Name = name
+            swatch.ColorValue = CREDIT_SWATCH_VALUES.get(name.lower(), [0, 0, 0, 100])
+            self.swatches[name] = swatch
+            self.created.append(name)
+        if missing:
+            print(f"[INFO] Created missing swatches: {', '.join(missing)}.")
+        for name in dict.fromkeys(fonts):
+            if self.font(name) is None:
+                print(f"[WARN] Font {name!r} is not installed; credits keep the default font.")
+            self.bold_font(name)
+        return self
+
+    def swatch(self, name):
+        swatch = self.swatches.get(name)
+        if swatch is None:
+            swatch = self.prepare([name]).swatches[name]
+        return swatch
+
+    def installed(self, font_name):
+        """Whether the application has the font ("Family\\tStyle")."""
+        installed = self._installed.get(font_name)
+        if installed is None:
+            try:
+                installed = self.app.Fonts.Item(font_name).Name is not None
+            except Exception:
+                installed = False
+            self._installed[font_name] = installed
+        return installed
+
+    def font(self, font_name):
+        """font_name if it is installed, else None."""
+        return font_name if self.installed(font_name) else None
+
+    def bold_font(self, font_name):
+        """
+        The bold face of a font ("Family\\tBold", see text_metrics.bold_font_name,
+        the name the planner puts in a CreditsPlan) if it is installed, else None.
+        """
+        return self.font(bold_font_name(font_name))
+
+    def _style(self, styles, name):
+        try:
+            return styles.Item(name)
+        except Exception:
+            style = styles.Add()
+            style.Name = name
+            return style
+
+    def credits_styles(self, font_name, bold_font, color, size, bold_size, leading):
+        """
+        The (paragraph style, character style) of credits set in font_name and color
+        at size with leading, the first paragraph in bold_font at bold_size.
+        A font that is not installed is left to the document's default.
+        """
+        name = credits_style_name(font_name, color, size, leading)
+        paragraph_style = self.styles.get(name)
+        if paragraph_style is None:
+            paragraph_style = self._style(self.doc.ParagraphStyles, name)
+            if self.font(font_name) is not None:
+                paragraph_style.AppliedFont = font_name
+            paragraph_style.PointSize = size
+            paragraph_style.FillColor = self.swatch(color)
+            paragraph_style.Leading = leading
+            self.styles[name] = paragraph_style
+        title = title_style_name(font_name, bold_size)
+        title_style = self.styles.get(title)
+        if title_style is None:
+            title_style = self._style(self.doc.CharacterStyles, title)
+            if self.font(bold_font) is not None:
+                title_style.AppliedFont = bold_font
+            title_style.PointSize = bold_size
+            self.styles[title] = title_style
+        return paragraph_style, title_style
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# scheduler.py
+
+import itertools
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from batch import format_summary, load_project_config, run_project
+from cancellation import CancelToken
+
+########################################
+# PREPARE STAGE (PROCESS POOL)
+########################################
+
+def prepare_project(project_dir, overrides):
+    """
+    The pure-Python part of a project, run in a worker process ahead of its
+    backend session: scan the model folders, refresh the JPEG header index and,
+    when the page size is known (config["page_size"]), plan the issue into the
+    plan cache and generate its proxies. The session then finds all of it cached.
+
+    An unseeded project gets a seed here, returned in "overrides", so the plan
+    the session replays is the one that was cached.
+    """
+    from automation import find_model_folders
+    from image_index import ImageIndex
+    from planner import cached_plan_issue
+
+    start = time.perf_counter()
+    config = load_project_config(project_dir, overrides)
+    model_folders = find_model_folders(project_dir)
+    index = ImageIndex(os.path.join(project_dir, ".image_index.json")).scan(model_folders)
+    index.save()
+
+    seed = config.get("layout_seed")
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    config = config.replace(layout_seed=seed)
+    planned = False
+    page_size = config.get("page_size")
+    if page_size and model_folders:
+        # Same target page and page size types as populate_document, or the cache misses.
+        inplace = config.get("assembly_mode", "split_merge") == "inplace"
+        target_page = None if inplace else config.get("target_page")
+        plan = cached_plan_issue(model_folders, config, float(page_size[0]), float(page_size[1]),
+                                 target_page=target_page,
+                                 cache_dir=os.path.join(project_dir, ".plan_cache"))
+        planned = True
+        if config.get("proxy_images"):
+            from proxies import generate_proxies
+            generate_proxies(plan, config.get("proxy_dir") or os.path.join(project_dir, ".proxies"),
+                             ppi=config.get("proxy_ppi", 150), workers=1, index=index)
+    return {"overrides": {"layout_seed": seed}, "folders": len(model_folders),
+            "images": len(index.entries), "planned": planned,
+            "seconds": round(time.perf_counter() - start, 3)}
+
+########################################
+# SCHEDULER
+########################################
+
+class ProjectJob:
+    """One issue to build. Higher priority runs first; timeout bounds its session stage."""
+
+    def __init__(self, project_dir, overrides=None, priority=0, timeout=None, seq=0):
+        self.project_dir = project_dir
+        self.overrides = dict(overrides or {})
+        self.priority = priority
+        self.timeout = timeout
+        self.seq = seq
+        self.prepared = None
+        self.ready_at = None
+        self.result = None
+
+
+class JobScheduler:
+    """
+    Builds many projects at once: prepare stages in a process pool, placement on backend sessions
+    (one thread and application each, one session over COM), highest priority first.
+    """
+
+    def __init__(self, sessions=1, prepare_workers=None, backend_config=None, backend_factory=None,
+                 log_name=None):
+        from backend import create_backend
+
+        if backend_factory is None and (backend_config or {}).get("backend", "com") == "com" and sessions > 1:
+            print(f"[WARN] {sessions} sessions requested, but every COM session drives the same InDesign "
+                  f"instance, mouse and keyboard; running one session.")
+            sessions = 1
+        self.sessions = sessions
+        self.prepare_workers = prepare_workers
+        self.backend_factory = backend_factory or (lambda: create_backend(backend_config))
+        self.log_name = log_name
+        self.jobs = []
+        self._seq = itertools.count()
+        self._ready = queue.PriorityQueue()
+        self._lock = threading.Lock()
+
+    def submit(self, project_dir, overrides=None, priority=0, timeout=None):
+        job = ProjectJob(project_dir, overrides, priority, timeout, next(self._seq))
+        self.jobs.append(job)
+        return job
+
+    def _session(self, number):
+        try:
+            import pythoncom  # COM must be initialised on every thread that uses it.
+            pythoncom.CoInitialize()
+        except ImportError:
+            pythoncom = None
+        try:
+            backend, error = None, None
+            try:
+                backend = self.backend_factory()
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                print(f"[ERROR] Session {number} could not start its backend: {error}")
+            if backend is not None and backend.name == "com" and number > 1:
+                # COM connections all reach the one running InDesign; only the first session may use it.
+                print(f"[WARN] Session {number} shares InDesign with session 1 over COM; it takes no jobs.")
+                return
+            while True:
+                _, _, job = self._ready.get()
+                if job is None:
+                    break
+                log_path = os.path.join(job.project_dir, self.log_name) if self.log_name else None
+                waited = time.perf_counter() - job.ready_at
+                if backend is None:
+                    result = _failed_result(job.project_dir, error)
+                else:
+                    try:
+                        with CancelToken(job.timeout).activate():
+                            result = run_project(job.project_dir, job.overrides, log_path=log_path,
+                                                 backend=backend)
+                    except Exception as e:
+                        result = _failed_result(job.project_dir, f"{type(e).__name__}: {e}")
+                result.update(priority=job.priority, session=number, wait_seconds=round(waited, 3),
+                              prepare=job.prepared)
+                with self._lock:
+                    job.result = result
+                print(f"[INFO] Session {number}: {result['status']} {job.project_dir} "
+                      f"in {result['seconds']:.1f}s")
+        finally:
+            if pythoncom is not None:
+                pythoncom.CoUninitialize()
+
+    def run(self):
+        """Run every submitted job and return the summary (see batch.run_batch)."""
+        start = time.perf_counter()
+        ordered = sorted(self.jobs, key=lambda job: (-job.priority, job.seq))
+        threads = [threading.Thread(target=self._session, args=(number,), name=f"session-{number}")
+                   for number in range(1, self.sessions + 1)]
+        for thread in threads:
+            thread.start()
+
+        with ProcessPoolExecutor(max_workers=self.prepare_workers) as pool:
+            futures = {pool.submit(prepare_project, job.project_dir, job.overrides): job for job in ordered}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    job.prepared = future.result()
+                    job.overrides.update(job.prepared["overrides"])
+                except Exception as e:
+                    print(f"[WARN] Preparing {job.project_dir} failed ({e}); the session will do it.")
+                job.ready_at = time.perf_counter()
+                self._ready.put((-job.priority, job.seq, job))
+
+        for number in range(len(threads)):
+            self._ready.put((float("inf"), number, None))
+        for thread in threads:
+            thread.join()
+
+        seconds = time.perf_counter() - start
+        results = [job.result for job in ordered]
+        ok = sum(1 for result in results if result["status"] == "ok")
+        return {"projects": results, "ok": ok, "failed": len(results) - ok, "seconds": round(seconds, 3),
+                "issues_per_hour": round(ok / seconds * 3600, 1) if seconds else 0.0}
+
+
+def _failed_result(project_dir, error):
+    """The result of a job its session could not run (see batch.run_project for the fields)."""
+    return {"project": project_dir, "status": "failed", "output": None, "seconds": 0.0, "stages": {},
+            "app_calls": 0, "app_seconds": 0.0, "error": error}
+
+def format_throughput(summary):
+    """format_summary plus the batch's throughput."""
+    return (format_summary(summary) + "\n"
+            + f"Throughput: {summary['issues_per_hour']:.1f} issues/hour.")
@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+# script_compiler.py
+
+import json
+import os
+
+from backend import FILL_PROPORTIONALLY, JAVASCRIPT
+from planner import plan_to_dict
+from resources import credits_style_name, title_style_name
+
+# Marker the generated program starts its data block with. Anything that needs
+# to read a compiled plan back (the fake backend, a golden comparison) looks for it.
+PLAN_MARKER = "var PLAN = "
+
+########################################
+# COMPILER
+########################################
+
+# The ExtendScript runtime that replays a plan inside InDesign. Page acquisition
+# follows get_empty_page (and EmptyPageAllocator): the requested target page if
+# it is empty, otherwise the first empty page, otherwise a new page at the end of
+# the document, with the empty pages indexed once up front. With
+# plan.insert_after set, pages are inserted one after another behind that page.
+_RUNTIME = """\
+(function (plan) {
+    var doc = app.documents.itemByName(plan.document);
+    var pagesUsed = 0, framesPlaced = 0, creditsAdded = 0, errors = [];
+    var swatches = {};
+    var styles = {};
+    var cursor = plan.insert_after === null ? null : doc.pages[plan.insert_after - 1];
+    var empty = [];
+
+    if (cursor === null) {
+        var allPages = doc.pages.everyItem().getElements();
+        for (var i = 0; i < allPages.length; i++) {
+            if (allPages[i].pageItems.length === 0) {
+                empty.push(allPages[i]);
+            }
+        }
+    }
+
+    function nextPage(target) {
+        if (cursor !== null) {
+            cursor = doc.pages.add(LocationOptions.AFTER, cursor);
+            return cursor;
+        }
+        for (var i = 0; i < empty.length; i++) {
+            if (target !== null && empty[i].documentOffset === target - 1) {
+                return empty.splice(i, 1)[0];
+            }
+        }
+        if (empty.length > 0) {
+            return empty.shift();
+        }
+        return doc.pages.add(LocationOptions.AT_END);
+    }
+
+    function swatch(name, value) {
+        if (!swatches[name]) {
+            var color = doc.colors.itemByName(name);
+            if (!color.isValid) {
+                color = doc.colors.add();
+                color.name = name;
+                color.colorValue = value;
+            }
+            swatches[name] = color;
+        }
+        return swatches[name];
+    }
+
+    // Credits styles are defined once per name (see resources.credits_styles) and
+    // referenced by every credits frame.
+    function style(collection, name) {
+        var found = collection.itemByName(name);
+        return found.isValid ? found : collection.add({name: name});
+    }
+
+    // A font that is not installed is left to the document's default, as over COM.
+    function installed(name) {
+        return app.fonts.itemByName(name).isValid;
+    }
+
+    function creditsStyles(spec) {
+        if (!styles[spec.style]) {
+            var body = style(doc.paragraphStyles, spec.style);
+            if (installed(spec.font)) {
+                body.appliedFont = spec.font;
+            }
+            body.pointSize = spec.size;
+            body.fillColor = swatch(spec.color, spec.color_value);
+            body.leading = spec.leading;
+            styles[spec.style] = body;
+        }
+        if (!styles[spec.title_style]) {
+            var title = style(doc.characterStyles, spec.title_style);
+            if (installed(spec.bold_font)) {
+                title.appliedFont = spec.bold_font;
+            }
+            title.pointSize = spec.bold_size;
+            styles[spec.title_style] = title;
+        }
+        return [styles[spec.style], styles[spec.title_style]];
+    }
+
+    function addCredits(page, spec) {
+        var frame = page.textFrames.add();
+        frame.geometricBounds = spec.bounds;
+        frame.contents = spec.text;
+        var story = frame.parentStory;
+        try {
+            var credits = creditsStyles(spec);
+            story.appliedParagraphStyle = credits[0];
+            if (story.paragraphs.length > 0) {
+                story.paragraphs[0].appliedCharacterStyle = credits[1];
+            }
+        } catch (e) {
+            errors.push("credits: " + e);
+        }
+        creditsAdded++;
+    }
+
+    for (var f = 0; f < plan.folders.length; f++) {
+        var folderPages = plan.folders[f].pages;
+        for (var p = 0; p < folderPages.length; p++) {
+            var spec = folderPages[p];
+            var page = nextPage(spec.target);
+            pagesUsed++;
+            for (var r = 0; r < spec.frames.length; r++) {
+                var rect = page.rectangles.add();
+                rect.geometricBounds = spec.frames[r].bounds;
+                try {
+                    rect.place(File(spec.frames[r].image));
+                    rect.fit(plan.fit);
+                    framesPlaced++;
+                } catch (e) {
+                    errors.push(spec.frames[r].image + ": " + e);
+                }
+            }
+            if (spec.credits) {
+                addCredits(page, spec.credits);
+            }
+        }
+    }
+    var relinked = 0;
+    if (plan.relink.length > 0) {
+        var originals = {};
+        for (var k = 0; k < plan.relink.length; k++) {
+            originals[plan.relink[k][0].toLowerCase()] = plan.relink[k][1];
+        }
+        var links = doc.links.everyItem().getElements();
+        for (var l = 0; l < links.length; l++) {
+            var original = originals[links[l].filePath.replace(/\\\\/g, "/").toLowerCase()];
+            if (original) {
+                try {
+                    links[l].relink(File(original));
+                    links[l].update();
+                    relinked++;
+                } catch (e) {
+                    errors.push(original + ": " + e);
+                }
+            }
+        }
+    }
+    return [pagesUsed, framesPlaced, creditsAdded, relinked, errors.join("\\n")].join("|");
+})(PLAN);
+"""
+
+def _script_path(path):
+    # ExtendScript File() wants absolute paths with forward slashes.
+    return os.path.abspath(path).replace("\\", "/")
+
+def compile_plan(plan, document_name, insert_after=None, relink=None):
+    """
+    Turn a planner.IssuePlan into a single ExtendScript program that fills the
+    document called document_name. insert_after (1-based) inserts the pages
+    behind that page instead of filling empty pages. relink ({original: proxy},
+    see proxies.py) points the placed proxies back at their originals at the end.
+    The output is deterministic for a given plan, so it can be compared against
+    golden copies.
+    """
+    data = plan_to_dict(plan)
+    for folder in data["folders"]:
+        folder["folder"] = _script_path(folder["folder"])
+        for page in folder["pages"]:
+            for frame in page["frames"]:
+                frame["image"] = _script_path(frame["image"])
+            credits = page["credits"]
+            if credits:
+                credits.update(style=credits_style_name(credits["font"], credits["color"], credits["size"],
+                                                        credits["leading"]),
+                               title_style=title_style_name(credits["font"], credits["bold_size"]))
+    data.update(document=document_name, fit=FILL_PROPORTIONALLY, insert_after=insert_after,
+                relink=sorted([_script_path(proxy), _script_path(source)]
+                              for source, proxy in (relink or {}).items()))
+    text = json.dumps(data, indent=2, sort_keys=True, ensure_ascii=True)
+    return ("// Generated by script_compiler.py from an issue plan. Do not edit.\n"
+            + PLAN_MARKER + text + ";\n" + _RUNTIME)
+
+def extract_plan(script):
+    """Return the plan embedded in a compiled script, or None."""
+    start = script.find(PLAN_MARKER)
+    if start < 0:
+        return None
+    plan, _ = json.JSONDecoder().raw_decode(script, start + len(PLAN_MARKER))
+    return plan
+
+def parse_result(result):
+    """Turn the runtime's "pages|frames|credits|relinked|errors" string into a summary dict."""
+    pages, frames, credits, relinked, errors = str(result).split("|", 4)
+    return {
+        "pages": int(pages),
+        "frames": int(frames),
+        "credits": int(credits),
+        "relinked": int(relinked),
+        "errors": [e for e in errors.split("\n") if e],
+    }
+
+def run_script(app, script):
+    """Execute a compiled plan with one DoScript round trip and return its summary."""
+    summary = parse_result(app.DoScript(script, JAVASCRIPT))
+    print(f"[INFO] Script run: {summary['pages']} pages, {summary['frames']} frames, "
+          f"{summary['credits']} credits, {summary['relinked']} relinked, "
+          f"{len(summary['errors'])} errors.")
+    for error in summary["errors"]:
+        print(f"[ERROR] {error}")
+    return summary
+
+########################################
+# FAKE BACKEND EMULATION
+########################################
+
+def emulate_script(app, script):
+    """
+    Replay a compiled script against a FakeApplication, mirroring _RUNTIME, and
+    return the same result string InDesign would. Used by the fake backend's
+    DoScript; the work happens in-process, so no backend calls are recorded.
+    """
+    from backend import FakeColor, FakeRectangle, FakeStyle, FakeTextFrame, FakeComError
+
+    plan = extract_plan(script)
+    matches = [d for d in app._documents if d._props.get("Name") == plan["document"]]
+    if not matches:
+        raise FakeComError(f"No document named {plan['document']!r}")
+    doc = matches[0]
+    backend = app._backend
+    pages_used = frames_placed = credits_added = 0
+    cursor = [] if plan["insert_after"] is None else [doc._pages[plan["insert_after"] - 1]]
+    empty = [] if cursor else [page for page in doc._pages if not page._items]
+
+    def next_page(target):
+        if cursor:
+            cursor[0] = doc._new_page(doc._pages.index(cursor[0]) + 1)
+            return cursor[0]
+        for page in empty:
+            if target is not None and doc._pages.index(page) == target - 1:
+                empty.remove(page)
+                return page
+        if empty:
+            return empty.pop(0)
+        return doc._new_page()
+
+    def swatch(name, value):
+        for color in doc._colors:
+            if color._props.get("Name") == name:
+                return color
+        color = FakeColor(backend, doc)
+        color._props.update(Name=name, ColorValue=value)
+        doc._colors.append(color)
+        return color
+
+    def style(styles, kind, name, **props):
+        for existing in styles:
+            if existing._props.get("Name") == name:
+                break
+        else:
+            existing = FakeStyle(backend, kind, name)
+            styles.append(existing)
+        existing._props.update(props)
+        return existing
+
+    defined = {}
+
+    def fonts(**props):
+        return {key: name for key, name in props.items() if name in backend.fonts}
+
+    def credits_styles(credits):
+        if credits["style"] not in defined:
+            defined[credits["style"]] = style(
+                doc._paragraph_styles, "ParagraphStyle", credits["style"], **fonts(AppliedFont=credits["font"]),
+                PointSize=credits["size"], FillColor=swatch(credits["color"], credits["color_value"]),
+                Leading=credits["leading"])
+        if credits["title_style"] not in defined:
+            defined[credits["title_style"]] = style(
+                doc._character_styles, "CharacterStyle", credits["title_style"],
+                **fonts(AppliedFont=credits["bold_font"]), PointSize=credits["bold_size"])
+        return defined[credits["style"]], defined[credits["title_style"]]
+
+    for folder in plan["folders"]:
+        for spec in folder["pages"]:
+            page = next_page(spec["target"])
+            pages_used += 1
+            for frame in spec["frames"]:
+                rect = FakeRectangle(backend, page)
+                rect._props.update(GeometricBounds=frame["bounds"], Graphic=frame["image"])
+                page._items.append(rect)
+                frames_placed += 1
+            credits = spec["credits"]
+            if credits:
+                text_frame = FakeTextFrame(backend, page)
+                text_frame._props.update(GeometricBounds=credits["bounds"], Contents=credits["text"])
+                paragraph_style, title_style = credits_styles(credits)
+                text_frame.ParentStory._props["AppliedParagraphStyle"] = paragraph_style
+                paragraphs = text_frame.ParentStory._paragraphs()
+                if paragraphs:
+                    paragraphs[0]._props["AppliedCharacterStyle"] = title_style
+                page._items.append(text_frame)
+                credits_added += 1
+    originals = {proxy.lower(): source for proxy, source in plan["relink"]}
+    relinked = 0
+    for page in doc._pages:
+        for item in page._items:
+            source = originals.get(str(item._props.get("Graphic")).lower())
+            if source is not None:
+                item._props["Graphic"] = source
+                relinked += 1
+    return f"{pages_used}|{frames_placed}|{credits_added}|{relinked}|"
+
+
+if __name__ == "__main__":
+    # Print the script for a project tree (deterministic for a given --seed).
+    import argparse
+    from automation import find_model_folders
+    from config_module import load_config
+    from planner import plan_issue
+
+    parser = argparse.ArgumentParser(description="Compile a project into one ExtendScript program.")
+    parser.add_argument("project_dir")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--page-size", type=float, nargs=2, default=(612.0, 792.0))
+    args = parser.parse_args()
+
+    config = load_config(os.path.join(args.project_dir, "config.json"))
+    folders = sorted(find_model_folders(args.project_dir))
+    plan = plan_issue(folders, config, *args.page_size,
+                      target_page=config.get("target_page"), seed=args.seed)
+    print(compile_plan(plan, "temp.indd"))
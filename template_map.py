@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# template_map.py
+
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+TEMPLATE_MAP_FILE = ".template_maps.json"
+
+# What the pipeline needs to know about a template without opening it:
+# page_count, and item_counts[i] the number of page items on page i + 1.
+TemplateMap = namedtuple("TemplateMap", "digest page_count item_counts")
+
+def empty_pages(page_map):
+    """1-based numbers of the template's pages without any page item."""
+    return [index for index, count in enumerate(page_map.item_counts, 1) if count == 0]
+
+def check_split_page(page_map, split_page):
+    """
+    Return why split_page does not fit the template, or None if it does: it
+    must be a page of the template, and the marker page is expected to be empty.
+    """
+    if split_page < 1 or split_page > page_map.page_count:
+        return f"Split page {split_page} is outside the template's {page_map.page_count} pages."
+    if page_map.item_counts[split_page - 1]:
+        return (f"Split page {split_page} is not empty; the template's empty pages are "
+                f"{', '.join(str(page) for page in empty_pages(page_map)) or 'none'}.")
+    return None
+
+def _file_digest(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+########################################
+# TEMPLATE MAP CACHE
+########################################
+
+class TemplateMapCache:
+    """
+    Page maps of templates keyed by the template file's SHA-1 (rehashed only when its size or
+    mtime changes), so a template reused across issues is opened and probed once.
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+        self.maps = {}
+        self.files = {}
+        self._dirty = False
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.maps = {digest: TemplateMap(digest, entry["page_count"], tuple(entry["item_counts"]))
+                             for digest, entry in data["maps"].items()}
+                self.files = data["files"]
+            except (OSError, ValueError, KeyError, TypeError):
+                self.maps, self.files = {}, {}
+
+    def digest(self, template_path):
+        """Content hash of a template file, or None if it cannot be read."""
+        path = os.path.abspath(template_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        known = self.files.get(path)
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+        try:
+            digest = _file_digest(path)
+        except OSError:
+            return None
+        self.files[path] = [stat.st_size, stat.st_mtime_ns, digest]
+        self._dirty = True
+        return digest
+
+    def get(self, template_path):
+        digest = self.digest(template_path)
+        return self.maps.get(digest) if digest is not None else None
+
+    def record(self, template_path, doc):
+        """
+        Probe an open template's pages (one PageItems.Count per page) and keep its map.
+        Returns the map, or None if the template file cannot be hashed.
+        """
+        digest = self.digest(template_path)
+        if digest is None:
+            return None
+        page_count = doc.Pages.Count
+        item_counts = tuple(doc.Pages.Item(index).PageItems.Count for index in range(1, page_count + 1))
+        page_map = self.maps[digest] = TemplateMap(digest, page_count, item_counts)
+        self._dirty = True
+        return page_map
+
+    def save(self):
+        """Write the cache back to its file (atomically) if anything changed."""
+        if not self.cache_path or not self._dirty:
+            return
+        maps = {digest: {"page_count": page_map.page_count, "item_counts": list(page_map.item_counts)}
+                for digest, page_map in self.maps.items()}
+        temp_path = self.cache_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "maps": maps, "files": self.files}, f)
+        os.replace(temp_path, self.cache_path)
+        self._dirty = False
+
+
+def template_map_cache(config):
+    """The TemplateMapCache of a run: config["template_map_cache"], else one in the project."""
+    return TemplateMapCache(config.get("template_map_cache")
+                            or os.path.join(config["project_dir"], TEMPLATE_MAP_FILE))
@@ -0,0 +1,937 @@
+// Generated by script_compiler.py from an issue plan. Do not edit.
+var PLAN = {
+  "document": "temp.indd",
+  "fit": 1718185072,
+  "folders": [
+    {
+      "folder": "$PROJECT/Carlos",
+      "pages": [
+        {
+          "credits": {
+            "bold_font": "Arial\tBold",
+            "bold_size": 36.0,
+            "bounds": [
+              677.0,
+              0,
+              792.0,
+              612.0
+            ],
+            "color": "Yellow",
+            "color_value": [
+              0,
+              0,
+              100,
+              0
+            ],
+            "font": "Arial\tRegular",
+            "leading": 19.200000000000003,
+            "size": 24,
+            "style": "Credits Arial Yellow 24/19.2",
+            "text": "I\u2019ve Always Like to play with Fire\r\rModel: Carlos Sanchez\rPhoto: Joshua Wilson",
+            "title_style": "Credits Title Arial 36"
+          },
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/Carlos/Photo Jun 23 2024, 1 05 25 PM.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        }
+      ]
+    },
+    {
+      "folder": "$PROJECT/Fashion",
+      "pages": [
+        {
+          "credits": {
+            "bold_font": "Blackadder ITC\tBold",
+            "bold_size": 36.0,
+            "bounds": [
+              677.0,
+              0,
+              792.0,
+              612.0
+            ],
+            "color": "Red",
+            "color_value": [
+              0,
+              100,
+              100,
+              0
+            ],
+            "font": "Blackadder ITC\tRegular",
+            "leading": 19.200000000000003,
+            "size": 24,
+            "style": "Credits Blackadder ITC Red 24/19.2",
+            "text": "HIGH FASHION \r\rPhotographer @elinavishnyakovaa \rmodel @alibatov stylist @danachiare",
+            "title_style": "Credits Title Blackadder ITC 36"
+          },
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/Fashion/IMG_6901.JPG"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                306.0
+              ],
+              "image": "$PROJECT/Fashion/IMG_6908.JPG"
+            },
+            {
+              "bounds": [
+                0,
+                306.0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/Fashion/IMG_6935.JPG"
+            }
+          ],
+          "layout": "double",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/Fashion/IMG_6946.JPG"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/Fashion/IMG_6951.JPG"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/Fashion/IMG_6958.JPG"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                306.0
+              ],
+              "image": "$PROJECT/Fashion/IMG_6972.JPG"
+            },
+            {
+              "bounds": [
+                0,
+                306.0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/Fashion/IMG_6975(1).JPG"
+            }
+          ],
+          "layout": "double",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                306.0
+              ],
+              "image": "$PROJECT/Fashion/IMG_6975.JPG"
+            },
+            {
+              "bounds": [
+                0,
+                306.0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/Fashion/IMG_6979.JPG"
+            }
+          ],
+          "layout": "double",
+          "target": null
+        }
+      ]
+    },
+    {
+      "folder": "$PROJECT/Irina Mankovskaya",
+      "pages": [
+        {
+          "credits": {
+            "bold_font": "Arial\tBold",
+            "bold_size": 36.0,
+            "bounds": [
+              735.0,
+              0,
+              792.0,
+              612.0
+            ],
+            "color": "Yellow",
+            "color_value": [
+              0,
+              0,
+              100,
+              0
+            ],
+            "font": "Arial\tRegular",
+            "leading": 19.200000000000003,
+            "size": 24,
+            "style": "Credits Arial Yellow 24/19.2",
+            "text": "Model: Valerie Gregorio \rPhotographer: @iamshotbysean",
+            "title_style": "Credits Title Arial 36"
+          },
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                306.0
+              ],
+              "image": "$PROJECT/Irina Mankovskaya/DSC08520.jpg"
+            },
+            {
+              "bounds": [
+                0,
+                306.0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/Irina Mankovskaya/DSC08523.jpg"
+            }
+          ],
+          "layout": "double",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/Irina Mankovskaya/DSC08525.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/Irina Mankovskaya/DSC08530.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                306.0
+              ],
+              "image": "$PROJECT/Irina Mankovskaya/DSC08540.jpg"
+            },
+            {
+              "bounds": [
+                0,
+                306.0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/Irina Mankovskaya/DSC08547.jpg"
+            }
+          ],
+          "layout": "double",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/Irina Mankovskaya/DSC08586.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        }
+      ]
+    },
+    {
+      "folder": "$PROJECT/JADE",
+      "pages": [
+        {
+          "credits": {
+            "bold_font": "Blackadder ITC\tBold",
+            "bold_size": 36.0,
+            "bounds": [
+              620.0,
+              0,
+              792.0,
+              612.0
+            ],
+            "color": "Blue",
+            "color_value": [
+              100,
+              75,
+              0,
+              0
+            ],
+            "font": "Blackadder ITC\tRegular",
+            "leading": 19.200000000000003,
+            "size": 24,
+            "style": "Credits Blackadder ITC Blue 24/19.2",
+            "text": "Jade\r\rModel - Jade Syrett.  \rPhotographer : Stewart Douglas .  \rSwimwear: Cotton On . \rModelling Agency: Edge Models",
+            "title_style": "Credits Title Blackadder ITC 36"
+          },
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                396.0,
+                306.0
+              ],
+              "image": "$PROJECT/JADE/D80_4912crop.jpg"
+            },
+            {
+              "bounds": [
+                0,
+                306.0,
+                396.0,
+                612.0
+              ],
+              "image": "$PROJECT/JADE/D80_4923.jpg"
+            },
+            {
+              "bounds": [
+                396.0,
+                0,
+                792.0,
+                306.0
+              ],
+              "image": "$PROJECT/JADE/D80_4935.jpg"
+            },
+            {
+              "bounds": [
+                396.0,
+                306.0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/JADE/D80_4946.jpg"
+            }
+          ],
+          "layout": "four",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/JADE/D80_4979.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/JADE/D85_0568.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/JADE/D85_0568c.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/JADE/D85_0573.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/JADE/D85_0573crop.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/JADE/D85_0589-2-Edit-2.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/JADE/D85_0589-2-Edit.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/JADE/D85_0589.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/JADE/D85_0596.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/JADE/D85_0618.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                306.0
+              ],
+              "image": "$PROJECT/JADE/D85_0648.jpg"
+            },
+            {
+              "bounds": [
+                0,
+                306.0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/JADE/D85_0651.jpg"
+            }
+          ],
+          "layout": "double",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                306.0
+              ],
+              "image": "$PROJECT/JADE/D85_0675-2x.jpg"
+            },
+            {
+              "bounds": [
+                0,
+                306.0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/JADE/D85_0697.jpg"
+            }
+          ],
+          "layout": "double",
+          "target": null
+        }
+      ]
+    },
+    {
+      "folder": "$PROJECT/model 2",
+      "pages": [
+        {
+          "credits": {
+            "bold_font": "Arial\tBold",
+            "bold_size": 36.0,
+            "bounds": [
+              648.0,
+              0,
+              792.0,
+              612.0
+            ],
+            "color": "Blue",
+            "color_value": [
+              100,
+              75,
+              0,
+              0
+            ],
+            "font": "Arial\tRegular",
+            "leading": 19.200000000000003,
+            "size": 24,
+            "style": "Credits Arial Blue 24/19.2",
+            "text": "Without a mask\r\rModel Irina Mankovskaya @panda__bamboo\rPhoto Nadya Zhuravleva @nadin_zhuravleva\rMUA Inna Rogozhevskaya @inris_makeup",
+            "title_style": "Credits Title Arial 36"
+          },
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/model 2/DSC_7325.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                396.0,
+                306.0
+              ],
+              "image": "$PROJECT/model 2/DSC_7350.jpg"
+            },
+            {
+              "bounds": [
+                0,
+                306.0,
+                396.0,
+                612.0
+              ],
+              "image": "$PROJECT/model 2/DSC_7378.jpg"
+            },
+            {
+              "bounds": [
+                396.0,
+                0,
+                792.0,
+                306.0
+              ],
+              "image": "$PROJECT/model 2/DSC_7418.jpg"
+            },
+            {
+              "bounds": [
+                396.0,
+                306.0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/model 2/DSC_7471.jpg"
+            }
+          ],
+          "layout": "four",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/model 2/DSC_7537.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        }
+      ]
+    },
+    {
+      "folder": "$PROJECT/Stylecruze_label me",
+      "pages": [
+        {
+          "credits": {
+            "bold_font": "Blackadder ITC\tBold",
+            "bold_size": 36.0,
+            "bounds": [
+              648.0,
+              0,
+              792.0,
+              612.0
+            ],
+            "color": "Blue",
+            "color_value": [
+              100,
+              75,
+              0,
+              0
+            ],
+            "font": "Blackadder ITC\tRegular",
+            "leading": 19.200000000000003,
+            "size": 24,
+            "style": "Credits Blackadder ITC Blue 24/19.2",
+            "text": "Without a mask\r\rModel Irina Mankovskaya @panda__bamboo\rPhoto Nadya Zhuravleva @nadin_zhuravleva\rMUA Inna Rogozhevskaya @inris_makeup",
+            "title_style": "Credits Title Blackadder ITC 36"
+          },
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/Stylecruze_label me/IMG_3927.jpg"
+            }
+          ],
+          "layout": "single",
+          "target": null
+        },
+        {
+          "credits": null,
+          "frames": [
+            {
+              "bounds": [
+                0,
+                0,
+                792.0,
+                306.0
+              ],
+              "image": "$PROJECT/Stylecruze_label me/IMG_40211.jpg"
+            },
+            {
+              "bounds": [
+                0,
+                306.0,
+                792.0,
+                612.0
+              ],
+              "image": "$PROJECT/Stylecruze_label me/IMG_4059.jpg"
+            }
+          ],
+          "layout": "double",
+          "target": null
+        }
+      ]
+    }
+  ],
+  "insert_after": 8,
+  "page_height": 792.0,
+  "page_width": 612.0,
+  "relink": [],
+  "seed": 7
+};
+(function (plan) {
+    var doc = app.documents.itemByName(plan.document);
+    var pagesUsed = 0, framesPlaced = 0, creditsAdded = 0, errors = [];
+    var swatches = {};
+    var styles = {};
+    var cursor = plan.insert_after === null ? null : doc.pages[plan.insert_after - 1];
+    var empty = [];
+
+    if (cursor === null) {
+        var allPages = doc.pages.everyItem().getElements();
+        for (var i = 0; i < allPages.length; i++) {
+            if (allPages[i].pageItems.length === 0) {
+                empty.push(allPages[i]);
+            }
+        }
+    }
+
+    function nextPage(target) {
+        if (cursor !== null) {
+            cursor = doc.pages.add(LocationOptions.AFTER, cursor);
+            return cursor;
+        }
+        for (var i = 0; i < empty.length; i++) {
+            if (target !== null && empty[i].documentOffset === target - 1) {
+                return empty.splice(i, 1)[0];
+            }
+        }
+        if (empty.length > 0) {
+            return empty.shift();
+        }
+        return doc.pages.add(LocationOptions.AT_END);
+    }
+
+    function swatch(name, value) {
+        if (!swatches[name]) {
+            var color = doc.colors.itemByName(name);
+            if (!color.isValid) {
+                color = doc.colors.add();
+                color.name = name;
+                color.colorValue = value;
+            }
+            swatches[name] = color;
+        }
+        return swatches[name];
+    }
+
+    // Credits styles are defined once per name (see resources.credits_styles) and
+    // referenced by every credits frame.
+    function style(collection, name) {
+        var found = collection.itemByName(name);
+        return found.isValid ? found : collection.add({name: name});
+    }
+
+    // A font that is not installed is left to the document's default, as over COM.
+    function installed(name) {
+        return app.fonts.itemByName(name).isValid;
+    }
+
+    function creditsStyles(spec) {
+        if (!styles[spec.style]) {
+            var body = style(doc.paragraphStyles, spec.style);
+            if (installed(spec.font)) {
+                body.appliedFont = spec.font;
+            }
+            body.pointSize = spec.size;
+            body.fillColor = swatch(spec.color, spec.color_value);
+            body.leading = spec.leading;
+            styles[spec.style] = body;
+        }
+        if (!styles[spec.title_style]) {
+            var title = style(doc.characterStyles, spec.title_style);
+            if (installed(spec.bold_font)) {
+                title.appliedFont = spec.bold_font;
+            }
+            title.pointSize = spec.bold_size;
+            styles[spec.title_style] = title;
+        }
+        return [styles[spec.style], styles[spec.title_style]];
+    }
+
+    function addCredits(page, spec) {
+        var frame = page.textFrames.add();
+        frame.geometricBounds = spec.bounds;
+        frame.contents = spec.text;
+        var story = frame.parentStory;
+        try {
+            var credits = creditsStyles(spec);
+            story.appliedParagraphStyle = credits[0];
+            if (story.paragraphs.length > 0) {
+                story.paragraphs[0].appliedCharacterStyle = credits[1];
+            }
+        } catch (e) {
+            errors.push("credits: " + e);
+        }
+        creditsAdded++;
+    }
+
+    for (var f = 0; f < plan.folders.length; f++) {
+        var folderPages = plan.folders[f].pages;
+        for (var p = 0; p < folderPages.length; p++) {
+            var spec = folderPages[p];
+            var page = nextPage(spec.target);
+            pagesUsed++;
+            for (var r = 0; r < spec.frames.length; r++) {
+                var rect = page.rectangles.add();
+                rect.geometricBounds = spec.frames[r].bounds;
+                try {
+                    rect.place(File(spec.frames[r].image));
+                    rect.fit(plan.fit);
+                    framesPlaced++;
+                } catch (e) {
+                    errors.push(spec.frames[r].image + ": " + e);
+                }
+            }
+            if (spec.credits) {
+                addCredits(page, spec.credits);
+            }
+        }
+    }
+    var relinked = 0;
+    if (plan.relink.length > 0) {
+        var originals = {};
+        for (var k = 0; k < plan.relink.length; k++) {
+            originals[plan.relink[k][0].toLowerCase()] = plan.relink[k][1];
+        }
+        var links = doc.links.everyItem().getElements();
+        for (var l = 0; l < links.length; l++) {
+            var original = originals[links[l].filePath.replace(/\\/g, "/").toLowerCase()];
+            if (original) {
+                try {
+                    links[l].relink(File(original));
+                    links[l].update();
+                    relinked++;
+                } catch (e) {
+                    errors.push(original + ": " + e);
+                }
+            }
+        }
+    }
+    return [pagesUsed, framesPlaced, creditsAdded, relinked, errors.join("\n")].join("|");
+})(PLAN);
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# tests/test_checkpoint.py
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import automation
+from automation import run_automation
+from backend import FakeBackend
+from checkpoint import CHECKPOINT_FILE
+from config_module import load_config
+
+PROJECT_DIR = os.path.join(ROOT, "Projects", "Project 1")
+
+class Interrupted(Exception):
+    pass
+
+class CheckpointResumeTest(unittest.TestCase):
+    """A run interrupted after some model folders continues with the rest, and ends up as an uninterrupted one."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.project_dir = os.path.join(self.tmp, "Project 1")
+        shutil.copytree(PROJECT_DIR, self.project_dir)
+        self.config = load_config(os.path.join(self.project_dir, "config.json"))
+        self.config.update(project_dir=self.project_dir, layout_seed=3, checkpoints=True, trace=False,
+                           credits_metrics=False)
+
+    def run_pipeline(self, backend, fail_after=None):
+        """run_automation, raising Interrupted once fail_after folders are placed. Returns the folders placed."""
+        placed = []
+        place_folder_plan = automation.place_folder_plan
+
+        def place(doc, folder_plan, *args, **kwargs):
+            if fail_after is not None and len(placed) == fail_after:
+                raise Interrupted(folder_plan.folder)
+            counts = place_folder_plan(doc, folder_plan, *args, **kwargs)
+            placed.append(folder_plan.folder)
+            return counts
+
+        with mock.patch.object(automation, "place_folder_plan", place), \
+                contextlib.redirect_stdout(io.StringIO()):
+            try:
+                run_automation(self.config, backend)
+            except Interrupted:
+                pass
+        return placed
+
+    def output(self, backend):
+        return json.dumps(backend.read(os.path.join(self.project_dir, "output.indd")), sort_keys=True)
+
+    def test_resume_after_interrupted_folder(self):
+        reference = FakeBackend()
+        all_folders = self.run_pipeline(reference)
+        self.assertIsNotNone(reference.read(os.path.join(self.project_dir, "output.indd")))
+        self.assertFalse(os.path.exists(os.path.join(self.project_dir, CHECKPOINT_FILE)))
+
+        # The working documents have to outlive the backend for a rerun to pick them up.
+        first = self.run_pipeline(FakeBackend(persist=True), fail_after=3)
+        self.assertEqual(first, all_folders[:3])
+        with open(os.path.join(self.project_dir, CHECKPOINT_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.assertEqual(sorted(manifest["folders"]), sorted(first))
+        self.assertEqual(manifest["seed"], 3)
+
+        resumed = FakeBackend(persist=True)
+        rest = self.run_pipeline(resumed)
+        self.assertEqual(rest, all_folders[3:])
+        self.assertEqual(self.output(resumed), self.output(reference))
+        self.assertFalse(os.path.exists(os.path.join(self.project_dir, CHECKPOINT_FILE)))
+
+
+if __name__ == "__main__":
+    unittest.main()
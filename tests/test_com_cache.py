@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# tests/test_com_cache.py
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from backend import FakeBackend
+from com_cache import _target
+
+def open_cached(pages=4):
+    backend = FakeBackend(template_pages=pages, template_empty_pages=())
+    cache = backend.enable_property_cache()
+    return backend, cache, backend.app.Open("template.indd")
+
+class PropertyCacheTest(unittest.TestCase):
+
+    def test_repeated_reads_are_cached(self):
+        backend, cache, doc = open_cached()
+        self.assertEqual(doc.Pages.Count, 4)
+        backend.log.clear()
+        self.assertEqual(doc.Pages.Count, 4)
+        self.assertIs(doc.Pages.Item(2), doc.Pages.Item(2))
+        self.assertEqual(backend.log.count("Pages.Count"), 0)
+        self.assertEqual(backend.log.count("Pages.Item"), 1)
+
+    def test_page_changes_keep_the_count_right(self):
+        _, cache, doc = open_cached()
+        self.assertEqual(doc.Pages.Count, 4)
+        doc.Pages.Add()
+        self.assertEqual(doc.Pages.Count, 5)
+        doc.Pages.Item(1).Delete()
+        self.assertEqual(doc.Pages.Count, 4)
+        self.assertGreater(cache.invalidations, 0)
+
+    def test_reset_drops_document_scopes(self):
+        backend, cache, doc = open_cached()
+        self.assertEqual(doc.Pages.Count, 4)
+        self.assertEqual(len(cache._scopes), 1)
+        # The document changes between runs without the cache seeing it.
+        _target(doc).Pages.Add()
+        cache.reset()
+        self.assertEqual(cache._scopes, [])
+        self.assertEqual((cache.hits, cache.misses, cache.invalidations), (0, 0, 0))
+        # The next run reaches the document through the application again.
+        doc = backend.app.ActiveDocument
+        backend.log.clear()
+        self.assertEqual(doc.Pages.Count, 5)
+        self.assertEqual(backend.log.count("Pages.Count"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# tests/test_config.py
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config_module import DEFAULTS, compile_config, project_config
+
+def write_json(path, settings):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(settings, f)
+
+class ProjectConfigTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.global_path = os.path.join(self.tmp, "global_config.json")
+        self.project_dir = os.path.join(self.tmp, "project")
+        self.folder = os.path.join(self.project_dir, "model 1")
+        os.makedirs(self.folder)
+        write_json(self.global_path, {"credits_font_size": 30, "split_page": 4, "layouts": ["single"]})
+        write_json(os.path.join(self.project_dir, "config.json"),
+                   {"project_dir": "C:/elsewhere/project", "split_page": 6, "credits_colors": ["Red"]})
+
+    def load(self, overrides=None):
+        return project_config(self.project_dir, overrides, global_path=self.global_path)
+
+    def test_precedence(self):
+        config = self.load({"credits_colors": ["Blue"]})
+        self.assertEqual(config["template_file"], DEFAULTS["template_file"])   # defaults
+        self.assertEqual(config["credits_font_size"], 30)                      # global
+        self.assertEqual(config["split_page"], 6)                              # project over global
+        self.assertEqual(config["credits_colors"], ("Blue",))                  # overrides over project
+        self.assertEqual(config["project_dir"], os.path.abspath(self.project_dir))
+
+    def test_folder_overrides_only_folder_keys(self):
+        write_json(os.path.join(self.folder, "config.json"),
+                   {"credits_font_size": 18, "split_page": 1, "template_file": "other.indd"})
+        config = self.load().folder(self.folder)
+        self.assertEqual(config["credits_font_size"], 18)
+        self.assertEqual(config["split_page"], 6)
+        self.assertEqual(config["template_file"], DEFAULTS["template_file"])
+
+    def test_edited_file_is_read_again(self):
+        self.assertEqual(self.load()["split_page"], 6)
+        write_json(os.path.join(self.project_dir, "config.json"), {"split_page": 9, "credits_font_size": 12})
+        self.assertEqual(self.load()["split_page"], 9)
+
+    def test_invalid_setting_is_rejected(self):
+        write_json(os.path.join(self.project_dir, "config.json"), {"credits_font_size": "big"})
+        with self.assertRaisesRegex(ValueError, "credits_font_size"):
+            self.load()
+
+
+class CompileConfigTest(unittest.TestCase):
+
+    def test_missing_required_list_comes_from_defaults(self):
+        config = compile_config({"credits_font": "Arial\tRegular"})
+        self.assertEqual(config["credits_colors"], ("Black",))
+        self.assertEqual(config["credits_font"], ("Arial\tRegular",))
+
+    def test_empty_required_list_is_rejected(self):
+        for key in ("credits_font", "credits_colors", "text_box_position"):
+            with self.subTest(key=key):
+                with self.assertRaisesRegex(ValueError, f"{key} in config must be at least one name"):
+                    compile_config({key: []})
+        with self.assertRaisesRegex(ValueError, "credits_colors in config must be a name or a list of names"):
+            compile_config({"credits_colors": None})
+
+    def test_config_is_read_only(self):
+        config = compile_config({})
+        with self.assertRaises(TypeError):
+            config["split_page"] = 3
+        self.assertEqual(config.replace(split_page=3)["split_page"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# tests/test_pages.py
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from automation import get_empty_page
+from backend import FakeBackend
+from pages import EmptyPageAllocator, InsertionCursor
+
+def open_template(pages=6, empty_pages=(2, 4, 5)):
+    backend = FakeBackend(template_pages=pages, template_empty_pages=empty_pages)
+    return backend, backend.app.Open("template.indd")
+
+def page_number(doc, page):
+    return doc._pages.index(page) + 1
+
+class EmptyPageAllocatorTest(unittest.TestCase):
+
+    def test_empty_pages_in_order_then_new_pages(self):
+        _, doc = open_template()
+        allocator = EmptyPageAllocator(doc)
+        numbers = [page_number(doc, allocator.acquire()) for _ in range(5)]
+        self.assertEqual(numbers, [2, 4, 5, 7, 8])
+        self.assertEqual(allocator.pages_added, 2)
+        self.assertEqual(doc.Pages.Count, 8)
+
+    def test_target_page_first(self):
+        _, doc = open_template()
+        allocator = EmptyPageAllocator(doc)
+        numbers = [page_number(doc, allocator.acquire(4))] + \
+                  [page_number(doc, allocator.acquire()) for _ in range(2)]
+        self.assertEqual(numbers, [4, 2, 5])
+        self.assertEqual(allocator.empty_pages, [])
+
+    def test_same_pages_as_get_empty_page(self):
+        _, scanned = open_template()
+        _, indexed = open_template()
+        allocator = EmptyPageAllocator(indexed)
+        for _ in range(4):
+            page = get_empty_page(scanned) or scanned.Pages.Add()
+            page.Rectangles.Add()
+            self.assertEqual(page_number(indexed, allocator.acquire()), page_number(scanned, page))
+
+    def test_no_calls_for_indexed_pages(self):
+        backend, doc = open_template()
+        allocator = EmptyPageAllocator(doc)
+        backend.log.clear()
+        for _ in range(3):
+            allocator.acquire()
+        self.assertEqual(backend.log.records, [])
+
+
+class InsertionCursorTest(unittest.TestCase):
+
+    def test_pages_follow_the_reference_page_in_order(self):
+        backend, doc = open_template()
+        originals = list(doc._pages)
+        cursor = InsertionCursor(doc, doc.Pages.Item(3))
+        backend.log.clear()
+        added = [cursor.acquire(target_page=1) for _ in range(3)]
+        self.assertEqual([page_number(doc, page) for page in added], [4, 5, 6])
+        self.assertEqual(doc._pages[:3] + doc._pages[6:], originals)
+        self.assertEqual(backend.log.count("Pages.Add"), 3)
+        self.assertEqual(cursor.pages_added, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
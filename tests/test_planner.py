@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# tests/test_planner.py
+
+import os
+import random
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from planner import plan_credits
+
+CONFIG = {"credits_font": ["Arial\tRegular"], "text_box_position": ["bottom_center"],
+          "credits_font_size": 24, "credits_metrics": False}
+
+class PlanCreditsTest(unittest.TestCase):
+
+    def test_colors_picked_from_config(self):
+        config = dict(CONFIG, credits_colors=["Red"])
+        credits = plan_credits("Title\nModel", config, 612.0, 792.0, rng=random.Random(1))
+        self.assertEqual(credits.color, "Red")
+        self.assertEqual(credits.color_value, (0, 100, 100, 0))
+
+    def test_black_without_colors(self):
+        # Older project configs (and "Use Existing Project" ones) have no credits_colors.
+        for config in (CONFIG, dict(CONFIG, credits_colors=[])):
+            with self.subTest(config=config):
+                credits = plan_credits("Title\nModel", config, 612.0, 792.0, rng=random.Random(1))
+                self.assertEqual(credits.color, "Black")
+                self.assertEqual(credits.color_value, (0, 0, 0, 100))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# tests/test_rebuild.py
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import automation
+from automation import run_automation
+from backend import FakeBackend
+from config_module import load_config
+
+PROJECT_DIR = os.path.join(ROOT, "Projects", "Project 1")
+
+class IncrementalRebuildTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.project_dir = os.path.join(self.tmp, "Project 1")
+        shutil.copytree(PROJECT_DIR, self.project_dir)
+        self.config = load_config(os.path.join(self.project_dir, "config.json"))
+        self.config.update(project_dir=self.project_dir, layout_seed=3, trace=False, credits_metrics=False)
+
+    def run_pipeline(self, backend, **overrides):
+        """run_automation on the copy; returns the model folders whose pages were placed."""
+        placed = []
+        place_folder_plan = automation.place_folder_plan
+
+        def place(doc, folder_plan, *args, **kwargs):
+            placed.append(folder_plan.folder)
+            return place_folder_plan(doc, folder_plan, *args, **kwargs)
+
+        # The rebuild places its pages through automation.place_folder_plan as well.
+        with mock.patch.object(automation, "place_folder_plan", place), \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.assertIsNotNone(run_automation(dict(self.config, **overrides), backend))
+        return placed
+
+    def output(self, backend):
+        return json.dumps(backend.read(os.path.join(self.project_dir, "output.indd")), sort_keys=True)
+
+    def test_only_the_changed_folder_is_regenerated(self):
+        # output.indd has to outlive the backend for the rebuild to open it.
+        folders = self.run_pipeline(FakeBackend(persist=True), incremental=True)
+        self.assertGreater(len(folders), 2)
+        self.assertEqual(self.run_pipeline(FakeBackend(persist=True), incremental=True), [])
+
+        changed = folders[1]
+        with open(os.path.join(changed, "Credits.txt"), "a", encoding="utf-8") as f:
+            f.write("\nHair: Someone Else")
+        rebuilt = FakeBackend(persist=True)
+        self.assertEqual(self.run_pipeline(rebuilt, incremental=True), [changed])
+
+        # The same pages as a full build of the changed project with the same seed.
+        full = FakeBackend()
+        self.assertEqual(self.run_pipeline(full), folders)
+        self.assertEqual(self.output(rebuilt), self.output(full))
+
+
+if __name__ == "__main__":
+    unittest.main()
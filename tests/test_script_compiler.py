@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# tests/test_script_compiler.py
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config_module import compile_config, load_config
+from planner import plan_issue
+from project_index import ProjectIndex
+from script_compiler import _script_path, compile_plan, extract_plan
+
+PROJECT_DIR = os.path.join(ROOT, "Projects", "Project 1")
+GOLDEN_DIR = os.path.join(ROOT, "tests", "golden")
+
+def compiled_project(seed, insert_after=None):
+    """
+    The script of Project 1 planned with seed, its project path replaced by
+    $PROJECT. Credits are sized by line count (credits_metrics off), so the
+    output does not depend on the fonts installed.
+    """
+    config = compile_config(load_config(os.path.join(PROJECT_DIR, "config.json")))
+    config = config.replace(project_dir=PROJECT_DIR, credits_metrics=False)
+    index = ProjectIndex(PROJECT_DIR)
+    index.scan()
+    plan = plan_issue(index.model_folders(), config, 612.0, 792.0,
+                      target_page=config.get("target_page") if insert_after is None else None, seed=seed)
+    script = compile_plan(plan, "temp.indd", insert_after=insert_after)
+    return script.replace(_script_path(PROJECT_DIR), "$PROJECT")
+
+GOLDEN = {
+    "project1_seed1.jsx": lambda: compiled_project(1),
+    "project1_seed7_insert_after_8.jsx": lambda: compiled_project(7, insert_after=8),
+}
+
+class GoldenScriptTest(unittest.TestCase):
+    """
+    compile_plan output against checked-in copies. After an intended change to
+    the runtime or the plan format, rewrite them with
+    python tests/test_script_compiler.py --update and review the diff.
+    """
+
+    def test_golden(self):
+        for name, build in GOLDEN.items():
+            with self.subTest(name=name):
+                with open(os.path.join(GOLDEN_DIR, name), "r", encoding="utf-8") as f:
+                    self.assertEqual(build(), f.read())
+
+    def test_deterministic(self):
+        self.assertEqual(compiled_project(3), compiled_project(3))
+
+    def test_plan_round_trip(self):
+        script = compiled_project(1)
+        self.assertEqual(extract_plan(script)["document"], "temp.indd")
+
+
+if __name__ == "__main__":
+    if "--update" in sys.argv:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        for name, build in GOLDEN.items():
+            with open(os.path.join(GOLDEN_DIR, name), "w", encoding="utf-8") as f:
+                f.write(build())
+            print(f"[INFO] Wrote {os.path.join(GOLDEN_DIR, name)}")
+    else:
+        unittest.main()
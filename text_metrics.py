@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# text_metrics.py
+
+import os
+import sys
+import threading
+
+# Advance widths are tabulated at this size and scaled linearly to any other.
+REFERENCE_SIZE = 1000
+
+_FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+
+_lock = threading.Lock()
+_font_files = {}        # font directories (tuple) -> {(family, style): path}
+_metrics = {}           # (path or None, family, style) -> FontMetrics
+_warned = set()
+
+########################################
+# FONT LOOKUP
+########################################
+
+def font_dirs(config=None):
+    """Directories searched for font files: config["font_dirs"] first, then the system's."""
+    dirs = list((config or {}).get("font_dirs") or [])
+    if sys.platform == "win32":
+        windir = os.environ.get("WINDIR", r"C:\Windows")
+        dirs.append(os.path.join(windir, "Fonts"))
+        local = os.environ.get("LOCALAPPDATA")
+        if local:
+            dirs.append(os.path.join(local, "Microsoft", "Windows", "Fonts"))
+    elif sys.platform == "darwin":
+        dirs += ["/System/Library/Fonts", "/Library/Fonts", os.path.expanduser("~/Library/Fonts")]
+    else:
+        dirs += ["/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.local/share/fonts"),
+                 os.path.expanduser("~/.fonts")]
+    return tuple(d for d in dirs if os.path.isdir(d))
+
+def split_font_name(font_name):
+    """InDesign's "Family\\tStyle" font name as (family, style); the style defaults to Regular."""
+    family, _, style = font_name.partition("\t")
+    return family.strip(), (style.strip() or "Regular")
+
+def _index_fonts(dirs):
+    from PIL import ImageFont
+
+    files = {}
+    for directory in dirs:
+        for root_dir, _, names in os.walk(directory):
+            for name in names:
+                if not name.lower().endswith(_FONT_EXTENSIONS):
+                    continue
+                path = os.path.join(root_dir, name)
+                try:
+                    family, style = ImageFont.truetype(path, 10).getname()
+                except (OSError, ValueError):
+                    continue
+                files.setdefault(((family or "").lower(), (style or "").lower()), path)
+    return files
+
+def find_font_file(font_name, dirs):
+    """Path of the font file for an InDesign font name, or None if none is installed."""
+    with _lock:
+        files = _font_files.get(dirs)
+        if files is None:
+            files = _font_files[dirs] = _index_fonts(dirs)
+    family, style = split_font_name(font_name)
+    return files.get((family.lower(), style.lower()))
+
+########################################
+# METRICS
+########################################
+
+class FontMetrics:
+    """Advance widths of one font per character, tabulated on first use."""
+
+    def __init__(self, font):
+        self.font = font
+        ascent, descent = font.getmetrics()
+        self.ascent = ascent / REFERENCE_SIZE
+        self.descent = descent / REFERENCE_SIZE
+        self.advances = {}
+        for code in range(32, 127):
+            self.advances[chr(code)] = font.getlength(chr(code)) / REFERENCE_SIZE
+
+    def width(self, text, size):
+        advances = self.advances
+        total = 0.0
+        for ch in text:
+            advance = advances.get(ch)
+            if advance is None:
+                advance = advances[ch] = self.font.getlength(ch) / REFERENCE_SIZE
+            total += advance
+        return total * size
+
+    def wrap(self, paragraph, size, width):
+        """Greedy word wrap of one paragraph; returns its lines (at least one)."""
+        lines = []
+        line = ""
+        line_width = 0.0
+        space = self.width(" ", size)
+        for word in paragraph.split():
+            word_width = self.width(word, size)
+            if line and line_width + space + word_width > width:
+                lines.append(line)
+                line, line_width = "", 0.0
+            if line:
+                line += " " + word
+                line_width += space + word_width
+            else:
+                line, line_width = word, word_width
+        lines.append(line)
+        return lines
+
+
+def font_metrics(font_name, config=None, fallback=None):
+    """
+    FontMetrics for an InDesign font name, or None without Pillow. A font that is not
+    installed is measured as fallback, or with Pillow's default font (with a warning).
+    """
+    try:
+        from PIL import ImageFont
+    except ImportError:
+        return None
+    dirs = font_dirs(config)
+    path = find_font_file(font_name, dirs)
+    if path is None and fallback is not None:
+        return fallback
+    family, style = split_font_name(font_name)
+    key = (path, family, style) if path else (None, "", "")
+    with _lock:
+        metrics = _metrics.get(key)
+        warn = path is None and font_name not in _warned
+        _warned.add(font_name)
+    if warn:
+        print(f"[WARN] Font {font_name!r} not found; measuring credits with a stand-in font.")
+    if metrics is not None:
+        return metrics
+    if path is None:
+        font = ImageFont.load_default(REFERENCE_SIZE)
+    else:
+        font = ImageFont.truetype(path, REFERENCE_SIZE)
+    metrics = FontMetrics(font)
+    with _lock:
+        _metrics[key] = metrics
+    return metrics
+
+def bold_font_name(font_name):
+    """The bold face of an InDesign font name ("Arial\\tRegular" -> "Arial\\tBold")."""
+    return split_font_name(font_name)[0] + "\tBold"
+
+def measure_credits(text, font_name, size, bold_size, leading, width, config=None):
+    """
+    (lines, height in points) of a credits block set as insert_credits_frame sets it
+    (bold first paragraph, wrapped to width), or None without Pillow.
+    """
+    metrics = font_metrics(font_name, config)
+    if metrics is None:
+        return None
+    # Faces without a bold (Blackadder ITC) are measured with their regular glyphs.
+    bold = font_metrics(bold_font_name(font_name), config, fallback=metrics)
+    paragraphs = text.splitlines() or [""]
+    lines = len(bold.wrap(paragraphs[0], bold_size, width))
+    for paragraph in paragraphs[1:]:
+        lines += len(metrics.wrap(paragraph, size, width))
+    # First baseline at the first line's ascent, then one leading per further line.
+    first_ascent = bold.ascent * bold_size
+    last_descent = (metrics.descent * size) if len(paragraphs) > 1 else (bold.descent * bold_size)
+    return lines, first_ascent + (lines - 1) * leading + last_descent
@@ -0,0 +1,433 @@
+#!/usr/bin/env python
+# tools/benchmarks.py
+#
+# Timings of the pipeline's stages, mostly against the fake backend. Run from the
+# repository root, e.g.:
+#     python tools/benchmarks.py fake-run --compare-assembly
+#     python tools/benchmarks.py property-cache "Projects/Project 1" --latency 0.002
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_PROJECT = os.path.join(ROOT, "Projects", "Project 1")
+
+@contextlib.contextmanager
+def project_copy(project_dir):
+    """A throwaway copy of project_dir, so runs leave the project as it was."""
+    work_dir = tempfile.mkdtemp()
+    try:
+        copy = os.path.join(work_dir, "project")
+        shutil.copytree(project_dir, copy)
+        yield copy
+    finally:
+        shutil.rmtree(work_dir)
+
+def quiet():
+    return contextlib.redirect_stdout(io.StringIO())
+
+########################################
+# FULL RUNS
+########################################
+
+def fake_run(args):
+    """Time a full run of the pipeline over a project tree against the fake."""
+    from automation import run_automation
+    from backend import FakeBackend
+    from config_module import load_config
+
+    config = load_config(os.path.join(args.project_dir, "config.json"))
+    config["project_dir"] = args.project_dir
+    for key in ("execution_mode", "assembly_mode"):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    latency = {}
+    if args.place_latency is not None:
+        latency["Rectangle.Place"] = args.place_latency
+
+    modes = ("split_merge", "inplace") if args.compare_assembly else (config.get("assembly_mode", "split_merge"),)
+    logs = {}
+    for mode in modes:
+        backend = FakeBackend(latency=latency, default_latency=args.latency)
+        start = time.perf_counter()
+        run_automation(dict(config, assembly_mode=mode), backend=backend)
+        elapsed = time.perf_counter() - start
+        print(f"[INFO] Fake run ({mode}) finished in {elapsed:.3f}s")
+        print(backend.log.summary())
+        logs[mode] = backend.log
+
+    if args.compare_assembly:
+        print(f"{'operation':<22}" + "".join(f"{mode:>14}" for mode in modes))
+        for op in ("Page.Duplicate", "Document.Save", "Application.Open", "Documents.Add", "Pages.Add"):
+            print(f"{op:<22}" + "".join(f"{logs[mode].count(op):>14}" for mode in modes))
+
+def profiler_overhead(args):
+    """The COM profiler's overhead per call on a fake-backend run, and its report."""
+    from automation import run_automation
+    from backend import FakeBackend
+    from config_module import load_config
+    from profiler import ComProfiler
+
+    with project_copy(args.project_dir) as project_dir:
+        config = load_config(os.path.join(project_dir, "config.json"))
+        config.update(project_dir=project_dir, layout_seed=0, checkpoints=False)
+        timings = {}
+        for enabled in (False, True):
+            best = None
+            for _ in range(args.runs):
+                backend = FakeBackend()
+                start = time.perf_counter()
+                with quiet():
+                    run_automation(dict(config, profile_com=enabled), backend)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[enabled] = (best, len(backend.log.records))
+        (off, calls), (on, _) = timings[False], timings[True]
+        print(f"[INFO] {calls} backend calls: {off * 1000:.1f} ms unprofiled, {on * 1000:.1f} ms profiled, "
+              f"{(on - off) / calls * 1e6:.1f} us overhead per call.")
+        profiler = ComProfiler()
+        backend = FakeBackend(default_latency=0.0005)
+        backend.enable_profiling(profiler)
+        with quiet():
+            run_automation(dict(config, profile_com=False), backend)
+        print(profiler.report())
+
+def property_cache(args):
+    """A fake-backend run of a project with and without the property cache, at a typical COM latency."""
+    from automation import run_automation
+    from backend import FakeBackend
+    from config_module import load_config
+
+    with project_copy(args.project_dir) as project_dir:
+        config = load_config(os.path.join(project_dir, "config.json"))
+        config.update(project_dir=project_dir, layout_seed=0, checkpoints=False, trace=False)
+        for enabled in (False, True):
+            backend = FakeBackend(default_latency=args.latency)
+            with quiet():
+                run_automation(dict(config, property_cache=enabled), backend)
+            line = f"[INFO] cache {'on ' if enabled else 'off'}: {backend.log.summary().splitlines()[0]}"
+            if enabled:
+                line += "; " + backend.property_cache.report()[len("[INFO] "):]
+            print(line)
+
+def scheduler(args):
+    """Throughput of a batch of copies of a project on the fake backend: a serial batch against the scheduler."""
+    from backend import FakeBackend
+    from batch import run_batch
+    from scheduler import JobScheduler, format_throughput
+
+    overrides = {"backend": "fake", "fake_backend": {"default_latency": args.latency},
+                 "page_size": [612, 792], "checkpoints": False}
+
+    def copies(root, label):
+        paths = []
+        for i in range(args.jobs):
+            path = os.path.join(root, f"{label}-{i}")
+            shutil.copytree(args.project_dir, path)
+            paths.append(path)
+        return paths
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        with quiet():
+            serial = run_batch([(path, overrides) for path in copies(work_dir, "serial")])
+        serial_rate = serial["ok"] / serial["seconds"] * 3600
+        print(f"[INFO] Serial batch: {serial['ok']}/{args.jobs} issues in {serial['seconds']:.1f}s, "
+              f"{serial_rate:.1f} issues/hour.")
+
+        job_scheduler = JobScheduler(sessions=args.sessions,
+                                     backend_factory=lambda: FakeBackend(default_latency=args.latency),
+                                     log_name="automation.log")
+        for i, path in enumerate(copies(work_dir, "scheduled")):
+            job_scheduler.submit(path, overrides, priority=i % 3, timeout=600)
+        summary = job_scheduler.run()
+        print(format_throughput(summary))
+    finally:
+        shutil.rmtree(work_dir)
+
+########################################
+# STAGES
+########################################
+
+def config_layers(args):
+    """Compile a project's layered config, then time the cached reloads and per-folder lookups."""
+    from config_module import FOLDER_KEYS, project_config
+
+    start = time.perf_counter()
+    config = project_config(args.project_dir)
+    print(f"[INFO] Compiled {len(config)} settings in {(time.perf_counter() - start) * 1000:.2f} ms.")
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        project_config(args.project_dir)
+    print(f"[INFO] Cached reload: {(time.perf_counter() - start) / args.repeat * 1e6:.1f} us.")
+    folders = sorted(entry.path for entry in os.scandir(config["project_dir"]) if entry.is_dir())
+    for folder in folders:
+        overridden = sorted(key for key in FOLDER_KEYS if config.folder(folder).get(key) != config.get(key))
+        print(f"[INFO] {os.path.basename(folder)}: {', '.join(overridden) or 'project settings'}")
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for folder in folders:
+            config.folder(folder).get("credits_font_size")
+    print(f"[INFO] Folder lookup: {(time.perf_counter() - start) / (args.repeat * len(folders)) * 1e6:.2f} us.")
+
+def project_index(args):
+    """Index a project twice: a cold scan and a rescan of the unchanged tree."""
+    from project_index import ProjectIndex
+
+    with project_copy(args.project_dir) as project_dir:
+        start = time.perf_counter()
+        walked = sum(1 for _ in os.walk(project_dir))
+        print(f"[INFO] os.walk: {walked} directories in {(time.perf_counter() - start) * 1000:.2f} ms.")
+        # Age the copy, as a real project is, so the rescan may trust its listings.
+        an_hour_ago = time.time() - 3600
+        for path, _, _ in os.walk(project_dir):
+            os.utime(path, (an_hour_ago, an_hour_ago))
+        index = ProjectIndex(project_dir)
+        for label in ("cold", "cached"):
+            start = time.perf_counter()
+            index.scan()
+            elapsed = time.perf_counter() - start
+            print(f"[INFO] {label} scan: {index.listed} listed, {index.reused} reused "
+                  f"in {elapsed * 1000:.2f} ms; {len(index.model_folders())} model folders.")
+
+def image_index(args):
+    """Index a project tree's JPEG headers twice: a cold scan and a rescan from the cache."""
+    from image_index import ImageIndex
+
+    folders = [os.path.join(args.project_dir, entry) for entry in os.listdir(args.project_dir)
+               if os.path.isdir(os.path.join(args.project_dir, entry))]
+    cache_dir = tempfile.mkdtemp()
+    try:
+        cache_path = os.path.join(cache_dir, "image_index.json")
+        for label in ("cold", "cached"):
+            start = time.perf_counter()
+            index = ImageIndex(cache_path).scan(folders)
+            index.save()
+            elapsed = time.perf_counter() - start
+            print(f"[INFO] {label}: {len(index.entries)} images in {elapsed * 1000:.1f} ms "
+                  f"({index.misses} parsed, {index.hits} from cache).")
+    finally:
+        shutil.rmtree(cache_dir)
+    for info in sorted(index.entries.values())[:5]:
+        print(f"  {os.path.basename(info.path)}: {info.width}x{info.height} "
+              f"orientation {info.orientation}, dpi {info.dpi}")
+
+def planner(args):
+    """Time planning a large synthetic issue (no InDesign, no image decoding)."""
+    from planner import plan_from_dict, plan_issue, plan_summary, plan_to_dict
+
+    config = {"credits_font": ["Blackadder ITC\tRegular", "Arial\tRegular"],
+              "credits_colors": ["Black", "Red"], "credits_font_size": 24,
+              "layout_probabilities": {"single": 0.3, "double": 0.4, "four": 0.3}}
+    root = tempfile.mkdtemp()
+    try:
+        folders = []
+        for i in range(args.folders):
+            folder = os.path.join(root, f"model {i}")
+            os.makedirs(folder)
+            with open(os.path.join(folder, "Credits.txt"), "w", encoding="utf-8") as f:
+                f.write(f"Model {i}\n\nPhotographer: someone\n")
+            for j in range(args.images):
+                open(os.path.join(folder, f"IMG_{j:04d}.jpg"), "wb").close()
+            folders.append(folder)
+        start = time.perf_counter()
+        plan = plan_issue(folders, config, 612.0, 792.0, target_page=8, seed=1)
+        elapsed = time.perf_counter() - start
+        n_folders, n_pages, n_frames, n_credits = plan_summary(plan)
+        print(f"[INFO] Planned {n_frames} images on {n_pages} pages in {n_folders} folders "
+              f"in {elapsed * 1000:.1f} ms.")
+        assert plan == plan_issue(folders, config, 612.0, 792.0, target_page=8, seed=1)
+        assert plan_from_dict(json.loads(json.dumps(plan_to_dict(plan)))) == plan
+    finally:
+        shutil.rmtree(root)
+
+def text_metrics(args):
+    """Measure every project's credits with every candidate font, repeatedly."""
+    from text_metrics import measure_credits
+
+    fonts = ["Blackadder ITC\tRegular", "Arial\tRegular"]
+    texts = []
+    for path in glob.glob(os.path.join(args.project_dir, "*", "Credits.txt")):
+        with open(path, "r", encoding="utf-8") as f:
+            texts.append(f.read().strip())
+    start = time.perf_counter()
+    for font in fonts:
+        measure_credits("", font, 24, 36, 19.2, 612)
+    print(f"[INFO] Font lookup and tables: {(time.perf_counter() - start) * 1000:.1f} ms.")
+    start = time.perf_counter()
+    blocks = 0
+    for _ in range(args.repeat):
+        for text in texts:
+            for font in fonts:
+                measure_credits(text, font, 24, 36, 19.2, 612)
+                blocks += 1
+    elapsed = time.perf_counter() - start
+    print(f"[INFO] {blocks} credit blocks measured in {elapsed:.3f}s, {blocks / elapsed:,.0f} blocks/s.")
+    for text in texts[:3]:
+        heuristic = len(text.splitlines()) * 24 * 1.2
+        lines, height = measure_credits(text, fonts[1], 24, 36, 19.2, 612)
+        print(f"[INFO] {text.splitlines()[0][:40]!r}: {lines} lines, {height:.1f} pt (heuristic {heuristic:.1f} pt).")
+
+def proxies(args):
+    """Proxy generation throughput (images/sec per core) on a project."""
+    from automation import find_model_folders
+    from planner import plan_issue
+    from proxies import generate_proxies
+
+    config = {"credits_font": ["Arial\tRegular"], "credits_colors": ["Black"]}
+    plan = plan_issue(find_model_folders(args.project_dir), config, 612.0, 792.0, seed=0)
+    images = {frame.image for folder in plan.folders for page in folder.pages for frame in page.frames}
+    for workers in args.workers:
+        proxy_dir = tempfile.mkdtemp()
+        try:
+            start = time.perf_counter()
+            mapping = generate_proxies(plan, proxy_dir, ppi=args.ppi, workers=workers)
+            elapsed = time.perf_counter() - start
+        finally:
+            shutil.rmtree(proxy_dir)
+        rate = len(mapping) / elapsed if elapsed else 0.0
+        print(f"[INFO] {workers} worker(s): {len(mapping)}/{len(images)} proxies in {elapsed:.2f}s, "
+              f"{rate:.1f} images/s, {rate / workers:.1f} images/s per core")
+
+def allocator(args):
+    """Backend calls to acquire a page per generated page: get_empty_page against the allocator."""
+    from automation import get_empty_page
+    from backend import FakeBackend
+    from pages import EmptyPageAllocator
+
+    def fill_issue(page_count, use_allocator):
+        # A document whose first half is template content and second half empty;
+        # the issue fills every empty page and then as many new ones again.
+        # Returns (calls to build the index, calls to acquire the pages).
+        backend = FakeBackend(template_pages=page_count,
+                              template_empty_pages=range(page_count // 2 + 1, page_count + 1))
+        doc = backend.app.Open("benchmark.indd")
+        backend.log.clear()
+        page_allocator = EmptyPageAllocator(doc) if use_allocator else None
+        index_calls = len(backend.log.records)
+        for _ in range(page_count):
+            if page_allocator is not None:
+                page = page_allocator.acquire()
+            else:
+                page = get_empty_page(doc)
+                if page is None:
+                    page = doc.Pages.Add()
+            page.Rectangles.Add()
+        acquire_calls = len(backend.log.records) - index_calls - backend.log.count("Rectangles.Add")
+        return index_calls, acquire_calls
+
+    print(f"{'pages':>6} {'get_empty_page':>15} {'index build':>12} {'acquire':>8} {'acquire/page':>13}")
+    for page_count in (50, 200, 1000):
+        _, scan_calls = fill_issue(page_count, use_allocator=False)
+        index_calls, acquire_calls = fill_issue(page_count, use_allocator=True)
+        print(f"{page_count:>6} {scan_calls:>15} {index_calls:>12} {acquire_calls:>8} "
+              f"{acquire_calls / page_count:>13.2f}")
+
+########################################
+# SCREEN (NumPy)
+########################################
+
+def page_region(args):
+    """Detect a page on a synthetic 1920x1080 InDesign screen, then re-check the unchanged viewport."""
+    import numpy as np
+    from page_region import detect_page_region, viewport_checksum
+
+    screen = np.full((1080, 1920, 3), 205, dtype=np.uint8)
+    screen[:90] = 50                                  # menu and control bars
+    screen[:, 1640:] = 60                             # panels
+    rng = np.random.default_rng(0)
+    page = (572, 115, 1250, 991)
+    screen[page[1]:page[3] + 4, page[0] + 4:page[2] + 4] = 150     # shadow
+    screen[page[1] - 1:page[3] + 1, page[0] - 1:page[2] + 1] = 30  # border
+    screen[page[1]:page[3], page[0]:page[2]] = rng.integers(0, 256, (page[3] - page[1], page[2] - page[0], 3))
+
+    start = time.perf_counter()
+    box = detect_page_region(screen, aspect=612 / 792)
+    print(f"[INFO] Detected {box} (drawn {page}) in {(time.perf_counter() - start) * 1000:.1f} ms.")
+    start = time.perf_counter()
+    for _ in range(100):
+        viewport_checksum(screen, box)
+    print(f"[INFO] Viewport checksum: {(time.perf_counter() - start) * 10:.2f} ms.")
+
+def screen_settle(args):
+    """Cost of one screen-settle check on a full-HD grab, full resolution and downsampled."""
+    import numpy as np
+    from wait import ScreenSettled
+
+    class StillScreen:
+        def __init__(self):
+            self.image = np.random.default_rng(0).integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+
+        def screenshot(self, region=None):
+            return self.image
+
+    screen = StillScreen()
+    for step in (1, 8):
+        check = ScreenSettled(screen, step=step)
+        check()
+        start = time.perf_counter()
+        for _ in range(50):
+            check()
+        elapsed = (time.perf_counter() - start) / 50
+        print(f"[INFO] step {step}: {elapsed * 1000:.2f} ms per check.")
+
+########################################
+# COMMAND LINE
+########################################
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks of the automation's stages.")
+    commands = parser.add_subparsers(dest="benchmark", required=True)
+
+    def command(name, function, project=True):
+        sub = commands.add_parser(name, help=function.__doc__.splitlines()[0])
+        if project:
+            sub.add_argument("project_dir", nargs="?", default=DEFAULT_PROJECT)
+        sub.set_defaults(run=function)
+        return sub
+
+    sub = command("fake-run", fake_run)
+    sub.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per backend call (default 0).")
+    sub.add_argument("--place-latency", type=float, default=None,
+                     help="Simulated seconds per Rectangle.Place call.")
+    sub.add_argument("--execution-mode", choices=("com", "script"), default=None)
+    sub.add_argument("--assembly-mode", choices=("split_merge", "inplace"), default=None)
+    sub.add_argument("--compare-assembly", action="store_true",
+                     help="Run both assembly modes and compare page copies, saves and opens.")
+    command("profiler", profiler_overhead).add_argument("--runs", type=int, default=5)
+    command("property-cache", property_cache).add_argument(
+        "--latency", type=float, default=0.002, help="Simulated seconds per backend call.")
+    sub = command("scheduler", scheduler)
+    sub.add_argument("--jobs", type=int, default=6)
+    sub.add_argument("--sessions", type=int, default=2)
+    sub.add_argument("--latency", type=float, default=0.002, help="Simulated seconds per backend call.")
+    command("config", config_layers).add_argument("--repeat", type=int, default=10000)
+    command("project-index", project_index)
+    command("image-index", image_index)
+    sub = command("planner", planner, project=False)
+    sub.add_argument("--folders", type=int, default=100)
+    sub.add_argument("--images", type=int, default=50, help="Images per folder.")
+    command("text-metrics", text_metrics).add_argument("--repeat", type=int, default=500)
+    sub = command("proxies", proxies)
+    sub.add_argument("--ppi", type=int, default=150)
+    sub.add_argument("--workers", type=int, nargs="*", default=[1, os.cpu_count() or 1])
+    command("allocator", allocator, project=False)
+    command("page-region", page_region, project=False)
+    command("screen-settle", screen_settle, project=False)
+
+    args = parser.parse_args(argv)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# tracing.py
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+_local = threading.local()
+
+########################################
+# TRACER
+########################################
+
+class Tracer:
+    """Timed, nested spans of one run, written in the Chrome trace-event format (ui.perfetto.dev)."""
+
+    def __init__(self, process_name="run_automation"):
+        self.events = []
+        self.process_name = process_name
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+
+    @contextlib.contextmanager
+    def span(self, name, category="stage", **args):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            event = {"name": name, "cat": category, "ph": "X",
+                     "ts": (start - self._origin) / 1000.0, "dur": (end - start) / 1000.0,
+                     "pid": self._pid, "tid": threading.get_ident()}
+            if args:
+                event["args"] = args
+            self.events.append(event)
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Make this the tracer span() records into on the current thread."""
+        previous = getattr(_local, "tracer", None)
+        _local.tracer = self
+        try:
+            yield self
+        finally:
+            _local.tracer = previous
+
+    def stage_totals(self, category="stage"):
+        """Return {span name: total seconds} over the spans of a category."""
+        totals = {}
+        for event in self.events:
+            if event["cat"] == category:
+                totals[event["name"]] = totals.get(event["name"], 0.0) + event["dur"] / 1e6
+        return totals
+
+    def to_dict(self):
+        metadata = [{"name": "process_name", "ph": "M", "pid": self._pid, "tid": 0,
+                     "args": {"name": self.process_name}}]
+        events = sorted(self.events, key=lambda event: (event["ts"], -event["dur"]))
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def write(self, path):
+        """Write the trace as JSON (atomically) and return its path."""
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(temp_path, path)
+        return path
+
+
+def span(name, category="stage", **args):
+    """
+    A span in the tracer active on this thread, or a no-op without one, so
+    pipeline code can mark its stages whether or not the run is traced.
+    """
+    tracer = getattr(_local, "tracer", None)
+    if tracer is None:
+        return contextlib.nullcontext()
+    return tracer.span(name, category, **args)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# wait.py
+
+import time
+
+########################################
+# WAITER
+########################################
+
+class Waiter:
+    """
+    Polls a readiness check until it holds (or times out) instead of sleeping a fixed
+    time, and keeps the time waited per label next to the delay each wait replaces.
+    """
+
+    def __init__(self, backend, timeout=2.0, poll_interval=0.02):
+        self.backend = backend
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        # Movement time for the mouse drags that create and select frames; other moves jump.
+        self.drag_duration = 0.1
+        self.stats = {}
+
+    def until(self, condition, label, timeout=None, replaces=0.0):
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        polls = 0
+        while True:
+            try:
+                ready = condition()
+            except Exception:
+                ready = False
+            # The fake UI driver does not really sleep; count the polls it was asked to wait.
+            waited = max(time.perf_counter() - start, polls * self.poll_interval)
+            if ready or waited >= timeout:
+                break
+            self.backend.ui.sleep(self.poll_interval)
+            polls += 1
+        entry = self.stats.setdefault(label, [0, 0.0, 0, 0.0])
+        entry[0] += 1
+        entry[1] += waited
+        entry[3] += replaces
+        if not ready:
+            entry[2] += 1
+            print(f"[WARN] Gave up waiting for {label} after {timeout:.1f}s.")
+        return ready
+
+    def configure(self, config):
+        """Take the wait settings from a run's config (ui_wait_timeout, ui_poll_interval, ui_drag_duration)."""
+        self.timeout = config.get("ui_wait_timeout", self.timeout)
+        self.poll_interval = config.get("ui_poll_interval", self.poll_interval)
+        self.drag_duration = config.get("ui_drag_duration", self.drag_duration)
+        return self
+
+    def reset(self):
+        self.stats = {}
+
+    def totals(self):
+        """Return (waits, seconds waited, timeouts, seconds of fixed delays replaced)."""
+        return (sum(entry[0] for entry in self.stats.values()),
+                sum(entry[1] for entry in self.stats.values()),
+                sum(entry[2] for entry in self.stats.values()),
+                sum(entry[3] for entry in self.stats.values()))
+
+    def report(self):
+        waits, waited, timeouts, replaced = self.totals()
+        lines = [f"[INFO] UI waits: {waits} waits, {waited:.2f}s waited in place of {replaced:.2f}s "
+                 f"of fixed delays, {timeouts} timed out."]
+        for label, (count, seconds, timed_out, fixed) in sorted(self.stats.items(), key=lambda item: -item[1][1]):
+            lines.append(f"  {count:>6} {seconds:>8.2f}s {fixed:>8.2f}s {timed_out:>4}  {label}")
+        return "\n".join(lines)
+
+########################################
+# READINESS CHECKS
+########################################
+
+class ScreenSettled:
+    """Ready once a screen region (every step-th pixel) matches the previous grab; always ready without NumPy."""
+
+    def __init__(self, ui, region=None, step=8, threshold=1.0):
+        self.ui = ui
+        self.region = region
+        self.step = step
+        self.threshold = threshold
+        self._previous = None
+
+    def __call__(self):
+        try:
+            import numpy as np
+        except ImportError:
+            return True
+        if self.region is not None:
+            image = self.ui.screenshot(region=self.region)
+        else:
+            image = self.ui.screenshot()
+        current = np.asarray(image)[::self.step, ::self.step].astype(np.int16)
+        previous, self._previous = self._previous, current
+        if previous is None or previous.shape != current.shape:
+            return False
+        return float(np.abs(current - previous).mean()) < self.threshold
+
+
+def screen_region(top_left, bottom_right, margin=0):
+    """A pyautogui (left, top, width, height) region around two corners."""
+    left = max(int(min(top_left[0], bottom_right[0])) - margin, 0)
+    top = max(int(min(top_left[1], bottom_right[1])) - margin, 0)
+    return (left, top, int(abs(bottom_right[0] - top_left[0])) + 2 * margin,
+            int(abs(bottom_right[1] - top_left[1])) + 2 * margin)